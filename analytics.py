@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from combat_log import CombatLog
+from game_engine import CombatEvent, GameEngine
+from session import AdventureSession, TurnResult
+
+
+STRING_COLUMNS = ("session", "actor", "target", "action", "weapon")
+NUMBER_COLUMNS = ("turn", "hit", "damage", "healing", "actor_hp", "target_hp", "defeated")
+COLUMNS = STRING_COLUMNS + NUMBER_COLUMNS
+_DTYPES = {
+    "turn": np.int32,
+    "hit": np.int8,
+    "damage": np.int32,
+    "healing": np.int32,
+    "actor_hp": np.int32,
+    "target_hp": np.int32,
+    "defeated": np.int8,
+}
+# same encoding as ``CombatLog.hit``
+_HIT_CODES = {None: -1, False: 0, True: 1}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def parquet_available() -> bool:
+    return _pyarrow() is not None
+
+
+@dataclass
+class Chunk:
+    """One chunk of turn rows: string columns as int32 codes into per-chunk ``dictionaries``."""
+
+    columns: Dict[str, np.ndarray]
+    dictionaries: Dict[str, List[str]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+
+class ColumnarWriter:
+    """Streams turn rows into a directory of fixed-size columnar chunk files.
+
+    Rows are one turn each: the session id, turn number, actor/target/action, the actor's
+    weapon, hit (-1 no roll, 0 miss, 1 hit), damage, healing, HP after the turn and
+    whether this turn took the target down (from above 0 HP to 0 or below; hitting an
+    already downed target doesn't count). Every ``chunk_rows`` rows become one file,
+    ``part-00000.parquet`` when pyarrow is installed (or ``format="parquet"``) and
+    ``part-00000.npz`` otherwise, so memory use is bounded by one chunk whatever the
+    size of the campaign. String columns are dictionary encoded per chunk.
+    """
+
+    def __init__(self, directory: str, chunk_rows: int = 65536, format: str = "auto"):
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows must be positive")
+        if format == "auto":
+            format = "parquet" if parquet_available() else "npz"
+        if format not in ("parquet", "npz"):
+            raise ValueError(f"unknown format {format!r}")
+        if format == "parquet" and not parquet_available():
+            raise RuntimeError("parquet export needs pyarrow; use format='npz'")
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.format = format
+        self.rows = 0
+        self.paths: List[str] = []
+        os.makedirs(directory, exist_ok=True)
+        self._part = len(glob.glob(os.path.join(directory, "part-*")))
+        self._reset()
+
+    def _reset(self) -> None:
+        self._numbers = {name: array("i") for name in NUMBER_COLUMNS}
+        self._codes = {name: array("i") for name in STRING_COLUMNS}
+        self._dictionaries: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+        self._ids: Dict[str, Dict[str, int]] = {name: {} for name in STRING_COLUMNS}
+
+    def _code(self, column: str, value: str) -> int:
+        ids = self._ids[column]
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(self._dictionaries[column])
+            self._dictionaries[column].append(value)
+        return code
+
+    def append(
+        self,
+        session: str,
+        turn: int,
+        event: CombatEvent,
+        weapon: str = "",
+        defeated: Optional[bool] = None,
+    ) -> None:
+        if defeated is None:
+            # attacks subtract exactly ``damage``, so the target's HP before is target_hp + damage
+            defeated = event.action != "heal" and event.target_hp <= 0 < event.target_hp + event.damage
+        self.append_row(
+            session,
+            turn,
+            event.actor,
+            event.target,
+            event.action,
+            weapon,
+            _HIT_CODES[event.hit],
+            event.damage,
+            event.actor_hp,
+            event.target_hp,
+            defeated,
+        )
+
+    def append_row(
+        self,
+        session: str,
+        turn: int,
+        actor: str,
+        target: str,
+        action: str,
+        weapon: str,
+        hit: int,
+        damage: int,
+        actor_hp: int,
+        target_hp: int,
+        defeated: bool,
+    ) -> None:
+        """One turn row; ``damage`` is signed like ``CombatEvent.damage`` (negative heals)."""
+        codes, numbers, code = self._codes, self._numbers, self._code
+        codes["session"].append(code("session", session))
+        codes["actor"].append(code("actor", actor))
+        codes["target"].append(code("target", target))
+        codes["action"].append(code("action", action))
+        codes["weapon"].append(code("weapon", weapon))
+        numbers["turn"].append(turn)
+        numbers["hit"].append(hit)
+        numbers["damage"].append(damage if damage > 0 else 0)
+        numbers["healing"].append(-damage if damage < 0 else 0)
+        numbers["actor_hp"].append(actor_hp)
+        numbers["target_hp"].append(target_hp)
+        numbers["defeated"].append(1 if defeated else 0)
+        if len(numbers["turn"]) >= self.chunk_rows:
+            self.flush()
+
+    def write_chunk(self, chunk: Chunk) -> None:
+        """Write already columnar rows (e.g. straight from a ``CombatLog``) as chunk files."""
+        self.flush()
+        for start in range(0, len(chunk), self.chunk_rows):
+            columns = {name: values[start : start + self.chunk_rows] for name, values in chunk.columns.items()}
+            self._write(Chunk(columns, chunk.dictionaries))
+
+    def flush(self) -> None:
+        if not len(self._numbers["turn"]):
+            return
+        columns = {name: np.frombuffer(self._codes[name], dtype=np.int32) for name in STRING_COLUMNS}
+        columns.update({name: np.frombuffer(self._numbers[name], dtype=np.int32) for name in NUMBER_COLUMNS})
+        self._write(Chunk(columns, self._dictionaries))
+        self._reset()
+
+    def _write(self, chunk: Chunk) -> None:
+        columns = {name: np.asarray(chunk.columns[name], dtype=_DTYPES.get(name, np.int32)) for name in COLUMNS}
+        path = os.path.join(self.directory, f"part-{self._part:05d}.{self.format}")
+        if self.format == "parquet":
+            pa = _pyarrow()
+            arrays = {
+                name: pa.DictionaryArray.from_arrays(columns[name], pa.array(chunk.dictionaries[name], type=pa.string()))
+                if name in STRING_COLUMNS
+                else pa.array(columns[name])
+                for name in COLUMNS
+            }
+            pa.parquet.write_table(pa.table(arrays), path)
+        else:
+            for name in STRING_COLUMNS:
+                columns[f"{name}__dict"] = np.array(chunk.dictionaries[name], dtype=str)
+            np.savez(path, **columns)
+        self._part += 1
+        self.rows += len(chunk)
+        self.paths.append(path)
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _weapon(engine: GameEngine, name: str) -> str:
+    character = engine.characters.get(name.lower())
+    weapon = character.weapon if character is not None else None
+    return weapon.name if weapon is not None else ""
+
+
+def export_history(writer: ColumnarWriter, session_id: str, history: Iterable[TurnResult], engine: GameEngine) -> int:
+    """Append ``AdventureSession.history`` rows; HP and defeat come from each ``state_delta``."""
+    weapons: Dict[str, str] = {}
+    rows = 0
+    for result in history:
+        delta = result.state_delta
+        event = result.event
+        actor = event.actor
+        weapon = weapons.get(actor)
+        if weapon is None:
+            weapon = weapons[actor] = _weapon(engine, actor)
+        writer.append_row(
+            session_id,
+            result.scene.turn,
+            actor,
+            event.target,
+            event.action,
+            weapon,
+            _HIT_CODES[event.hit],
+            event.damage,
+            delta["actor_hp_after"],
+            delta["target_hp_after"],
+            event.action != "heal" and delta["target_hp_before"] > 0 >= delta["target_hp_after"],
+        )
+        rows += 1
+    return rows
+
+
+def export_log(writer: ColumnarWriter, session_id: str, engine: GameEngine) -> int:
+    """Append ``GameEngine.log``; turn numbers are log positions (counting trimmed events).
+
+    A ``CombatLog`` is already columnar, so its arrays are written as whole chunks
+    without building an event per row.
+    """
+    log = engine.log
+    if not isinstance(log, CombatLog):
+        for index, event in enumerate(log):
+            writer.append(session_id, index + 1, event, _weapon(engine, event.actor))
+        return len(log)
+
+    rows = len(log)
+    column = {
+        name: np.asarray(log.column(name))
+        for name in ("actor_id", "target_id", "action_id", "hit", "damage", "actor_hp", "target_hp")
+    }
+    damage, target_hp = column["damage"], column["target_hp"]
+    healing = np.isin(column["action_id"], [code for code, action in enumerate(log.actions) if action == "heal"])
+    weapons = [_weapon(engine, name) for name in log.names]
+    weapon_names = sorted(set(weapons))
+    weapon_codes = np.array([weapon_names.index(weapon) for weapon in weapons], dtype=np.int32)
+    writer.write_chunk(
+        Chunk(
+            {
+                "session": np.zeros(rows, np.int32),
+                "actor": column["actor_id"],
+                "target": column["target_id"],
+                "action": column["action_id"],
+                "weapon": weapon_codes[column["actor_id"]],
+                "turn": np.arange(log.dropped + 1, log.dropped + rows + 1, dtype=np.int32),
+                "hit": column["hit"],
+                "damage": np.maximum(damage, 0),
+                "healing": np.maximum(-damage, 0),
+                "actor_hp": column["actor_hp"],
+                "target_hp": column["target_hp"],
+                # went down this turn: HP before (target_hp + damage) was still above 0
+                "defeated": (~healing & (target_hp <= 0) & (target_hp + damage > 0)).astype(np.int8),
+            },
+            {
+                "session": [session_id],
+                "actor": list(log.names),
+                "target": list(log.names),
+                "action": list(log.actions),
+                "weapon": weapon_names,
+            },
+        )
+    )
+    return rows
+
+
+def export_session(writer: ColumnarWriter, session_id: str, session: AdventureSession, source: str = "history") -> int:
+    """Export a session's ``history`` or its engine ``log``."""
+    if source == "history":
+        return export_history(writer, session_id, session.history, session.engine)
+    if source == "log":
+        return export_log(writer, session_id, session.engine)
+    raise ValueError(f"unknown source {source!r}")
+
+
+class ColumnarDataset:
+    """Streaming, vectorized aggregate queries over a directory written by ``ColumnarWriter``.
+
+    Chunks are read one at a time with only the columns a query needs, grouped with
+    ``np.bincount`` over the dictionary codes and merged by name, so memory stays at one
+    chunk regardless of how many turns the campaign logged. ``.npz`` and ``.parquet``
+    parts can be mixed.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.paths = sorted(
+            glob.glob(os.path.join(directory, "part-*.npz")) + glob.glob(os.path.join(directory, "part-*.parquet"))
+        )
+
+    def chunks(self, columns: Sequence[str] = COLUMNS) -> Iterator[Chunk]:
+        for path in self.paths:
+            if path.endswith(".npz"):
+                with np.load(path, allow_pickle=False) as data:
+                    yield Chunk(
+                        {name: data[name] for name in columns},
+                        {name: data[f"{name}__dict"].tolist() for name in columns if name in STRING_COLUMNS},
+                    )
+                continue
+            pa = _pyarrow()
+            if pa is None:
+                raise RuntimeError(f"reading {path} needs pyarrow")
+            strings = [name for name in columns if name in STRING_COLUMNS]
+            parquet = pa.parquet.ParquetFile(path, read_dictionary=strings)
+            for batch in parquet.iter_batches(columns=list(columns)):
+                chunk = Chunk({}, {})
+                for name in columns:
+                    values = batch.column(name)
+                    if name in STRING_COLUMNS:
+                        chunk.columns[name] = values.indices.to_numpy(zero_copy_only=False)
+                        chunk.dictionaries[name] = values.dictionary.to_pylist()
+                    else:
+                        chunk.columns[name] = values.to_numpy(zero_copy_only=False)
+                yield chunk
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self.chunks(("turn",)))
+
+    @staticmethod
+    def _add(totals: Dict[str, float], names: List[str], sums: np.ndarray) -> None:
+        for name, value in zip(names, sums.tolist()):
+            if value:
+                totals[name] = totals.get(name, 0) + value
+
+    def _grouped(
+        self,
+        key: str,
+        value: Optional[str] = None,
+        where: Optional[Tuple[str, Callable[[np.ndarray], np.ndarray]]] = None,
+    ) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Per-``key`` sums of ``value`` and row counts, over rows where ``where[1](column)`` holds."""
+        columns = [key] + [name for name in (value, where and where[0]) if name and name != key]
+        sums: Dict[str, float] = {}
+        counts: Dict[str, float] = {}
+        for chunk in self.chunks(columns):
+            codes = chunk.columns[key]
+            weights = chunk.columns[value] if value else None
+            if where is not None:
+                mask = where[1](chunk.columns[where[0]])
+                codes = codes[mask]
+                weights = weights[mask] if weights is not None else None
+            names = chunk.dictionaries[key]
+            self._add(counts, names, np.bincount(codes, minlength=len(names)))
+            if weights is not None:
+                self._add(sums, names, np.bincount(codes, weights=weights, minlength=len(names)))
+        return sums, counts
+
+    def damage_by_actor(self) -> Dict[str, int]:
+        sums, _ = self._grouped("actor", "damage")
+        return {name: int(total) for name, total in sorted(sums.items())}
+
+    def hit_rates_by_weapon(self) -> Dict[str, float]:
+        """Share of rolled attacks that hit, per attacker weapon (unarmed is ``""``)."""
+        hits, attempts = self._grouped("weapon", "hit", ("hit", lambda hit: hit >= 0))
+        return {name: hits.get(name, 0) / attempts[name] for name in sorted(attempts)}
+
+    def heal_frequency(self) -> Dict[str, float]:
+        """Share of each actor's turns spent healing."""
+        turns: Dict[str, float] = {}
+        heals: Dict[str, float] = {}
+        for chunk in self.chunks(("actor", "action")):
+            actors, names = chunk.columns["actor"], chunk.dictionaries["actor"]
+            heal_codes = [code for code, action in enumerate(chunk.dictionaries["action"]) if action == "heal"]
+            healing = np.isin(chunk.columns["action"], heal_codes)
+            self._add(turns, names, np.bincount(actors, minlength=len(names)))
+            self._add(heals, names, np.bincount(actors[healing], minlength=len(names)))
+        return {name: heals.get(name, 0) / count for name, count in sorted(turns.items())}
+
+    def turns_to_defeat(self) -> Dict[str, float]:
+        """Mean turn number at which each combatant went down, over the sessions it lost."""
+        turns, defeats = self._grouped("target", "turn", ("defeated", lambda defeated: defeated > 0))
+        return {name: turns[name] / defeats[name] for name in sorted(defeats)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Aggregate combat statistics from exported columnar history.")
+    parser.add_argument("directory", help="directory of part-*.parquet / part-*.npz files")
+    args = parser.parse_args()
+
+    dataset = ColumnarDataset(args.directory)
+    print(f"{len(dataset)} turns in {len(dataset.paths)} chunks")
+    for title, result in (
+        ("damage by actor", dataset.damage_by_actor()),
+        ("hit rate by weapon", dataset.hit_rates_by_weapon()),
+        ("heal frequency", dataset.heal_frequency()),
+        ("mean turn of defeat", dataset.turns_to_defeat()),
+    ):
+        print(f"{title}:")
+        for name, value in result.items():
+            print(f"  {name or '(none)'}: {value:.3f}" if isinstance(value, float) else f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from game_engine import CombatEvent
+from narrator import Narrator
+from narrator_transport import CircuitOpenError
+from prompt_builder import ENCODING_LEGEND, NARRATION_RULES, BuiltPrompt
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_PREFIX = (
+    "You are a Dungeon Master assistant for a deterministic rules engine.\n"
+    "Narrate each of the independent items in the request.\n"
+    'Return a JSON object only: {"items": [{"id": <item id>, "narrative": ..., '
+    '"scene_overview_update": ..., "state_notes": [...], "image_prompt_addendum": ...}, ...]}\n'
+    f"{NARRATION_RULES}"
+    f"{ENCODING_LEGEND}"
+)
+
+
+@dataclass
+class _PendingItem:
+    item_id: str
+    event: CombatEvent
+    action_text: str
+    mechanics_summary: str
+    scene_state: Optional[dict]
+    fallback: dict
+    cache_key: Optional[str]
+    future: asyncio.Future
+
+
+class BatchingNarrator:
+    """Micro-batches async narration requests from many sessions into one API call.
+
+    Requests arriving within ``window`` seconds (or until ``max_batch`` are queued) are
+    sent as a single multi-item prompt. The JSON reply is split back out by item id and
+    each entry goes through ``Narrator._validate_structured`` on its own, so one bad
+    item falls back without affecting the rest. ``client`` defaults to the wrapped
+    narrator's client and may be sync or async.
+    """
+
+    def __init__(
+        self,
+        narrator: Optional[Narrator] = None,
+        client=None,
+        window: float = 0.05,
+        max_batch: int = 16,
+    ):
+        self.narrator = narrator or Narrator()
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self.batches_sent = 0
+        self.items_sent = 0
+        self._pending: List[_PendingItem] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set = set()
+        self._ids = itertools.count(1)
+
+    @property
+    def instrumentation(self):
+        return self.narrator.instrumentation
+
+    def _client(self):
+        if self.client is not None:
+            return self.client
+        return self.narrator._async_client or self.narrator._client
+
+    def narrate(self, event: CombatEvent, action_text: str) -> str:
+        return self.narrator.narrate(event, action_text)
+
+    def narrate_structured(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        return self.narrator.narrate_structured(event, action_text, mechanics_summary, scene_state)
+
+    async def narrate_structured_async(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        fallback = Narrator._fallback_structured(event, action_text)
+        if self._client() is None:
+            self.instrumentation.count("narrator_fallback", reason="offline")
+            return fallback
+        cache_key, cached = self.narrator._cache_lookup(event, action_text, scene_state)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        item = _PendingItem(
+            item_id=str(next(self._ids)),
+            event=event,
+            action_text=action_text,
+            mechanics_summary=mechanics_summary,
+            scene_state=scene_state,
+            fallback=fallback,
+            cache_key=cache_key,
+            future=loop.create_future(),
+        )
+        self._pending.append(item)
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+        return await item.future
+
+    async def flush(self) -> None:
+        """Send whatever is queued now and wait for every in-flight batch."""
+        self._schedule_flush()
+        if self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        items, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._send(items))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    def _batch_prompt(self, items: List[_PendingItem]) -> BuiltPrompt:
+        builder = self.narrator.prompt_builder
+        blocks = []
+        truncated: List[str] = []
+        over_budget = False
+        for item in items:
+            block, steps, over = builder.turn_block(item.event, item.action_text, item.scene_state)
+            blocks.append(f"### Item {item.item_id}\n{block}")
+            truncated.extend(steps)
+            over_budget = over_budget or over
+        body = f"{len(items)} items:\n\n" + "\n".join(blocks)
+        return BuiltPrompt(BATCH_PREFIX, body, truncated, over_budget)
+
+    async def _send(self, items: List[_PendingItem]) -> None:
+        instrumentation = self.instrumentation
+        prompt = self._batch_prompt(items)
+        if instrumentation.enabled:
+            instrumentation.observe("narrator_batch_size", len(items))
+        self.narrator._report_prompt(prompt)
+        self.batches_sent += 1
+        self.items_sent += len(items)
+
+        payloads: Dict[str, object] = {}
+        answered = False
+        create = self._client().responses.create
+        request = {"model": self.narrator.model, "input": prompt.messages(), "temperature": 0.5}
+        try:
+            with instrumentation.stage("narrator_request", mode="batch"):
+                response = await self.narrator.transport.call_async(create, **request)
+            payloads = self._split(response.output_text)
+            answered = True
+        except CircuitOpenError:
+            instrumentation.count("narrator_fallback", len(items), reason="circuit_open")
+        except Exception as exc:
+            logger.warning(
+                "Batched narration of %d items failed; using fallbacks. error=%s: %s",
+                len(items),
+                type(exc).__name__,
+                exc,
+            )
+            instrumentation.count("narrator_fallback", len(items), reason="error")
+
+        for item in items:
+            if item.future.done():
+                continue
+            payload = payloads.get(item.item_id)
+            result = Narrator._validate_structured(payload, item.fallback) if payload is not None else item.fallback
+            if answered:
+                if result is item.fallback:
+                    instrumentation.count("narrator_fallback", reason="invalid")
+                else:
+                    instrumentation.count("narrator_success")
+                    self.narrator._cache_store(item.cache_key, item.event, result, item.fallback)
+            item.future.set_result(result)
+
+    @staticmethod
+    def _split(output_text: str) -> Dict[str, object]:
+        parsed = json.loads(output_text.strip())
+        entries = parsed.get("items", []) if isinstance(parsed, dict) else parsed
+        if not isinstance(entries, list):
+            raise ValueError("batched narration response has no items list")
+        return {str(entry.get("id")): entry for entry in entries if isinstance(entry, dict)}
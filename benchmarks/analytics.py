@@ -0,0 +1,149 @@
+"""Aggregate query speed over exported columnar history against iterating ``history`` in Python.
+
+Plays ``--duels`` template-narrated CLI duels, then replays their history under fresh
+session ids until ``--turns`` rows exist. The baseline computes damage per actor, hit
+rate per weapon, heal frequency and turns to defeat by walking ``TurnResult`` objects
+and their ``state_delta`` dicts; the columnar runs export the same rows once per format
+and answer the same four queries chunk by chunk.
+
+Run from the repository root:
+
+    python -m benchmarks.analytics --turns 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Tuple
+
+from analytics import ColumnarDataset, ColumnarWriter, export_history, parquet_available
+from benchmarks.common import metadata, write_results
+from main import ai_intent, build_default_session
+from session import AdventureSession
+from template_narrator import TemplateNarrator
+
+
+def play(duels: int, seed: int) -> List[AdventureSession]:
+    sessions = []
+    for index in range(duels):
+        session, player = build_default_session(narrator=TemplateNarrator(seed=seed), seed=seed + index)
+        ai = next(c.name for c in session.engine.turn_order if c.name != player)
+        while session.encounter.is_alive(player) and session.encounter.is_alive(ai):
+            healing = session.engine.characters[player.lower()].health <= 7
+            session.process_turn(player, player if healing else ai, "I heal" if healing else "I attack")
+            if session.encounter.is_alive(ai):
+                session.process_turn(*ai_intent(session, ai, player))
+        sessions.append(session)
+    return sessions
+
+
+def campaign(sessions: List[AdventureSession], turns: int) -> Iterator[Tuple[str, AdventureSession]]:
+    """``(session_id, session)`` pairs cycling the played duels until ``turns`` rows."""
+    produced = 0
+    for index, session in enumerate(itertools.cycle(sessions)):
+        if produced >= turns:
+            return
+        produced += len(session.history)
+        yield f"s{index}", session
+
+
+def python_aggregates(pairs: List[Tuple[str, AdventureSession]]) -> Dict[str, object]:
+    damage, turns, heals, attacks, hits, defeat_turns, defeats = (Counter() for _ in range(7))
+    for _, session in pairs:
+        for result in session.history:
+            delta = result.state_delta
+            actor = delta["actor"]
+            damage[actor] += delta["damage"]
+            turns[actor] += 1
+            if delta["action"] == "heal":
+                heals[actor] += 1
+            elif delta["target_hp_before"] > 0 >= delta["target_hp_after"]:
+                defeat_turns[delta["target"]] += result.scene.turn
+                defeats[delta["target"]] += 1
+            if result.event.hit is not None:
+                weapon = session.engine.characters[actor.lower()].weapon
+                attacks[weapon.name] += 1
+                hits[weapon.name] += result.event.hit
+    return {
+        "damage": dict(damage),
+        "hit_rates": {name: hits[name] / attacks[name] for name in attacks},
+        "heal_frequency": {name: heals[name] / turns[name] for name in turns},
+        "turns_to_defeat": {name: defeat_turns[name] / defeats[name] for name in defeats},
+    }
+
+
+def columnar_aggregates(dataset: ColumnarDataset) -> Dict[str, object]:
+    return {
+        "damage": dataset.damage_by_actor(),
+        "hit_rates": dataset.hit_rates_by_weapon(),
+        "heal_frequency": dataset.heal_frequency(),
+        "turns_to_defeat": dataset.turns_to_defeat(),
+    }
+
+
+def bench_format(pairs: List[Tuple[str, AdventureSession]], format: str, chunk_rows: int) -> Dict[str, object]:
+    with tempfile.TemporaryDirectory() as root:
+        started = time.perf_counter()
+        with ColumnarWriter(root, chunk_rows=chunk_rows, format=format) as writer:
+            for session_id, session in pairs:
+                export_history(writer, session_id, session.history, session.engine)
+        exported = time.perf_counter() - started
+        size = sum(os.path.getsize(path) for path in writer.paths)
+
+        dataset = ColumnarDataset(root)
+        started = time.perf_counter()
+        aggregates = columnar_aggregates(dataset)
+        queried = time.perf_counter() - started
+    return {
+        "rows": writer.rows,
+        "chunks": len(writer.paths),
+        "bytes": size,
+        "export_seconds": exported,
+        "query_seconds": queried,
+        "aggregates": aggregates,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duels", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=1000000)
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="result file (default: bench_results/analytics-<rev>.json)")
+    args = parser.parse_args()
+
+    pairs = list(campaign(play(args.duels, args.seed), args.turns))
+    rows = sum(len(session.history) for _, session in pairs)
+    started = time.perf_counter()
+    baseline = python_aggregates(pairs)
+    python_seconds = time.perf_counter() - started
+
+    formats = ["npz"] + (["parquet"] if parquet_available() else [])
+    payload = {
+        "meta": metadata(benchmark="analytics", turns=rows, duels=args.duels, chunk_rows=args.chunk_rows),
+        "python": {"rows": rows, "query_seconds": python_seconds, "aggregates": baseline},
+        "formats": {format: bench_format(pairs, format, args.chunk_rows) for format in formats},
+    }
+    path = write_results("analytics", payload, args.output)
+    print(f"python: {rows} turns, four aggregates in {python_seconds:.2f}s")
+    for format, result in payload["formats"].items():
+        agrees = all(
+            result["aggregates"][query].keys() == {name for name, value in expected.items() if value or query != "damage"}
+            and all(abs(result["aggregates"][query][name] - expected[name]) < 1e-9 for name in result["aggregates"][query])
+            for query, expected in baseline.items()
+        )
+        print(
+            f"{format:>7}: export {result['export_seconds']:.2f}s into {result['chunks']} chunks "
+            f"({result['bytes'] / 1e6:.1f} MB), four aggregates in {result['query_seconds']:.3f}s "
+            f"({python_seconds / result['query_seconds']:.0f}x), matches python: {agrees}"
+        )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark of attack resolution with cached combat profiles against recomputing every stat.
+
+Run from the repository root:
+
+    python -m benchmarks.combat_profile --attacks 200000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.common import metadata, write_results
+from character import Character
+from combat_profile import combat_profile
+from game_engine import CombatEvent, GameEngine
+from roster import build_roster
+
+
+class RecomputingEngine(GameEngine):
+    """The pre-profile attack path: modifiers, AC and the formula string rebuilt per attack."""
+
+    def perform_action(self, actor_name: str, target_name: str, description: str) -> CombatEvent:
+        if self.parse_action(description) != "attack":
+            return super().perform_action(actor_name, target_name, description)
+        actor = self.characters[actor_name.lower()]
+        target = self.characters[target_name.lower()]
+        attack_roll = self.roll(1, 20, self.ability_modifier(actor.ability_scores.strength) + 2)
+        dex_mod = self.ability_modifier(target.ability_scores.dexterity)
+        armor_class = 10 + dex_mod + (target.armor.protection if target.armor else 0)
+        hit = attack_roll.total >= armor_class
+        damage = 0
+        rolls = [attack_roll]
+        if hit:
+            weapon_roll = self.roll(1, actor.weapon.max_damage, self.ability_modifier(actor.ability_scores.strength))
+            damage = max(actor.weapon.min_damage, weapon_roll.total)
+            target.health -= damage
+            rolls.append(weapon_roll)
+        event = CombatEvent(actor.name, target.name, "attack", hit, damage, actor.health, target.health, rolls)
+        self.log.append(event)
+        return event
+
+
+def _pairs(roster: List[Character], attacks: int, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    return [tuple(c.name for c in rng.sample(roster, 2)) for _ in range(attacks)]
+
+
+def _time_attacks(engine: GameEngine, pairs: List[Tuple[str, str]]) -> float:
+    started = time.perf_counter()
+    for actor, target in pairs:
+        engine.perform_action(actor, target, "I attack")
+    return time.perf_counter() - started
+
+
+def _recomputed_stats(actor: Character, target: Character) -> tuple:
+    strength_mod = GameEngine.ability_modifier(actor.ability_scores.strength)
+    dex_mod = GameEngine.ability_modifier(target.ability_scores.dexterity)
+    armor_class = 10 + dex_mod + (target.armor.protection if target.armor else 0)
+    return strength_mod + 2, armor_class, strength_mod, f"1d{actor.weapon.max_damage}"
+
+
+def _profiled_stats(actor: Character, target: Character) -> tuple:
+    profile = combat_profile(actor)
+    return profile.to_hit, combat_profile(target).armor_class, profile.strength_mod, profile.damage_formula
+
+
+def _time_stats(resolve: Callable, roster: List[Character], pairs: List[Tuple[str, str]]) -> float:
+    by_name = {c.name: c for c in roster}
+    pairs = [(by_name[actor], by_name[target]) for actor, target in pairs]
+    started = time.perf_counter()
+    for actor, target in pairs:
+        resolve(actor, target)
+    return time.perf_counter() - started
+
+
+def bench_attacks(size: int, attacks: int, seed: int, repeats: int) -> Dict[str, float]:
+    """Best-of-``repeats`` timings, alternating implementations so drift hits both equally."""
+    pairs = _pairs(build_roster(size, seed=seed), attacks, seed)
+    roster = build_roster(size, seed=seed)
+    timings: Dict[str, List[float]] = {"recomputing": [], "profiled": [], "recomputing_stats": [], "profiled_stats": []}
+    for repeat in range(repeats):
+        reference = RecomputingEngine(build_roster(size, seed=seed, health=10**9), rng=random.Random(seed))
+        engine = GameEngine(build_roster(size, seed=seed, health=10**9), rng=random.Random(seed))
+        for name, candidate in (("recomputing", reference), ("profiled", engine))[:: 1 if repeat % 2 else -1]:
+            timings[name].append(_time_attacks(candidate, pairs))
+        if engine.log != reference.log:
+            raise AssertionError("profiled engine diverged from the recomputing reference")
+        timings["recomputing_stats"].append(_time_stats(_recomputed_stats, roster, pairs))
+        timings["profiled_stats"].append(_time_stats(_profiled_stats, roster, pairs))
+
+    best = {name: min(samples) for name, samples in timings.items()}
+    return {
+        "attacks": attacks,
+        "recomputing_attacks_per_sec": attacks / best["recomputing"],
+        "profiled_attacks_per_sec": attacks / best["profiled"],
+        "attack_speedup": best["recomputing"] / best["profiled"],
+        "recomputing_stats_ns": best["recomputing_stats"] / attacks * 1e9,
+        "profiled_stats_ns": best["profiled_stats"] / attacks * 1e9,
+        "stats_speedup": best["recomputing_stats"] / best["profiled_stats"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attacks", type=int, default=200_000)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="result file (default: bench_results/combat_profile-<rev>.json)")
+    args = parser.parse_args()
+
+    payload = {
+        "meta": metadata(benchmark="combat_profile", seed=args.seed, size=args.size),
+        "attacks": bench_attacks(args.size, args.attacks, args.seed, args.repeats),
+    }
+    path = write_results("combat_profile", payload, args.output)
+    result = payload["attacks"]
+    print(
+        f"stat resolution: {result['recomputing_stats_ns']:.0f}ns -> {result['profiled_stats_ns']:.0f}ns "
+        f"(x{result['stats_speedup']:.2f})"
+    )
+    print(
+        f"attacks: {result['recomputing_attacks_per_sec']:.0f}/s -> {result['profiled_attacks_per_sec']:.0f}/s "
+        f"(x{result['attack_speedup']:.2f})"
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Shared helpers for the benchmark scripts: timing stats and result files."""
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+RESULTS_DIR = Path("bench_results")
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in microseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1e6
+
+    return {
+        "count": len(ordered),
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": pick(0.50),
+        "p90_us": pick(0.90),
+        "p99_us": pick(0.99),
+        "max_us": ordered[-1] * 1e6,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def metadata(**extra: object) -> Dict[str, object]:
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        **extra,
+    }
+
+
+def write_results(name: str, payload: Dict[str, object], output: Optional[str] = None) -> Path:
+    path = Path(output) if output else RESULTS_DIR / f"{name}-{payload['meta']['revision']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], prefix: str = "") -> List[str]:
+    """Lines describing relative change for every numeric leaf present in both results."""
+    lines = []
+    for key, value in current.items():
+        if key == "meta" or key not in baseline:
+            continue
+        old = baseline[key]
+        label = f"{prefix}{key}"
+        if isinstance(value, dict) and isinstance(old, dict):
+            lines.extend(compare(old, value, prefix=f"{label}."))
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+            lines.append(f"{label}: {old:.3f} -> {value:.3f} ({(value - old) / old * 100:+.1f}%)")
+    return lines
@@ -0,0 +1,95 @@
+"""Scripted-turn throughput of the headless runner against driving the interactive CLI loop.
+
+Both play the same attack/heal scripts with the template narrator. The CLI baseline runs
+``main.run_cli`` with ``input()`` fed from the script and stdout sent to ``os.devnull``,
+which is how scripted playtests had to be run before.
+
+Run from the repository root:
+
+    python -m benchmarks.headless --sessions 300 --commands 40
+"""
+from __future__ import annotations
+
+import argparse
+import builtins
+import contextlib
+import io
+import os
+import time
+from typing import Dict, List
+from unittest import mock
+
+import main as cli
+from benchmarks.common import metadata, write_results
+from headless import HeadlessRunner, ScriptedCommand
+from template_narrator import TemplateNarrator
+
+
+def _script(commands: int) -> List[str]:
+    return ["heal" if index % 5 == 4 else "attack daisy" for index in range(commands)] + ["quit"]
+
+
+def bench_cli(sessions: int, commands: int, seed: int) -> Dict[str, float]:
+    script = _script(commands)
+    build = cli.build_default_session
+    turns = 0
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for index in range(sessions):
+            lines = iter(script)
+            session_box = []
+
+            def factory(narrator=None, index=index):
+                session, player = build(narrator=TemplateNarrator(), seed=seed + index)
+                session_box.append(session)
+                return session, player
+
+            # the script may outlive the fight; a missing line just quits
+            with mock.patch.object(cli, "build_default_session", factory), mock.patch.object(
+                builtins, "input", lambda prompt="": next(lines, "quit")
+            ):
+                cli.run_cli()
+            turns += session_box[0].turn_number
+    elapsed = time.perf_counter() - started
+    return {"turns": turns, "seconds": elapsed, "turns_per_second": turns / elapsed}
+
+
+def bench_headless(sessions: int, commands: int, seed: int) -> Dict[str, float]:
+    script = _script(commands)
+    # interleave sessions the way a JSONL command stream from a QA farm would
+    stream = [ScriptedCommand(f"s{index}", command) for command in script for index in range(sessions)]
+    output = io.StringIO()
+    summary = HeadlessRunner(output, TemplateNarrator(), seed=seed).run(stream)
+    return {
+        "turns": summary.turns,
+        "seconds": summary.elapsed,
+        "turns_per_second": summary.turns_per_second,
+        "output_bytes": len(output.getvalue().encode("utf-8")),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--commands", type=int, default=40, help="player commands per session script")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="result file (default: bench_results/headless-<rev>.json)")
+    args = parser.parse_args()
+
+    payload = {
+        "meta": metadata(benchmark="headless", sessions=args.sessions, commands=args.commands, seed=args.seed),
+        "cli": bench_cli(args.sessions, args.commands, args.seed),
+        "headless": bench_headless(args.sessions, args.commands, args.seed),
+    }
+    path = write_results("headless", payload, args.output)
+    for mode in ("cli", "headless"):
+        result = payload[mode]
+        print(
+            f"{mode:>8}: {result['turns']} turns in {result['seconds']:.2f}s, "
+            f"{result['turns_per_second'] * 60 / 1e3:.0f}k turns/min"
+        )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Turn latency and render volume of queued illustration jobs against rendering inline.
+
+Plays interleaved template-narrated duels (round robin, as a host's workers would) and
+illustrates every turn's ``image_prompt`` with the stub renderer slowed to ``--delay``
+seconds per image. ``inline`` renders each picture before the next turn, which is what
+wiring a renderer straight into the turn loop would do; ``queued`` submits to an
+``ImageJobQueue`` and keeps playing.
+
+Run from the repository root:
+
+    python -m benchmarks.image_jobs --sessions 20 --delay 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.common import metadata, summarize, write_results
+from image_jobs import ImageCache, ImageJobQueue, StubRenderer, image_key
+from main import ai_intent, build_default_session
+from template_narrator import TemplateNarrator
+
+
+def play(sessions: int, seed: int, illustrate: Callable[[str, object], None]) -> List[float]:
+    """Round-robin turns over ``sessions`` duels; per-turn latency including ``illustrate``."""
+    narrator = TemplateNarrator(seed=seed)
+    games = []
+    for index in range(sessions):
+        session, player = build_default_session(narrator=narrator, seed=seed + index)
+        ai = next(c.name for c in session.engine.turn_order if c.name != player)
+        games.append((f"s{index}", session, player, ai))
+    samples = []
+    rng = random.Random(seed)
+    while games:
+        for game in list(games):
+            name, session, player, ai = game
+            if not (session.encounter.is_alive(player) and session.encounter.is_alive(ai)):
+                games.remove(game)
+                continue
+            healing = session.engine.characters[player.lower()].health <= 7 and rng.random() < 0.7
+            parsed = (player, player, "I heal") if healing else (player, ai, "I attack")
+            for actor_turn in (parsed, ai_intent(session, ai, player)):
+                if actor_turn is None or not session.encounter.is_alive(ai):
+                    continue
+                started = time.perf_counter()
+                result = session.process_turn(*actor_turn)
+                illustrate(name, result)
+                samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_inline(sessions: int, seed: int, delay: float, size: int) -> Dict[str, object]:
+    renderer = StubRenderer(delay)
+    with tempfile.TemporaryDirectory() as root:
+        cache = ImageCache(root)
+
+        def illustrate(name: str, result) -> None:
+            key = image_key(result.image_prompt, renderer.name, size)
+            if cache.get(key) is None:
+                cache.put(key, renderer.render(result.image_prompt, size))
+
+        started = time.perf_counter()
+        samples = play(sessions, seed, illustrate)
+        elapsed = time.perf_counter() - started
+    return {"turns": len(samples), "renders": renderer.calls, "seconds": elapsed, "turn_latency": summarize(samples)}
+
+
+def bench_queued(sessions: int, seed: int, delay: float, size: int, workers: int) -> Dict[str, object]:
+    renderer = StubRenderer(delay)
+    latest: Dict[str, object] = {}
+    with tempfile.TemporaryDirectory() as root:
+        queue = ImageJobQueue(ImageCache(root), renderer, workers=workers, size=size)
+
+        def illustrate(name: str, result) -> None:
+            latest[name] = queue.submit_turn(name, result)
+
+        started = time.perf_counter()
+        samples = play(sessions, seed, illustrate)
+        played = time.perf_counter() - started
+        queue.drain()
+        elapsed = time.perf_counter() - started
+        queue.close()
+    return {
+        "turns": len(samples),
+        "renders": renderer.calls,
+        "play_seconds": played,
+        "seconds": elapsed,
+        "final_scene_rendered": sum(not future.cancelled() for future in latest.values()) / max(1, len(latest)),
+        "stats": vars(queue.stats),
+        "turn_latency": summarize(samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.01, help="simulated seconds per rendered image")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="result file (default: bench_results/image_jobs-<rev>.json)")
+    args = parser.parse_args()
+
+    payload = {
+        "meta": metadata(benchmark="image_jobs", sessions=args.sessions, delay=args.delay, workers=args.workers),
+        "inline": bench_inline(args.sessions, args.seed, args.delay, args.size),
+        "queued": bench_queued(args.sessions, args.seed, args.delay, args.size, args.workers),
+    }
+    path = write_results("image_jobs", payload, args.output)
+    for mode in ("inline", "queued"):
+        result = payload[mode]
+        latency = result["turn_latency"]
+        print(
+            f"{mode:>6}: {result['turns']} turns, {result['renders']} renders in {result['seconds']:.2f}s, "
+            f"turn p50 {latency['p50_us']:.0f}us p99 {latency['p99_us']:.0f}us"
+        )
+    queued = payload["queued"]
+    print(
+        f"queued: play finished in {queued['play_seconds']:.2f}s, final scene rendered for "
+        f"{queued['final_scene_rendered'] * 100:.0f}% of sessions, {queued['stats']}"
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Throughput of the compiled intent classifier against per-keyword substring scans.
+
+The legacy path is the old ``GameEngine.parse_action`` generalized to a lexicon: lowercase
+the intent, then ``any(keyword in text)`` per action in priority order. Each vocabulary
+size adds synthetic spell, item and maneuver keywords to the default lexicon.
+
+Run from the repository root:
+
+    python -m benchmarks.intent --intents 20000 --vocabulary 6 100 1000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.common import metadata, write_results
+from intent import DEFAULT_LEXICON, IntentClassifier, Lexicon
+
+SYLLABLES = ("ka", "zor", "mel", "thi", "ran", "vek", "sul", "dor", "ix", "ara", "quen", "bri")
+TEMPLATES = (
+    "I {word} at {target} with my blade",
+    "Quickly {word} before {target} can react",
+    "I try to {word} and then fire at {target}",
+    "{word}!",
+    "I charge {target} with all my strength",
+)
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(3))
+
+
+def build_lexicon(size: int, seed: int) -> Lexicon:
+    """Default lexicon padded with ``size`` extra keywords spread over heal/observe/attack."""
+    rng = random.Random(seed)
+    actions = {action: list(keywords) for action, keywords in DEFAULT_LEXICON.actions.items()}
+    actions["attack"] = []
+    known = {keyword for keywords in actions.values() for keyword in keywords}
+    names = list(actions)
+    while sum(len(keywords) for keywords in actions.values()) < size:
+        word = _word(rng)
+        if word not in known:
+            known.add(word)
+            actions[names[len(known) % len(names)]].append(word)
+    return Lexicon({action: tuple(keywords) for action, keywords in actions.items()}, dict(DEFAULT_LEXICON.modifiers))
+
+
+def build_intents(lexicon: Lexicon, count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    words = [keyword for keywords in lexicon.actions.values() for keyword in keywords]
+    return [
+        rng.choice(TEMPLATES).format(word=rng.choice(words) if rng.random() < 0.8 else _word(rng), target=f"goblin {index}")
+        for index in range(count)
+    ]
+
+
+def legacy_action(lexicon: Lexicon, text: str) -> str:
+    lowered = text.lower()
+    for action, keywords in lexicon.actions.items():
+        if any(keyword in lowered for keyword in keywords):
+            return action
+    return lexicon.default_action
+
+
+def bench_vocabulary(size: int, count: int, seed: int) -> Dict[str, object]:
+    lexicon = build_lexicon(size, seed)
+    intents = build_intents(lexicon, count, seed)
+    classifier = IntentClassifier(lexicon, max_memo=0)
+
+    started = time.perf_counter()
+    legacy = [legacy_action(lexicon, text) for text in intents]
+    legacy_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compiled = [classifier.action(text) for text in intents]
+    compiled_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    full = classifier.classify_many(intents, targets=("goblin",))
+    batch_elapsed = time.perf_counter() - started
+
+    return {
+        "keywords": sum(len(keywords) for keywords in lexicon.actions.values()),
+        "legacy_per_second": count / legacy_elapsed,
+        "compiled_per_second": count / compiled_elapsed,
+        "batch_classify_per_second": count / batch_elapsed,
+        "speedup": legacy_elapsed / compiled_elapsed,
+        "agreement": sum(a == b for a, b in zip(legacy, compiled)) / count,
+        "batch_agreement": sum(a == b.action for a, b in zip(legacy, full)) / count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--intents", type=int, default=20000)
+    parser.add_argument("--vocabulary", type=int, nargs="+", default=[6, 100, 1000])
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="result file (default: bench_results/intent-<rev>.json)")
+    args = parser.parse_args()
+
+    payload = {
+        "meta": metadata(benchmark="intent", intents=args.intents, seed=args.seed),
+        "vocabularies": [bench_vocabulary(size, args.intents, args.seed) for size in args.vocabulary],
+    }
+    path = write_results("intent", payload, args.output)
+    for result in payload["vocabularies"]:
+        print(
+            f"{result['keywords']:>5} keywords: legacy {result['legacy_per_second'] / 1e3:.0f}k/s, "
+            f"compiled {result['compiled_per_second'] / 1e3:.0f}k/s ({result['speedup']:.1f}x), "
+            f"batch with targets/modifiers {result['batch_classify_per_second'] / 1e3:.0f}k/s, "
+            f"agreement {result['agreement'] * 100:.2f}%"
+        )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
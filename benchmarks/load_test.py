@@ -0,0 +1,129 @@
+"""Load test for ``server.SessionHost`` against a stub narrator (no network access).
+
+Run from the repository root:
+
+    python -m benchmarks.load_test --sessions 2000 --commands 20 --narration-delay 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from narrator import StubNarrator
+from server import SessionBusy, SessionHost
+
+
+COMMANDS = ("attack daisy", "attack daisy with a feint", "observe daisy", "heal")
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _client(host: SessionHost, commands: int, pipeline: int, latencies: List[float], counters: Dict[str, int]):
+    hosted = host.create_session()
+    script = itertools.cycle(COMMANDS)
+
+    async def send(command: str) -> None:
+        nonlocal hosted
+        while True:
+            started = time.perf_counter()
+            try:
+                outcome = await host.submit(hosted.session_id, command)
+            except SessionBusy:
+                counters["busy"] += 1
+                await asyncio.sleep(0.001)
+                continue
+            latencies.append(time.perf_counter() - started)
+            counters["turns"] += len(outcome.get("turns", []))
+            if outcome.get("game_over"):
+                host.close_session(hosted.session_id)
+                hosted = host.create_session()
+                counters["games"] += 1
+            return
+
+    for start in range(0, commands, pipeline):
+        batch = [send(next(script)) for _ in range(min(pipeline, commands - start))]
+        await asyncio.gather(*batch)
+
+
+async def run_load_test(
+    sessions: int = 500,
+    commands: int = 20,
+    pipeline: int = 1,
+    workers: int = 8,
+    queue_size: int = 16,
+    narration_delay: float = 0.05,
+    narration_limit: int = 64,
+) -> Dict[str, object]:
+    host = SessionHost(
+        narrator=StubNarrator(delay=narration_delay),
+        workers=workers,
+        queue_size=queue_size,
+        max_sessions=sessions * 2,
+        narration_limit=narration_limit,
+    )
+    await host.start()
+    latencies: List[float] = []
+    counters = {"turns": 0, "busy": 0, "games": 0}
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(host, commands, pipeline, latencies, counters) for _ in range(sessions)))
+    mechanics_elapsed = time.perf_counter() - started
+    await host.stop()
+    total_elapsed = time.perf_counter() - started
+
+    return {
+        "sessions": sessions,
+        "commands": len(latencies),
+        "turns": counters["turns"],
+        "completed_games": counters["games"],
+        "busy_retries": counters["busy"],
+        "commands_per_sec": len(latencies) / mechanics_elapsed if mechanics_elapsed else 0.0,
+        "turns_per_sec": counters["turns"] / mechanics_elapsed if mechanics_elapsed else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50) * 1000,
+            "p95": _percentile(latencies, 0.95) * 1000,
+            "p99": _percentile(latencies, 0.99) * 1000,
+            "mean": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        },
+        "mechanics_seconds": mechanics_elapsed,
+        "narration_drain_seconds": total_elapsed - mechanics_elapsed,
+        "host": host.stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--commands", type=int, default=20)
+    parser.add_argument("--pipeline", type=int, default=1, help="commands in flight per session")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--narration-delay", type=float, default=0.05)
+    parser.add_argument("--narration-limit", type=int, default=64)
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_load_test(
+            sessions=args.sessions,
+            commands=args.commands,
+            pipeline=args.pipeline,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            narration_delay=args.narration_delay,
+            narration_limit=args.narration_limit,
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark of exact matchup tables from ``probability`` against Monte Carlo simulation.
+
+Every character gets its own starting HP in ``--min-hp``..``--max-hp``. With the default
+``--archetypes 0`` every character also has its own scores; a positive value instead
+copies that many archetypes, so pairs share stats but not HP.
+
+Run from the repository root:
+
+    python -m benchmarks.matchups --characters 100
+    python -m benchmarks.matchups --characters 300 --archetypes 12
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+from typing import Dict
+
+from benchmarks.common import metadata, write_results
+from probability import _tables, duel_odds, matchup_table
+from roster import build_roster
+from simulator import simulate_duels
+
+
+def bench_matchups(
+    characters: int, archetypes: int, min_hp: int, max_hp: int, seed: int, trials: int
+) -> Dict[str, float]:
+    templates = build_roster(archetypes or characters, seed=seed)
+    rng = random.Random(seed)
+    roster = []
+    for index in range(characters):
+        character = copy.deepcopy(templates[index % len(templates)])
+        character.name = f"{character.name}-{index}"
+        character.health = rng.randint(min_hp, max_hp)
+        roster.append(character)
+
+    _tables.clear()
+    started = time.perf_counter()
+    odds = duel_odds(templates[0], templates[1])
+    single_duel = time.perf_counter() - started
+
+    started = time.perf_counter()
+    simulated = simulate_duels(templates[0], templates[1], trials=trials, seed=seed)
+    simulated_duel = time.perf_counter() - started
+
+    _tables.clear()
+    started = time.perf_counter()
+    matchup_table(roster)
+    table_elapsed = time.perf_counter() - started
+    return {
+        "characters": characters,
+        "solves": _tables.misses,
+        "exact_duel_ms": single_duel * 1e3,
+        "simulated_duel_ms": simulated_duel * 1e3,
+        "simulation_error": abs(odds.first_wins - simulated.win_rate(templates[0].name)),
+        "table_seconds": table_elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--characters", type=int, default=300)
+    parser.add_argument("--archetypes", type=int, default=0, help="0 gives every character its own scores")
+    parser.add_argument("--min-hp", type=int, default=15)
+    parser.add_argument("--max-hp", type=int, default=40)
+    parser.add_argument("--trials", type=int, default=100_000, help="Monte Carlo trials for the comparison duel")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="result file (default: bench_results/matchups-<rev>.json)")
+    args = parser.parse_args()
+
+    payload = {
+        "meta": metadata(
+            benchmark="matchups", seed=args.seed, archetypes=args.archetypes, min_hp=args.min_hp, max_hp=args.max_hp
+        ),
+        "matchups": bench_matchups(
+            args.characters, args.archetypes, args.min_hp, args.max_hp, args.seed, args.trials
+        ),
+    }
+    path = write_results("matchups", payload, args.output)
+    result = payload["matchups"]
+    print(
+        f"one duel: exact {result['exact_duel_ms']:.1f}ms vs {args.trials} simulated "
+        f"{result['simulated_duel_ms']:.1f}ms (|diff| {result['simulation_error']:.4f})"
+    )
+    print(
+        f"{result['characters']}x{result['characters']} table: {result['table_seconds']:.2f}s "
+        f"({result['solves']} tables solved)"
+    )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""AI-turn narration latency with and without speculative pre-narration.
+
+Plays the default CLI duel with a scripted player (attacking, or healing when low) and
+a fake narrator backend that takes ``--backend-ms`` per call. The player "types" for
+``--think-ms`` before each turn, which is when speculation runs.
+
+Run from the repository root:
+
+    python -m benchmarks.speculation --games 20 --backend-ms 300 --think-ms 1000
+
+``--calls-per-minute`` defaults high so the run measures hit rate rather than the cap.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.common import metadata, summarize, write_results
+from main import AI_ATTACK_INTENT, AI_HEAL_INTENT, ai_intent, build_default_session
+from narrator import Narrator
+from speculation import SpeculativeNarrator
+
+
+class SlowBackend:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def narrate(self, event, action_text):
+        return self.narrate_structured(event, action_text, "", None)["narrative"]
+
+    def narrate_structured(self, event, action_text, mechanics_summary, scene_state):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {
+            **Narrator._fallback_structured(event, action_text),
+            "narrative": f"Narrated: {event.actor} {event.action}",
+            # like an LLM narrator, move the scene on every turn
+            "scene_overview_update": f"The duel continues after {event.actor}'s {event.action}.",
+        }
+
+
+def play(games: int, seed: int, backend_ms: float, think_ms: float, speculate: bool, **caps) -> Dict[str, object]:
+    backend = SlowBackend(backend_ms / 1e3)
+    speculator = SpeculativeNarrator(backend, **caps) if speculate else None
+    latencies: List[float] = []
+    ai_turns = 0
+    for game in range(games):
+        session, player = build_default_session(narrator=speculator or backend)
+        session.engine._rng = random.Random(seed + game)
+        ai = next(c.name for c in session.engine.turn_order if c.name != player)
+        while session.encounter.is_alive(player) and session.encounter.is_alive(ai):
+            if speculator is not None:
+                speculator.speculate(session, ai, player, AI_HEAL_INTENT, AI_ATTACK_INTENT)
+            time.sleep(think_ms / 1e3)
+            intent = "I heal" if session.engine.characters[player.lower()].health <= 7 else "I attack"
+            session.process_turn(player, player if intent == "I heal" else ai, intent)
+            if not session.encounter.is_alive(ai):
+                break
+            started = time.perf_counter()
+            session.process_turn(*ai_intent(session, ai, player))
+            latencies.append(time.perf_counter() - started)
+            ai_turns += 1
+    result: Dict[str, object] = {
+        "ai_turns": ai_turns,
+        "backend_calls_per_turn": backend.calls / max(1, 2 * ai_turns),
+        "ai_turn_latency": summarize(latencies),
+    }
+    if speculator is not None:
+        stats = speculator.stats
+        result.update(hit_rate=stats.hit_rate, prefetched=stats.prefetched, wasted=stats.wasted)
+        speculator.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--backend-ms", type=float, default=300.0)
+    parser.add_argument("--think-ms", type=float, default=1000.0)
+    parser.add_argument("--max-candidates", type=int, default=3)
+    parser.add_argument("--calls-per-minute", type=int, default=1000, help="speculative call budget")
+    parser.add_argument("--output", help="result file (default: bench_results/speculation-<rev>.json)")
+    args = parser.parse_args()
+
+    settings = dict(seed=args.seed, backend_ms=args.backend_ms, think_ms=args.think_ms)
+    payload = {
+        "meta": metadata(
+            benchmark="speculation",
+            games=args.games,
+            max_candidates=args.max_candidates,
+            calls_per_minute=args.calls_per_minute,
+            **settings,
+        ),
+        "baseline": play(args.games, speculate=False, **settings),
+        "speculative": play(
+            args.games,
+            speculate=True,
+            max_candidates=args.max_candidates,
+            max_calls_per_minute=args.calls_per_minute,
+            **settings,
+        ),
+    }
+    path = write_results("speculation", payload, args.output)
+    for mode in ("baseline", "speculative"):
+        result = payload[mode]
+        latency = result["ai_turn_latency"]
+        extra = f", hit rate {result['hit_rate'] * 100:.0f}%" if "hit_rate" in result else ""
+        print(
+            f"{mode:>11}: AI turn p50 {latency['p50_us'] / 1e3:.1f}ms p90 {latency['p90_us'] / 1e3:.1f}ms, "
+            f"{result['backend_calls_per_turn']:.2f} backend calls per turn{extra}"
+        )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Cold-start cost of short-lived worker processes: import time and first-turn latency.
+
+Each run starts a fresh interpreter that imports ``main``, builds the CLI duel and plays
+one turn, reporting the time of each step and which heavy modules ended up loaded.
+``offline`` narrates with the template narrator only; ``default`` uses the default
+session narrator with no API key set. ``--root`` points at another checkout to measure
+an older revision with the same probe.
+
+Run from the repository root:
+
+    python -m benchmarks.startup --runs 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.common import compare, metadata, write_results
+
+HEAVY_MODULES = ("openai", "numpy", "asyncio", "sqlite3")
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+narrator = None
+if {offline!r}:
+    from template_narrator import TemplateNarrator
+    narrator = TemplateNarrator()
+session, player = main.build_default_session(narrator=narrator)
+built = time.perf_counter()
+session.process_turn(player, "Daisy", "I attack")
+played = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1e3,
+    "build_ms": (built - imported) * 1e3,
+    "first_turn_ms": (played - built) * 1e3,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def bench_mode(root: str, offline: bool, runs: int) -> Dict[str, object]:
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    probe = PROBE.format(offline=offline, heavy=HEAVY_MODULES)
+    samples: List[Dict[str, object]] = []
+    walls: List[float] = []
+    for _ in range(runs + 1):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", probe], cwd=root, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        walls.append((time.perf_counter() - started) * 1e3)
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    # the first run compiles bytecode; later runs are the cold starts workers see
+    samples, walls = samples[1:], walls[1:]
+    result: Dict[str, object] = {
+        key: statistics.median(sample[key] for sample in samples) for key in ("import_ms", "build_ms", "first_turn_ms")
+    }
+    result["process_ms"] = statistics.median(walls)
+    result["loaded"] = sorted({name for sample in samples for name in sample["loaded"]})
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--root", default=".", help="checkout to measure (default: this one)")
+    parser.add_argument("--output", help="result file (default: bench_results/startup-<rev>.json)")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    args = parser.parse_args()
+
+    payload = {
+        "meta": metadata(benchmark="startup", runs=args.runs, root=os.path.abspath(args.root)),
+        "modes": {mode: bench_mode(args.root, mode == "offline", args.runs) for mode in ("offline", "default")},
+    }
+    path = write_results("startup", payload, args.output)
+    for mode, result in payload["modes"].items():
+        print(
+            f"{mode:>8}: import {result['import_ms']:.1f}ms, first turn {result['first_turn_ms']:.2f}ms, "
+            f"process {result['process_ms']:.0f}ms, heavy modules loaded: {', '.join(result['loaded']) or 'none'}"
+        )
+    print(f"results written to {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            for line in compare(json.load(handle), payload):
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
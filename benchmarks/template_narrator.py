@@ -0,0 +1,105 @@
+"""Template narration cost and LLM call volume with escalation only for notable beats.
+
+Plays scripted duels from the CLI roster with a counting stand-in for the LLM narrator
+and reports how many turns still reach it, plus the per-call cost of template
+narration next to the fixed fallback sentence.
+
+Run from the repository root:
+
+    python -m benchmarks.template_narrator --games 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import Counter
+from typing import Dict, List
+
+from benchmarks.common import metadata, summarize, write_results
+from instrumentation import Instrumentation
+from main import ai_intent, build_default_session
+from narrator import Narrator, StubNarrator
+from template_narrator import EscalatingNarrator, TemplateNarrator
+
+
+def _count_route(reasons: Counter, record: dict) -> None:
+    if record["name"] == "narration_route" and record["labels"].get("route") == "llm":
+        reasons[record["labels"]["reason"]] += record["value"]
+
+
+def bench_routing(games: int, seed: int) -> Dict[str, object]:
+    remote = StubNarrator()
+    reasons: Counter = Counter()
+    sink = type("RouteSink", (), {"emit": lambda self, record: _count_route(reasons, record)})()
+    narrator = EscalatingNarrator(TemplateNarrator(seed=seed), remote, instrumentation=Instrumentation(sink))
+    turns = 0
+    for game in range(games):
+        session, player = build_default_session(narrator=narrator)
+        session.engine._rng = random.Random(seed + game)
+        ai = next(c.name for c in session.engine.turn_order if c.name != player)
+        while session.encounter.is_alive(player) and session.encounter.is_alive(ai):
+            intent = "I heal" if session.engine.characters[player.lower()].health <= 7 else "I attack"
+            session.process_turn(player, player if intent == "I heal" else ai, intent)
+            turns += 1
+            if session.encounter.is_alive(ai):
+                session.process_turn(*ai_intent(session, ai, player))
+                turns += 1
+    return {"turns": turns, "llm_calls": remote.calls, "llm_share": remote.calls / max(1, turns), "reasons": dict(reasons)}
+
+
+def bench_latency(calls: int, seed: int) -> Dict[str, object]:
+    session, _ = build_default_session(narrator=StubNarrator())
+    session.engine._rng = random.Random(seed)
+    samples = []
+    for _ in range(64):
+        event = session.engine.perform_action("Sturm", "Daisy", "I attack")
+        samples.append((event, session._scene_snapshot()))
+    narrator = TemplateNarrator(seed=seed)
+    results: Dict[str, object] = {}
+    for label, narrate in (
+        ("fallback", lambda event, scene: Narrator._fallback_structured(event, "I attack")),
+        ("template", lambda event, scene: narrator.narrate_structured(event, "I attack", "", scene)),
+    ):
+        latencies: List[float] = []
+        variants = set()
+        for index in range(calls):
+            event, scene = samples[index % len(samples)]
+            scene = {**scene, "turn": index}
+            started = time.perf_counter()
+            result = narrate(event, scene)
+            latencies.append(time.perf_counter() - started)
+            variants.add(result["narrative"])
+        results[label] = {"latency": summarize(latencies), "distinct_narratives": len(variants)}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="result file (default: bench_results/template_narrator-<rev>.json)")
+    args = parser.parse_args()
+
+    payload = {
+        "meta": metadata(benchmark="template_narrator", games=args.games, calls=args.calls, seed=args.seed),
+        "routing": bench_routing(args.games, args.seed),
+        "latency": bench_latency(args.calls, args.seed),
+    }
+    path = write_results("template_narrator", payload, args.output)
+    routing = payload["routing"]
+    print(
+        f"{routing['llm_calls']}/{routing['turns']} turns reached the LLM ({routing['llm_share'] * 100:.1f}%): "
+        + ", ".join(f"{reason} {count}" for reason, count in sorted(routing["reasons"].items()))
+    )
+    for label, result in payload["latency"].items():
+        print(
+            f"{label:>8}: p50 {result['latency']['p50_us']:.1f}us p90 {result['latency']['p90_us']:.1f}us, "
+            f"{result['distinct_narratives']} distinct narratives"
+        )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Wall-time scaling of ``tournament.run_tournament`` with the number of worker processes.
+
+Run from the repository root:
+
+    python -m benchmarks.tournament_scaling --roster-size 16 --workers 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.common import metadata, write_results
+from roster import build_roster
+from tournament import TournamentConfig, run_tournament
+
+
+def bench_scaling(roster_size: int, worker_counts: List[int], config: TournamentConfig) -> Dict[str, Dict[str, float]]:
+    roster = build_roster(roster_size, seed=config.seed)
+    results: Dict[str, Dict[str, float]] = {}
+    serial = None
+    for workers in sorted(set(worker_counts) | {1}):
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            shards = run_tournament(roster, os.path.join(directory, "tournament.jsonl"), config, workers=workers)
+            elapsed = time.perf_counter() - started
+        serial = serial or elapsed
+        results[str(workers)] = {
+            "seconds": elapsed,
+            "duels_per_sec": sum(shard.trials for shard in shards) / elapsed,
+            "speedup": serial / elapsed,
+            "efficiency": serial / elapsed / workers,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roster-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--trials", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="result file (default: bench_results/tournament_scaling-<rev>.json)")
+    args = parser.parse_args()
+
+    config = TournamentConfig(seed=args.seed, shards_per_pair=args.shards, trials_per_shard=args.trials)
+    payload = {
+        "meta": metadata(benchmark="tournament_scaling", cpus=os.cpu_count(), **config.to_dict()),
+        "workers": bench_scaling(args.roster_size, args.workers, config),
+    }
+    path = write_results("tournament_scaling", payload, args.output)
+    for count, result in payload["workers"].items():
+        print(
+            f"{count:>3} workers: {result['seconds']:.2f}s, {result['duels_per_sec']:.0f} duels/s, "
+            f"speedup x{result['speedup']:.2f} (efficiency {result['efficiency'] * 100:.0f}%)"
+        )
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
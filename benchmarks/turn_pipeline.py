@@ -0,0 +1,196 @@
+"""Benchmark of ``AdventureSession.process_turn`` broken down by pipeline stage.
+
+Run from the repository root:
+
+    python -m benchmarks.turn_pipeline --turns 2000
+    python -m benchmarks.turn_pipeline --compare bench_results/turn_pipeline-<rev>.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.common import compare, metadata, summarize, write_results
+from instrumentation import PrometheusSink
+from narrator import Narrator, StubNarrator
+from roster import build_roster
+from scene import SceneRef
+from session import AdventureSession, TurnResult
+
+
+ENCOUNTER_SIZES = (2, 10, 100)
+INTENTS = ("I attack with everything I have", "I swing at them", "I heal and recover", "I observe their stance")
+FAKE_RESPONSE = json.dumps(
+    {
+        "narrative": "Steel rings against steel as the blow lands.",
+        "scene_overview_update": "",
+        "state_notes": ["Sparks scatter across the floor."],
+        "image_prompt_addendum": "Sparks and motion blur.",
+    }
+)
+
+
+class _FakeResponses:
+    def create(self, **kwargs):
+        return type("Response", (), {"output_text": FAKE_RESPONSE})()
+
+
+def make_narrator(kind: str):
+    if kind == "stub":
+        return StubNarrator()
+    narrator = Narrator()
+    narrator._client = type("FakeClient", (), {"responses": _FakeResponses()})()
+    return narrator
+
+
+def _script(session: AdventureSession, rng: random.Random) -> Tuple[str, str, str]:
+    roster = session.engine.turn_order
+    actor = roster[session.turn_number % len(roster)]
+    target = roster[(session.turn_number + 1 + rng.randrange(len(roster) - 1)) % len(roster)]
+    return actor.name, target.name, INTENTS[rng.randrange(len(INTENTS))]
+
+
+def staged_turn(session: AdventureSession, actor: str, target: str, intent: str, timings: Dict[str, List[float]]) -> TurnResult:
+    """Mirror of ``process_turn`` with a timer around every stage."""
+    clock = time.perf_counter
+
+    def timed(stage: str, fn: Callable, *args):
+        started = clock()
+        value = fn(*args)
+        timings[stage].append(clock() - started)
+        return value
+
+    turn_started = clock()
+    actor_character = session.engine.characters[actor.lower()]
+    target_character = session.engine.characters[target.lower()]
+    actor_hp_before, target_hp_before = actor_character.health, target_character.health
+    event = timed("perform_action", session.engine.perform_action, actor, target, intent)
+    session._cap_healing(actor_character.name, actor_hp_before, event)
+    timed("scene_update", session.scene.update, actor_character.name, target_character.name)
+    session.turn_number += 1
+    mechanics = timed("mechanics_summary", session._mechanics_summary, event)
+    state_delta = timed("state_delta", session._state_delta, event, actor_hp_before, target_hp_before)
+    scene = timed("scene_state", session._scene_snapshot)
+    directives = timed("narrator", session._narrator_directives, event, intent, mechanics, scene)
+    session._apply_scene_overview_update(directives.get("scene_overview_update", ""), session.turn_number)
+    scene_after = SceneRef(session.scene, session.scene.version, session.turn_number, session.scene_overview)
+    image_prompt = timed(
+        "image_prompt",
+        session._image_prompt,
+        event,
+        intent,
+        directives["narrative"],
+        directives.get("image_prompt_addendum", ""),
+    )
+    result = TurnResult(
+        event=event,
+        mechanics_summary=mechanics,
+        state_delta=state_delta,
+        scene=scene_after,
+        narrative=directives["narrative"],
+        image_prompt=image_prompt,
+        ai_state_notes=directives.get("state_notes", []),
+        intent=intent,
+    )
+    session.history.append(result)
+    timings["total"].append(clock() - turn_started)
+    return result
+
+
+def _new_session(size: int, seed: int, narrator_kind: str) -> AdventureSession:
+    return AdventureSession(
+        build_roster(size, seed=seed, health=10**6),
+        narrator=make_narrator(narrator_kind),
+        rng=random.Random(seed),
+    )
+
+
+def bench_encounter(size: int, turns: int, seed: int, narrator_kind: str) -> Dict[str, object]:
+    timings: Dict[str, List[float]] = {
+        stage: []
+        for stage in ("perform_action", "mechanics_summary", "state_delta", "scene_update", "scene_state", "narrator", "image_prompt", "total")
+    }
+    session = _new_session(size, seed, narrator_kind)
+    script_rng = random.Random(seed)
+    for _ in range(turns):
+        staged_turn(session, *_script(session, script_rng), timings)
+
+    session = _new_session(size, seed, narrator_kind)
+    script_rng = random.Random(seed)
+    inputs = [None] * turns
+    started = time.perf_counter()
+    for index in range(turns):
+        inputs[index] = _script(session, script_rng)
+        session.process_turn(*inputs[index])
+    elapsed = time.perf_counter() - started
+
+    session = _new_session(size, seed, narrator_kind)
+    session.instrumentation.add_sink(PrometheusSink())
+    session.narrator.instrumentation = session.instrumentation
+    script_rng = random.Random(seed)
+    started = time.perf_counter()
+    for _ in range(turns):
+        session.process_turn(*_script(session, script_rng))
+    instrumented_elapsed = time.perf_counter() - started
+
+    session = _new_session(size, seed, narrator_kind)
+    script_rng = random.Random(seed)
+    peaks = []
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in range(turns):
+        turn_input = _script(session, script_rng)
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        session.process_turn(*turn_input)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    return {
+        "combatants": size,
+        "turns": turns,
+        "turns_per_sec": turns / elapsed if elapsed else 0.0,
+        "turns_per_sec_with_sink": turns / instrumented_elapsed if instrumented_elapsed else 0.0,
+        "stages": {stage: summarize(samples) for stage, samples in timings.items()},
+        "memory": {
+            "peak_bytes_per_turn": sum(peaks) / len(peaks) if peaks else 0.0,
+            "retained_bytes_per_turn": retained / turns if turns else 0.0,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(ENCOUNTER_SIZES))
+    parser.add_argument("--narrator", choices=("stub", "fake-llm"), default="fake-llm")
+    parser.add_argument("--output", help="result file (default: bench_results/turn_pipeline-<rev>.json)")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    args = parser.parse_args()
+
+    payload = {
+        "meta": metadata(benchmark="turn_pipeline", seed=args.seed, narrator=args.narrator),
+        "encounters": {
+            str(size): bench_encounter(size, args.turns, args.seed, args.narrator) for size in args.sizes
+        },
+    }
+    path = write_results("turn_pipeline", payload, args.output)
+    for size, result in payload["encounters"].items():
+        stages = ", ".join(f"{stage}={stats['p50_us']:.1f}us" for stage, stats in result["stages"].items())
+        print(f"{size:>4} combatants: {result['turns_per_sec']:.0f} turns/s | p50 {stages}")
+    print(f"results written to {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            for line in compare(json.load(handle), payload):
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
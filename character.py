@@ -1,9 +1,9 @@
 import random
 from dataclasses import dataclass
-from equipment import Weapon, Armor
+from equipment import Armor, RevisionTracked, Weapon
 
 @dataclass
-class AbilityScores:
+class AbilityScores(RevisionTracked):
     strength: int
     dexterity: int
     constitution: int
@@ -23,3 +23,40 @@ class Character:
     weapon: Weapon = None
     armor: Armor = None
 
+    # filled in by combat_profile.combat_profile, dropped when the fields it reads change
+    _combat_profile = None
+
+    def invalidate(self) -> None:
+        """Drop the cached combat profile; called by the scores and equipment on mutation."""
+        self._combat_profile = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_combat_profile"] = None
+        return state
+
+
+class _ProfileInput:
+    """Character field read by the combat profile: assigning it drops the cached profile.
+
+    The value is stored under a private name with a plain attribute store, so only these
+    three fields pay for the descriptor and ``health`` writes stay fast.
+    """
+
+    def __init__(self, name):
+        self.private = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return getattr(instance, self.private)
+
+    def __set__(self, instance, value):
+        setattr(instance, self.private, value)
+        instance._combat_profile = None
+
+
+for _name in ("ability_scores", "weapon", "armor"):
+    setattr(Character, _name, _ProfileInput(_name))
+del _name
+
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterator, List, Optional, Union
+
+from game_engine import CombatEvent, DiceRoll
+
+
+_HIT_CODES = {None: -1, False: 0, True: 1}
+_HIT_VALUES = {-1: None, 0: False, 1: True}
+_INT_COLUMNS = ("actor_id", "target_id", "action_id", "hit", "damage", "actor_hp", "target_hp", "roll_offset", "roll_count")
+
+
+class CombatLogView:
+    """Lazy window over a ``CombatLog``; events are only built when indexed or iterated."""
+
+    def __init__(self, log: "CombatLog", indices: range):
+        self._log = log
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CombatEvent, "CombatLogView"]:
+        if isinstance(index, slice):
+            return CombatLogView(self._log, self._indices[index])
+        return self._log[self._indices[index]]
+
+    def __iter__(self) -> Iterator[CombatEvent]:
+        for index in self._indices:
+            yield self._log[index]
+
+
+class CombatLog:
+    """Struct-of-arrays combat log that can stand in for ``GameEngine.log``.
+
+    Each event is stored as a row of fixed-width integers (interned actor/target/action
+    ids, hit as -1/0/1, damage and HP), and dice go into one packed buffer laid out as
+    ``num, sides, modifier, die...`` per roll. ``CombatEvent`` objects are rebuilt on
+    access, so mutating one does not change the log; assign it back to update a row.
+
+    With ``capacity`` set the log keeps only the most recent ``capacity`` events.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        if capacity is not None and capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.names: List[str] = []
+        self.actions: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._action_ids: Dict[str, int] = {}
+        self.actor_id = array("i")
+        self.target_id = array("i")
+        self.action_id = array("b")
+        self.hit = array("b")
+        self.damage = array("i")
+        self.actor_hp = array("i")
+        self.target_hp = array("i")
+        self.roll_offset = array("q")
+        self.roll_count = array("B")
+        self.rolls = array("i")
+        self._start = 0
+        self._roll_base = 0
+        self.dropped = 0
+
+    def _intern(self, value: str, table: List[str], ids: Dict[str, int]) -> int:
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(table)
+            table.append(value)
+        return index
+
+    def name_id(self, name: str) -> int:
+        return self._intern(name, self.names, self._name_ids)
+
+    def action_code(self, action: str) -> int:
+        return self._intern(action, self.actions, self._action_ids)
+
+    def append(self, event: CombatEvent) -> None:
+        self.actor_id.append(self.name_id(event.actor))
+        self.target_id.append(self.name_id(event.target))
+        self.action_id.append(self.action_code(event.action))
+        self.hit.append(_HIT_CODES[event.hit])
+        self.damage.append(event.damage)
+        self.actor_hp.append(event.actor_hp)
+        self.target_hp.append(event.target_hp)
+        self.roll_offset.append(self._roll_base + len(self.rolls))
+        self.roll_count.append(len(event.rolls))
+        for roll in event.rolls:
+            self._pack_roll(roll)
+
+        if self.capacity is not None and len(self) > self.capacity:
+            self._start += 1
+            self.dropped += 1
+            if self._start >= self.capacity:
+                self._compact()
+
+    @staticmethod
+    def _roll_sides(roll: DiceRoll) -> int:
+        num, _, sides = roll.formula.partition("d")
+        if not num.isdigit() or not sides.isdigit() or int(num) != len(roll.rolls):
+            raise ValueError(f"cannot pack dice formula {roll.formula!r}")
+        return int(sides)
+
+    def _pack_roll(self, roll: DiceRoll) -> None:
+        sides = self._roll_sides(roll)
+        self.rolls.append(len(roll.rolls))
+        self.rolls.append(sides)
+        self.rolls.append(roll.modifier)
+        self.rolls.extend(roll.rolls)
+
+    def _compact(self) -> None:
+        start = self._start
+        for name in _INT_COLUMNS:
+            setattr(self, name, getattr(self, name)[start:])
+        first_roll = self.roll_offset[0] - self._roll_base if self.roll_offset else len(self.rolls)
+        self.rolls = self.rolls[first_roll:]
+        self._roll_base += first_roll
+        self._start = 0
+
+    def _unpack_rolls(self, row: int) -> List[DiceRoll]:
+        position = self.roll_offset[row] - self._roll_base
+        rolls = []
+        for _ in range(self.roll_count[row]):
+            num, sides, modifier = self.rolls[position], self.rolls[position + 1], self.rolls[position + 2]
+            position += 3
+            rolls.append(
+                DiceRoll(formula=f"{num}d{sides}", rolls=self.rolls[position : position + num].tolist(), modifier=modifier)
+            )
+            position += num
+        return rolls
+
+    def _row(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("combat log index out of range")
+        return self._start + index
+
+    def __len__(self) -> int:
+        return len(self.damage) - self._start
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CombatEvent, CombatLogView]:
+        if isinstance(index, slice):
+            return CombatLogView(self, range(len(self))[index])
+        row = self._row(index)
+        return CombatEvent(
+            actor=self.names[self.actor_id[row]],
+            target=self.names[self.target_id[row]],
+            action=self.actions[self.action_id[row]],
+            hit=_HIT_VALUES[self.hit[row]],
+            damage=self.damage[row],
+            actor_hp=self.actor_hp[row],
+            target_hp=self.target_hp[row],
+            rolls=self._unpack_rolls(row),
+        )
+
+    def __setitem__(self, index: int, event: CombatEvent) -> None:
+        row = self._row(index)
+        if row == len(self.damage) - 1:
+            del self.rolls[self.roll_offset[row] - self._roll_base :]
+            for name in _INT_COLUMNS:
+                del getattr(self, name)[row]
+            self.append(event)
+            return
+        if [len(r.rolls) for r in event.rolls] != [len(r.rolls) for r in self._unpack_rolls(row)]:
+            raise ValueError("replacing an earlier event requires the same dice layout")
+        sides = [self._roll_sides(roll) for roll in event.rolls]
+        self.actor_id[row] = self.name_id(event.actor)
+        self.target_id[row] = self.name_id(event.target)
+        self.action_id[row] = self.action_code(event.action)
+        self.hit[row] = _HIT_CODES[event.hit]
+        self.damage[row] = event.damage
+        self.actor_hp[row] = event.actor_hp
+        self.target_hp[row] = event.target_hp
+        position = self.roll_offset[row] - self._roll_base
+        for roll, roll_sides in zip(event.rolls, sides):
+            self.rolls[position + 1] = roll_sides
+            self.rolls[position + 2] = roll.modifier
+            self.rolls[position + 3 : position + 3 + len(roll.rolls)] = array("i", roll.rolls)
+            position += 3 + len(roll.rolls)
+
+    def __iter__(self) -> Iterator[CombatEvent]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def column(self, name: str) -> memoryview:
+        """Zero-copy view of one integer column for the retained events."""
+        if name not in _INT_COLUMNS:
+            raise KeyError(name)
+        return memoryview(getattr(self, name))[self._start :]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(getattr(self, name)) * getattr(self, name).itemsize for name in _INT_COLUMNS) + (
+            len(self.rolls) * self.rolls.itemsize
+        )
+
+    def clear(self) -> None:
+        """Drop every event and interned name; ``capacity`` is kept.
+
+        Containers are replaced rather than emptied in place, so ``column`` views handed
+        out earlier keep the old data instead of making the resize fail.
+        """
+        for name in _INT_COLUMNS + ("rolls",):
+            setattr(self, name, array(getattr(self, name).typecode))
+        self.names, self.actions = [], []
+        self._name_ids, self._action_ids = {}, {}
+        self._start = 0
+        self._roll_base = 0
+        self.dropped = 0
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from character import AbilityScores, Character
+from equipment import Armor, Weapon
+
+
+@dataclass(frozen=True)
+class CombatProfile:
+    """Health-independent combat numbers for one character."""
+
+    strength_mod: int
+    dexterity_mod: int
+    constitution_mod: int
+    armor_class: int
+    to_hit: int
+    damage_sides: Optional[int]
+    min_damage: Optional[int]
+    damage_formula: Optional[str]
+    ability_scores: AbilityScores
+    weapon: Optional[Weapon]
+    armor: Optional[Armor]
+
+
+def _modifier(score: int) -> int:
+    return (score - 10) // 2
+
+
+def combat_profile(character: Character) -> CombatProfile:
+    """Cached profile for ``character``, rebuilt when its scores or equipment change.
+
+    The cache hit is a single attribute read: swapping ``ability_scores``, ``weapon`` or
+    ``armor`` drops the profile in ``Character.__setattr__``, and editing a field of one
+    of those objects drops it through the object's dependents, so other characters'
+    profiles stay valid. Health is not part of the profile, so damage and healing never
+    invalidate it.
+    """
+    profile = character._combat_profile
+    if profile is not None:
+        return profile
+
+    scores, weapon, armor = character.ability_scores, character.weapon, character.armor
+    strength_mod = _modifier(scores.strength)
+    dexterity_mod = _modifier(scores.dexterity)
+    profile = CombatProfile(
+        strength_mod=strength_mod,
+        dexterity_mod=dexterity_mod,
+        constitution_mod=_modifier(scores.constitution),
+        armor_class=10 + dexterity_mod + (armor.protection if armor else 0),
+        to_hit=strength_mod + 2,
+        damage_sides=weapon.max_damage if weapon is not None else None,
+        min_damage=weapon.min_damage if weapon is not None else None,
+        damage_formula=f"1d{weapon.max_damage}" if weapon is not None else None,
+        ability_scores=scores,
+        weapon=weapon,
+        armor=armor,
+    )
+    for tracked in (scores, weapon, armor):
+        if tracked is not None:
+            tracked.add_dependent(character)
+    character._combat_profile = profile
+    return profile
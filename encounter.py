@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from character import Character
+from combat_profile import combat_profile
+
+
+class Encounter:
+    """Initiative scheduler with alive indexes for large, multi-faction fights.
+
+    Initiative (d20 + dexterity modifier) is rolled once. Turns come off a heap keyed
+    by (round, initiative), defeated combatants are dropped from the alive indexes as
+    they fall and their heap entries are skipped lazily. The indexes keep the living in
+    roster order, overall and per faction (factions with nobody standing are dropped),
+    so listing survivors and checking whether the fight is over never rescan or sort
+    the roster. A sorted name index answers target lookups by exact name or prefix.
+    Without ``factions`` every combatant is its own faction (free-for-all).
+    """
+
+    def __init__(
+        self,
+        characters: Iterable[Character],
+        factions: Optional[Dict[str, str]] = None,
+        rng: Optional[random.Random] = None,
+        initiative: Optional[Dict[str, int]] = None,
+    ):
+        self._rng = rng or random.Random()
+        self.order: List[Character] = list(characters)
+        self.characters: Dict[str, Character] = {c.name.lower(): c for c in self.order}
+        factions = {name.lower(): faction for name, faction in (factions or {}).items()}
+        self.faction_of: Dict[str, str] = {key: factions.get(key, c.name) for key, c in self.characters.items()}
+        self._position = {key: index for index, key in enumerate(self.characters)}
+        self._roster: List[Character] = list(self.characters.values())
+
+        self.initiative: Dict[str, int] = {}
+        for key, character in self.characters.items():
+            if initiative and character.name in initiative:
+                self.initiative[key] = initiative[character.name]
+            else:
+                self.initiative[key] = self._rng.randint(1, 20) + combat_profile(character).dexterity_mod
+        self._tiebreak = {key: self._rng.random() for key in self.characters}
+
+        self._alive: Dict[str, Character] = {}
+        # roster positions of the living, kept sorted; factions appear only while non-empty
+        self._alive_positions: List[int] = []
+        self._faction_alive: Dict[str, List[int]] = {}
+        self._alive_names: Optional[List[str]] = None
+        self._sorted_alive: List[str] = []
+        self._generation: Dict[str, int] = {key: 0 for key in self.characters}
+        self._heap: List[Tuple[int, int, int, float, int, str]] = []
+        self.round = 0
+        for key, character in self.characters.items():
+            if character.health > 0:
+                self._add_alive(key)
+                self._push(key, 0)
+
+    def _push(self, key: str, round_number: int) -> None:
+        character = self.characters[key]
+        heapq.heappush(
+            self._heap,
+            (
+                round_number,
+                -self.initiative[key],
+                -character.ability_scores.dexterity,
+                self._tiebreak[key],
+                self._generation[key],
+                key,
+            ),
+        )
+
+    def _add_alive(self, key: str) -> None:
+        position = self._position[key]
+        self._alive[key] = self.characters[key]
+        bisect.insort(self._alive_positions, position)
+        bisect.insort(self._faction_alive.setdefault(self.faction_of[key], []), position)
+        bisect.insort(self._sorted_alive, key)
+        self._alive_names = None
+
+    def _remove_alive(self, key: str) -> None:
+        position = self._position[key]
+        del self._alive[key]
+        del self._alive_positions[bisect.bisect_left(self._alive_positions, position)]
+        faction = self.faction_of[key]
+        members = self._faction_alive[faction]
+        del members[bisect.bisect_left(members, position)]
+        if not members:
+            del self._faction_alive[faction]
+        del self._sorted_alive[bisect.bisect_left(self._sorted_alive, key)]
+        self._generation[key] += 1
+        self._alive_names = None
+
+    def refresh(self, *names: str) -> None:
+        """Re-check the health of ``names`` after a turn and update the indexes."""
+        for name in names:
+            key = name.lower()
+            alive = self.characters[key].health > 0
+            if alive and key not in self._alive:
+                self._add_alive(key)
+                self._push(key, self.round + 1)
+            elif not alive and key in self._alive:
+                self._remove_alive(key)
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap and (heap[0][5] not in self._alive or heap[0][4] != self._generation[heap[0][5]]):
+            heapq.heappop(heap)
+
+    def current(self) -> Optional[Character]:
+        """The combatant whose turn it is, or None when nobody is left standing."""
+        self._drop_stale()
+        if not self._heap:
+            return None
+        self.round = self._heap[0][0]
+        return self.characters[self._heap[0][5]]
+
+    def advance(self) -> Optional[Character]:
+        """Finish the current combatant's turn and return the next one."""
+        self._drop_stale()
+        if self._heap:
+            entry = heapq.heappop(self._heap)
+            self._push(entry[5], entry[0] + 1)
+        return self.current()
+
+    def upcoming(self) -> Optional[Character]:
+        """Who acts after the current combatant, if nobody falls or revives meanwhile."""
+        self._drop_stale()
+        if not self._heap:
+            return None
+        top = self._heap[0]
+        requeued = (top[0] + 1,) + top[1:]
+        entry = min(
+            (
+                entry
+                for entry in self._heap[1:]
+                if entry[5] in self._alive and entry[4] == self._generation[entry[5]]
+            ),
+            default=requeued,
+        )
+        return self.characters[min(entry, requeued)[5]]
+
+    def is_alive(self, name: str) -> bool:
+        return name.lower() in self._alive
+
+    def alive_names(self) -> List[str]:
+        """Living combatants in roster order (rebuilt only after someone falls or revives)."""
+        if self._alive_names is None:
+            self._alive_names = [self._roster[position].name for position in self._alive_positions]
+        return list(self._alive_names)
+
+    def faction_alive(self, faction: str) -> List[str]:
+        return [self._roster[position].name for position in self._faction_alive.get(faction, ())]
+
+    def living_factions(self) -> List[str]:
+        return list(self._faction_alive)
+
+    def is_over(self) -> bool:
+        return len(self._faction_alive) <= 1
+
+    def is_enemy(self, actor_name: str, other_name: str) -> bool:
+        return self.faction_of[actor_name.lower()] != self.faction_of[other_name.lower()]
+
+    def resolve_target(self, token: str, actor_name: str) -> Optional[str]:
+        """Living combatant named ``token`` (exact, then shortest-key prefix), never the actor."""
+        token = token.strip().lower()
+        actor_key = actor_name.lower()
+        if not token:
+            return None
+        exact = self._alive.get(token)
+        if exact is not None and token != actor_key:
+            return exact.name
+        index = bisect.bisect_left(self._sorted_alive, token)
+        matches = []
+        while index < len(self._sorted_alive) and self._sorted_alive[index].startswith(token):
+            if self._sorted_alive[index] != actor_key:
+                matches.append(self._sorted_alive[index])
+            index += 1
+        if not matches:
+            return None
+        return self.characters[min(matches, key=self._position.__getitem__)].name
+
+    def default_target(self, actor_name: str) -> Optional[str]:
+        """First living enemy of ``actor_name`` in roster order."""
+        actor_faction = self.faction_of[actor_name.lower()]
+        best = min(
+            (members[0] for faction, members in self._faction_alive.items() if faction != actor_faction),
+            default=None,
+        )
+        return self._roster[best].name if best is not None else None
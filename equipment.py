@@ -1,8 +1,51 @@
 import random
+import weakref
 from dataclasses import dataclass
 
+
+class RevisionTracked:
+    """Counts its own mutations and invalidates dependents, so derived data is dropped per object.
+
+    Fields set for the first time (i.e. during ``__init__``) do not count: no cache can
+    depend on an object that is still being built. Dependents registered with
+    ``add_dependent`` are held weakly, have ``invalidate()`` called on every counted
+    mutation and are not carried over to copies.
+    """
+
+    _revision = 0
+    _dependents = None
+
+    @property
+    def revision(self) -> int:
+        """Number of times a field of this object has been reassigned."""
+        return self._revision
+
+    def add_dependent(self, dependent) -> None:
+        """Call ``dependent.invalidate()`` whenever a field of this object is reassigned."""
+        if self._dependents is None:
+            object.__setattr__(self, "_dependents", {})
+        self._dependents[id(dependent)] = weakref.ref(dependent)
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__:
+            object.__setattr__(self, "_revision", self._revision + 1)
+            if self._dependents:
+                for key, ref in list(self._dependents.items()):
+                    dependent = ref()
+                    if dependent is None:
+                        del self._dependents[key]
+                    else:
+                        dependent.invalidate()
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_dependents", None)
+        return state
+
+
 @dataclass()
-class Equipment:
+class Equipment(RevisionTracked):
     name: str
     weight: int
 
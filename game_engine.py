@@ -2,9 +2,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 import random
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 from character import Character
+from combat_profile import combat_profile
+from intent import IntentClassifier, default_classifier
+
+if TYPE_CHECKING:
+    from combat_log import CombatLog
 
 
 @dataclass
@@ -33,34 +38,37 @@ class CombatEvent:
 class GameEngine:
     """Lightweight rules engine for text-driven combat actions."""
 
-    def __init__(self, characters: List[Character], rng: Optional[random.Random] = None):
+    def __init__(
+        self,
+        characters: List[Character],
+        rng: Optional[random.Random] = None,
+        log: Optional[Union[List[CombatEvent], CombatLog]] = None,
+        classifier: Optional[IntentClassifier] = None,
+    ):
         if len(characters) < 2:
             raise ValueError("GameEngine requires at least two characters")
         self.characters: Dict[str, Character] = {c.name.lower(): c for c in characters}
         self.turn_order: List[Character] = characters[:]
-        self.log: List[CombatEvent] = []
+        self.log: Union[List[CombatEvent], CombatLog] = log if log is not None else []
         self._rng = rng or random.Random()
+        self.classifier = classifier or default_classifier()
 
-    def roll(self, num: int, sides: int, modifier: int = 0) -> DiceRoll:
-        rolls = [self._rng.randint(1, sides) for _ in range(num)]
-        return DiceRoll(formula=f"{num}d{sides}", rolls=rolls, modifier=modifier)
+    def roll(self, num: int, sides: int, modifier: int = 0, formula: Optional[str] = None) -> DiceRoll:
+        if num == 1:
+            rolls = [self._rng.randint(1, sides)]
+        else:
+            rolls = [self._rng.randint(1, sides) for _ in range(num)]
+        return DiceRoll(formula=formula or f"{num}d{sides}", rolls=rolls, modifier=modifier)
 
     @staticmethod
     def ability_modifier(score: int) -> int:
         return (score - 10) // 2
 
     def armor_class(self, character: Character) -> int:
-        dex_mod = self.ability_modifier(character.ability_scores.dexterity)
-        armor_bonus = character.armor.protection if character.armor else 0
-        return 10 + dex_mod + armor_bonus
+        return combat_profile(character).armor_class
 
     def parse_action(self, text: str) -> str:
-        lowered = text.lower()
-        if any(token in lowered for token in ("heal", "potion", "recover")):
-            return "heal"
-        if any(token in lowered for token in ("inspect", "look", "observe")):
-            return "observe"
-        return "attack"
+        return self.classifier.action(text)
 
     def perform_action(self, actor_name: str, target_name: str, description: str) -> CombatEvent:
         actor = self.characters[actor_name.lower()]
@@ -68,7 +76,7 @@ class GameEngine:
         action = self.parse_action(description)
 
         if action == "heal":
-            roll = self.roll(1, 8, self.ability_modifier(actor.ability_scores.constitution))
+            roll = self.roll(1, 8, combat_profile(actor).constitution_mod, "1d8")
             healed = max(1, roll.total)
             actor.health += healed
             event = CombatEvent(
@@ -98,18 +106,17 @@ class GameEngine:
             self.log.append(event)
             return event
 
-        attack_roll = self.roll(1, 20, self.ability_modifier(actor.ability_scores.strength) + 2)
-        hit = attack_roll.total >= self.armor_class(target)
+        profile = combat_profile(actor)
+        attack_roll = self.roll(1, 20, profile.to_hit, "1d20")
+        hit = attack_roll.total >= combat_profile(target).armor_class
         damage = 0
         rolls = [attack_roll]
         if hit:
-            weapon_roll = self.roll(
-                1,
-                actor.weapon.max_damage,
-                self.ability_modifier(actor.ability_scores.strength),
-            )
+            if profile.damage_sides is None:
+                raise ValueError(f"{actor.name} has no weapon to attack with")
+            weapon_roll = self.roll(1, profile.damage_sides, profile.strength_mod, profile.damage_formula)
             # honor weapon minimum damage as a floor
-            damage = max(actor.weapon.min_damage, weapon_roll.total)
+            damage = max(profile.min_damage, weapon_roll.total)
             target.health -= damage
             rolls.append(weapon_roll)
 
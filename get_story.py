@@ -1,22 +1,28 @@
-from openai import OpenAI
-
+from narrator_transport import NarratorTransport, shared_clients
 from settings import get_openai_api_key, load_dotenv
 
-load_dotenv()
-
+_transport = None
 
 
 # the main workhorse
 def get_completion(prompt, model='gpt-3.5-turbo'):
+    global _transport
+    if _transport is None:
+        # one-off story requests are not on a turn's critical path, so they get a longer deadline
+        _transport = NarratorTransport(turn_budget=30.0)
+    load_dotenv()
     api_key = get_openai_api_key()
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set. Add it to your .env file.")
 
-    client = OpenAI(api_key=api_key)
+    client, _ = shared_clients(api_key)
+    if client is None:
+        raise RuntimeError("The openai package is not installed.")
     messages = [{"role": "user", "content": prompt}]
-    response = client.chat.completions.create(model=model,
-                                              messages=messages,
-                                              temperature=0)
+    response = _transport.call(client.chat.completions.create,
+                               model=model,
+                               messages=messages,
+                               temperature=0)
     return response.choices[0].message.content
 
 
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import IO, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from main import ai_intent, alive_names, build_default_session, parse_player_command
+from narrator import StubNarrator
+from server import turn_payload
+from session import AdventureSession
+from template_narrator import EscalatingNarrator, TemplateNarrator
+
+
+logger = logging.getLogger(__name__)
+
+NARRATORS: Dict[str, Callable[[], object]] = {
+    "template": TemplateNarrator,
+    "stub": StubNarrator,
+    "llm": EscalatingNarrator,
+}
+
+
+@dataclass
+class ScriptedCommand:
+    session: str
+    command: str
+    seed: Optional[int] = None
+
+
+@dataclass
+class _Running:
+    session: AdventureSession
+    player: str
+    turns: int = 0
+
+
+@dataclass
+class RunSummary:
+    sessions: int = 0
+    commands: int = 0
+    turns: int = 0
+    invalid: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.elapsed if self.elapsed else 0.0
+
+
+def read_script(path: str, session: Optional[str] = None) -> Iterator[ScriptedCommand]:
+    """Commands of a text script, one per line; blank lines and ``#`` comments are skipped."""
+    name = session or os.path.splitext(os.path.basename(path))[0]
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            command = line.strip()
+            if command and not command.startswith("#"):
+                yield ScriptedCommand(name, command)
+
+
+def read_jsonl(stream: IO[str]) -> Iterator[ScriptedCommand]:
+    """Commands from ``{"session": ..., "command": ..., "seed": ...}`` lines, sessions interleaved."""
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield ScriptedCommand(str(record["session"]), str(record["command"]), record.get("seed"))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Skipping malformed command line %d", number)
+
+
+class HeadlessRunner:
+    """Drives many scripted sessions without a terminal and writes JSONL results.
+
+    Each command plays the player's turn the way ``main.run_cli`` would, then every AI
+    turn up to the player's next one, and writes one compact record per resolved turn
+    (plus ``invalid`` and ``status`` records). A session is created on its first
+    command, seeded from its own ``seed`` or ``seed`` plus its creation index, and
+    dropped with an ``end`` record as soon as combat is over, so interleaved streams
+    only hold the sessions still in play plus the names of the last ``max_finished``
+    ended ones. Later commands for a remembered name are only counted as ``rejected``;
+    once a name has been forgotten, a command for it starts a fresh session. Output
+    goes through one large write buffer.
+    """
+
+    def __init__(
+        self,
+        output: IO[str],
+        narrator=None,
+        seed: int = 0,
+        session_factory: Callable[..., Tuple[AdventureSession, str]] = build_default_session,
+        max_finished: int = 4096,
+    ):
+        self.output = output
+        self.narrator = narrator or TemplateNarrator()
+        self.seed = seed
+        self.session_factory = session_factory
+        self.summary = RunSummary()
+        self._sessions: Dict[str, _Running] = {}
+        self.max_finished = max_finished
+        self._finished: "OrderedDict[str, str]" = OrderedDict()
+        self._dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+    def _write(self, record: Dict[str, object]) -> None:
+        self.output.write(self._dumps(record) + "\n")
+
+    def run(self, commands: Iterable[ScriptedCommand]) -> RunSummary:
+        started = time.perf_counter()
+        for scripted in commands:
+            self.feed(scripted)
+        self.close()
+        self.summary.elapsed += time.perf_counter() - started
+        return self.summary
+
+    def feed(self, scripted: ScriptedCommand) -> None:
+        self.summary.commands += 1
+        name = scripted.session
+        running = self._sessions.get(name)
+        if running is None and name not in self._finished:
+            running = self._start(name, scripted.seed)
+        if name in self._finished:
+            # scripts usually outlive the fight; the end record already says why
+            self._finished.move_to_end(name)
+            self.summary.rejected += 1
+            return
+        session, player = running.session, running.player
+
+        parsed = parse_player_command(session, player, scripted.command)
+        if parsed is None:
+            self.summary.invalid += 1
+            self._write({"type": "invalid", "session": name, "command": scripted.command})
+            return
+        if parsed[0] == "quit":
+            self._end(name, running, "quit")
+            return
+        if parsed[0] in ("help", "status"):
+            self._write({"type": "status", "session": name, **self._status(session)})
+            return
+
+        self._turn(name, running, session.process_turn(*parsed))
+        session.encounter.advance()
+        self._play_ai(name, running)
+
+    def _start(self, name: str, seed: Optional[int]) -> _Running:
+        if seed is None:
+            seed = self.seed + self.summary.sessions
+        session, player = self.session_factory(narrator=self.narrator, seed=seed, history_limit=0)
+        running = self._sessions[name] = _Running(session, player)
+        self.summary.sessions += 1
+        # AI combatants who win initiative act before the first command
+        self._play_ai(name, running)
+        return running
+
+    def _play_ai(self, name: str, running: _Running) -> None:
+        session, player = running.session, running.player
+        encounter = session.encounter
+        while True:
+            if not encounter.is_alive(player) or encounter.is_over():
+                self._end(name, running, "defeated" if not encounter.is_alive(player) else "victory")
+                return
+            actor = encounter.current().name
+            if actor.lower() == player.lower():
+                return
+            parsed = ai_intent(session, actor, player)
+            if parsed is not None:
+                self._turn(name, running, session.process_turn(*parsed))
+            encounter.advance()
+
+    def _turn(self, name: str, running: _Running, result) -> None:
+        running.turns += 1
+        self.summary.turns += 1
+        self._write({"type": "turn", "session": name, **turn_payload(result)})
+
+    def _status(self, session: AdventureSession) -> Dict[str, object]:
+        return {"turn": session.turn_number, "hp": {c.name: c.health for c in session.engine.turn_order}}
+
+    def _end(self, name: str, running: _Running, outcome: str) -> None:
+        self._sessions.pop(name, None)
+        self._finished[name] = outcome
+        self._finished.move_to_end(name)
+        while len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+        self._write(
+            {
+                "type": "end",
+                "session": name,
+                "outcome": outcome,
+                "turns": running.turns,
+                "alive": alive_names(running.session),
+                **self._status(running.session),
+            }
+        )
+
+    def close(self) -> None:
+        """End sessions whose script ran out before combat did."""
+        for name, running in list(self._sessions.items()):
+            self._end(name, running, "unfinished")
+        self.output.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play scripted sessions headlessly and write JSONL results.")
+    parser.add_argument("scripts", nargs="*", help="text scripts, one command per line; one session per file")
+    parser.add_argument("--jsonl", help='JSONL command stream ({"session", "command", "seed"}); "-" for stdin')
+    parser.add_argument("--output", default="-", help='results file (default "-": stdout)')
+    parser.add_argument("--narrator", choices=sorted(NARRATORS), default="template")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--buffer", type=int, default=1 << 20, help="output buffer size in bytes")
+    parser.add_argument(
+        "--max-finished", type=int, default=4096, help="ended session names remembered to reject late commands"
+    )
+    args = parser.parse_args()
+    if not args.scripts and not args.jsonl:
+        parser.error("give script files or --jsonl")
+
+    def commands() -> Iterator[ScriptedCommand]:
+        for path in args.scripts:
+            yield from read_script(path)
+        if args.jsonl == "-":
+            yield from read_jsonl(sys.stdin)
+        elif args.jsonl:
+            with open(args.jsonl, encoding="utf-8") as stream:
+                yield from read_jsonl(stream)
+
+    if args.output == "-":
+        output = open(sys.stdout.fileno(), "w", encoding="utf-8", buffering=args.buffer, closefd=False)
+    else:
+        output = open(args.output, "w", encoding="utf-8", buffering=args.buffer)
+    with output:
+        runner = HeadlessRunner(output, NARRATORS[args.narrator](), seed=args.seed, max_finished=args.max_finished)
+        summary = runner.run(commands())
+    print(
+        f"{summary.sessions} sessions, {summary.commands} commands ({summary.invalid} invalid, "
+        f"{summary.rejected} after the session ended), {summary.turns} turns in {summary.elapsed:.2f}s, {summary.turns_per_second:.0f} turns/s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Protocol, Set
+
+from instrumentation import Instrumentation
+
+
+logger = logging.getLogger(__name__)
+
+_TURN_COUNTER = re.compile(r"\bturn \d+\b")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def image_key(prompt: str, renderer: str = "", size: int = 0) -> str:
+    """Content address for an illustration request.
+
+    Prompts are case/punctuation normalized and the turn counter is dropped, so a
+    repeated beat in the same scene ("Turn 3: ..." then "Turn 7: ...") renders once.
+    """
+    normalized = _TURN_COUNTER.sub(" ", prompt.casefold())
+    normalized = _NON_WORD.sub(" ", normalized).strip()
+    return hashlib.sha256(f"{renderer}\x00{size}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class ImageRenderer(Protocol):
+    name: str
+
+    def render(self, prompt: str, size: int) -> bytes:
+        ...
+
+
+def _png(width: int, height: int, rows: List[bytes]) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack("!I", len(data)) + kind + data + struct.pack("!I", zlib.crc32(kind + data))
+
+    raw = b"".join(b"\x00" + row for row in rows)
+    header = struct.pack("!IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+class StubRenderer:
+    """Local stand-in for an image model: a deterministic PNG banded from the prompt hash.
+
+    ``delay`` simulates model latency so queue behaviour can be exercised offline.
+    """
+
+    name = "stub"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def render(self, prompt: str, size: int) -> bytes:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=24).digest()
+        bands = [digest[index : index + 3] for index in range(0, len(digest), 3)]
+        band_height = max(1, size // len(bands))
+        rows = [bands[min(y // band_height, len(bands) - 1)] * size for y in range(size)]
+        return _png(size, size, rows)
+
+
+class ImageCache:
+    """Content-addressed image files under ``root`` (``ab/abcdef....png``), shared by workers.
+
+    Files are written to a temporary name and renamed into place, so readers never see
+    a partial image and concurrent writers of the same key are harmless.
+    """
+
+    def __init__(self, root: str, suffix: str = ".png"):
+        self.root = root
+        self.suffix = suffix
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + self.suffix)
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path(key)
+        return path if os.path.exists(path) else None
+
+    def put(self, key: str, data: bytes) -> str:
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+        return path
+
+
+@dataclass
+class ImageJobStats:
+    submitted: int = 0
+    cache_hits: int = 0
+    deduplicated: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    rendered: int = 0
+    failed: int = 0
+
+
+@dataclass
+class _Job:
+    key: str
+    prompt: str
+    future: Future
+    sessions: Set[str] = field(default_factory=set)
+
+
+class ImageJobQueue:
+    """Renders turn illustrations in background threads without ever blocking play.
+
+    ``submit`` returns a ``concurrent.futures.Future`` resolving to the image path and
+    never waits on a render:
+
+    - prompts already in the ``ImageCache`` resolve immediately;
+    - a prompt with the same ``image_key`` as a queued or rendering job shares its future;
+    - each session keeps at most one queued job: a newer turn replaces the older one,
+      whose future is cancelled, so when turns outpace the renderer only the latest scene
+      is drawn (a job already rendering always finishes);
+    - beyond ``max_pending`` queued jobs the oldest is cancelled.
+
+    ``workers`` threads call the renderer, which is where real image backends spend
+    seconds per picture.
+    """
+
+    def __init__(
+        self,
+        cache: ImageCache,
+        renderer: Optional[ImageRenderer] = None,
+        workers: int = 2,
+        max_pending: int = 64,
+        size: int = 256,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        self.cache = cache
+        self.renderer = renderer or StubRenderer()
+        self.max_pending = max_pending
+        self.size = size
+        self.instrumentation = instrumentation or Instrumentation()
+        self.stats = ImageJobStats()
+        self._queued: "OrderedDict[str, _Job]" = OrderedDict()
+        self._running: Dict[str, _Job] = {}
+        self._latest: Dict[str, _Job] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"image-job-{index}", daemon=True) for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, session_id: str, prompt: str) -> Future:
+        """Queue ``prompt`` as the latest illustration for ``session_id``."""
+        key = image_key(prompt, getattr(self.renderer, "name", ""), self.size)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("image job queue is closed")
+            self.stats.submitted += 1
+            path = self.cache.get(key)
+            if path is not None:
+                self.stats.cache_hits += 1
+                self.instrumentation.count("image_jobs", outcome="cache_hit")
+                future: Future = Future()
+                future.set_result(path)
+                return future
+
+            job = self._running.get(key) or self._queued.get(key)
+            if job is not None:
+                self.stats.deduplicated += 1
+                self.instrumentation.count("image_jobs", outcome="deduplicated")
+                if key in self._queued:
+                    self._supersede(session_id, job)
+                else:
+                    # already rendering, so it outranks the session's older queued scene
+                    self._release(session_id)
+                return job.future
+
+            if len(self._queued) >= self.max_pending:
+                self._cancel(next(iter(self._queued.values())))
+                self.stats.dropped += 1
+                self.instrumentation.count("image_jobs", outcome="dropped")
+            job = _Job(key, prompt, Future())
+            self._queued[key] = job
+            self._supersede(session_id, job)
+            self._condition.notify()
+            return job.future
+
+    def submit_turn(self, session_id: str, result) -> Future:
+        """Queue the ``image_prompt`` of a ``TurnResult``."""
+        return self.submit(session_id, result.image_prompt)
+
+    def _supersede(self, session_id: str, job: _Job) -> None:
+        if self._latest.get(session_id) is not job:
+            self._release(session_id)
+        job.sessions.add(session_id)
+        self._latest[session_id] = job
+
+    def _release(self, session_id: str) -> None:
+        """Drop the session's claim on its queued job, cancelling it if nobody else wants it."""
+        previous = self._latest.pop(session_id, None)
+        if previous is None:
+            return
+        previous.sessions.discard(session_id)
+        if not previous.sessions:
+            self._cancel(previous)
+            self.stats.coalesced += 1
+            self.instrumentation.count("image_jobs", outcome="coalesced")
+
+    def _cancel(self, job: _Job) -> None:
+        del self._queued[job.key]
+        for session_id in job.sessions:
+            if self._latest.get(session_id) is job:
+                del self._latest[session_id]
+        job.future.cancel()
+
+    def _take(self) -> Optional[_Job]:
+        with self._condition:
+            while not self._queued:
+                if self._closed:
+                    return None
+                self._condition.wait()
+            _, job = self._queued.popitem(last=False)
+            for session_id in job.sessions:
+                if self._latest.get(session_id) is job:
+                    del self._latest[session_id]
+            self._running[job.key] = job
+            return job
+
+    def _work(self) -> None:
+        while True:
+            job = self._take()
+            if job is None:
+                return
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    with self.instrumentation.stage("image_render"):
+                        data = self.renderer.render(job.prompt, self.size)
+                    path = self.cache.put(job.key, data)
+                except Exception as exc:
+                    logger.warning("Image render failed: %s", exc)
+                    self.stats.failed += 1
+                    job.future.set_exception(exc)
+                else:
+                    self.stats.rendered += 1
+                    self.instrumentation.count("image_jobs", outcome="rendered")
+                    job.future.set_result(path)
+            with self._condition:
+                del self._running[job.key]
+                self._condition.notify_all()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._queued) + len(self._running)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued job has rendered; False if ``timeout`` ran out first."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queued and not self._running, timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting jobs; cancel queued ones and (optionally) wait for running renders."""
+        with self._condition:
+            self._closed = True
+            for job in list(self._queued.values()):
+                self._cancel(job)
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import IO, Dict, List, Optional, Protocol, Tuple
+
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class MetricsSink(Protocol):
+    def emit(self, record: dict) -> None:
+        ...
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_instrumentation", "_stage", "_labels", "_started")
+
+    def __init__(self, instrumentation: "Instrumentation", stage: str, labels: Dict[str, str]):
+        self._instrumentation = instrumentation
+        self._stage = stage
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._instrumentation.timing(self._stage, time.perf_counter() - self._started, **self._labels)
+        return False
+
+
+class Instrumentation:
+    """Per-stage timings, counters and sizes fanned out to registered sinks.
+
+    With no sink attached ``enabled`` is False, ``stage`` returns a shared no-op context
+    manager and the record methods return immediately, so instrumented code pays one
+    attribute check per measurement.
+    """
+
+    def __init__(self, *sinks: MetricsSink):
+        self._sinks: List[MetricsSink] = list(sinks)
+        self.enabled = bool(self._sinks)
+
+    def add_sink(self, sink: MetricsSink) -> None:
+        self._sinks.append(sink)
+        self.enabled = True
+
+    def remove_sink(self, sink: MetricsSink) -> None:
+        self._sinks.remove(sink)
+        self.enabled = bool(self._sinks)
+
+    def stage(self, name: str, **labels: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+
+    def timing(self, stage: str, seconds: float, **labels: str) -> None:
+        if self.enabled:
+            self._emit({"type": "timing", "name": stage, "value": seconds, "labels": labels})
+
+    def count(self, name: str, value: int = 1, **labels: str) -> None:
+        if self.enabled:
+            self._emit({"type": "counter", "name": name, "value": value, "labels": labels})
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        if self.enabled:
+            self._emit({"type": "value", "name": name, "value": value, "labels": labels})
+
+    def _emit(self, record: dict) -> None:
+        record["ts"] = time.time()
+        for sink in self._sinks:
+            sink.emit(record)
+
+
+class JsonlSink:
+    """Writes every record as one JSON line to a file path or open text stream."""
+
+    def __init__(self, target, flush_every: int = 256):
+        self._owns_stream = isinstance(target, str)
+        self._stream: IO[str] = open(target, "a", encoding="utf-8") if self._owns_stream else target
+        self.flush_every = flush_every
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._stream.flush()
+                self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._stream.flush()
+            if self._owns_stream:
+                self._stream.close()
+
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class PrometheusSink:
+    """Aggregates records in memory and renders them in the Prometheus text format.
+
+    Timings become a ``dm_stage_seconds`` histogram labelled by stage, counters become
+    ``dm_<name>_total`` and values become ``dm_<name>`` summaries (``_sum``/``_count``).
+    """
+
+    def __init__(self, prefix: str = "dm", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._values: Dict[LabelKey, List[float]] = {}
+        self._histograms: Dict[LabelKey, List[float]] = {}
+
+    def emit(self, record: dict) -> None:
+        labels = tuple(sorted(record["labels"].items()))
+        value = record["value"]
+        with self._lock:
+            if record["type"] == "counter":
+                key = (record["name"], labels)
+                self._counters[key] = self._counters.get(key, 0) + value
+            elif record["type"] == "value":
+                stats = self._values.setdefault((record["name"], labels), [0.0, 0])
+                stats[0] += value
+                stats[1] += 1
+            else:
+                key = (record["name"], labels)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+                histogram[bisect_left(self.buckets, value)] += 1
+                histogram[-1] += value
+
+    @staticmethod
+    def _format_labels(labels, extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(labels) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            values = sorted(self._values.items())
+            histograms = sorted(self._histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{self._format_labels(labels)} {value:g}")
+        for (name, labels), (total, count) in values:
+            metric = f"{self.prefix}_{name}"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{metric}_sum{self._format_labels(labels)} {total:g}")
+            lines.append(f"{metric}_count{self._format_labels(labels)} {count}")
+
+        metric = f"{self.prefix}_stage_seconds"
+        if histograms:
+            lines.append(f"# TYPE {metric} histogram")
+        for (stage, labels), histogram in histograms:
+            labels = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), histogram):
+                cumulative += count
+                bound_text = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{metric}_bucket{self._format_labels(labels, {'le': bound_text})} {cumulative}")
+            lines.append(f"{metric}_sum{self._format_labels(labels)} {histogram[-1]:.9f}")
+            lines.append(f"{metric}_count{self._format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(self.render())
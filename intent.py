@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+
+@dataclass
+class Lexicon:
+    """Keywords that map free-text intents to actions and modifiers.
+
+    ``actions`` is in priority order: an intent mentioning keywords of several actions
+    resolves to the first one listed, and to ``default_action`` when none match.
+    Keywords match anywhere in the lowercased intent, like the substring scans they
+    replace ("healing" still means heal).
+    """
+
+    actions: Dict[str, Tuple[str, ...]]
+    modifiers: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    default_action: str = "attack"
+
+    def with_synonyms(self, action: str, *keywords: str) -> "Lexicon":
+        """Copy of this lexicon with extra keywords for ``action`` (appended last if new)."""
+        actions = dict(self.actions)
+        actions[action] = actions.get(action, ()) + tuple(keyword.lower() for keyword in keywords)
+        return Lexicon(actions, dict(self.modifiers), self.default_action)
+
+
+DEFAULT_LEXICON = Lexicon(
+    actions={
+        "heal": ("heal", "potion", "recover"),
+        "observe": ("inspect", "look", "observe"),
+    },
+    modifiers={
+        "ranged": ("shoot", "fire", "arrow", "throw"),
+        "power": ("hard", "mighty", "heavy", "all my strength"),
+        "quick": ("quick", "swift", "fast", "dart"),
+        "careful": ("careful", "cautious", "steady"),
+        "feint": ("feint", "trick"),
+    },
+)
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Regex source matching any of ``words``, factored by common prefix.
+
+    ``re`` tries alternatives one by one, so a flat ``a|b|c`` costs a comparison per
+    keyword at every position; a trie rejects a position after one character per level.
+    At a given position the longest keyword wins.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_source(trie) if trie else "(?!x)x"
+
+
+def _trie_source(node: Dict[str, dict]) -> str:
+    branches = [re.escape(char) + _trie_source(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    optional = "" in node
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+
+@dataclass(frozen=True)
+class Intent:
+    action: str
+    target: Optional[str] = None
+    modifiers: Tuple[str, ...] = ()
+
+
+class IntentClassifier:
+    """Classifies intents with one precompiled regex pass instead of a scan per keyword.
+
+    Every keyword of the lexicon goes into a single prefix-trie pattern, preceded by the
+    target names (whole words only). One ``finditer`` over the lowercased text yields the
+    action, the first named target and the modifiers together. Names are tried first, so
+    a keyword inside a name ("Healer", "Firedrake") is part of the name, not an action
+    or modifier. Patterns for target rosters are compiled on first use and kept in a
+    small LRU.
+    """
+
+    def __init__(self, lexicon: Optional[Lexicon] = None, max_rosters: int = 256, max_memo: int = 4096):
+        self.lexicon = lexicon or DEFAULT_LEXICON
+        self.max_rosters = max_rosters
+        self.max_memo = max_memo
+        self._memo: Dict[str, str] = {}
+        self._kinds: Dict[str, Tuple[str, object]] = {}
+        for priority, (action, keywords) in enumerate(self.lexicon.actions.items()):
+            for keyword in keywords:
+                self._kinds.setdefault(keyword.lower(), ("action", priority))
+        for modifier, keywords in self.lexicon.modifiers.items():
+            for keyword in keywords:
+                self._kinds.setdefault(keyword.lower(), ("modifier", modifier))
+        self._keywords = trie_pattern(self._kinds)
+        self._actions = list(self.lexicon.actions)
+        self._action_pattern = re.compile(
+            trie_pattern(keyword for keyword, (kind, _) in self._kinds.items() if kind == "action")
+        )
+        self._patterns: "OrderedDict[Tuple[str, ...], Tuple[Pattern[str], Dict[str, str]]]" = OrderedDict()
+
+    def _pattern(self, targets: Tuple[str, ...]) -> Tuple[Pattern[str], Dict[str, str]]:
+        compiled = self._patterns.get(targets)
+        if compiled is not None:
+            self._patterns.move_to_end(targets)
+            return compiled
+        names = {name.lower(): name for name in targets}
+        source = f"(?P<k>{self._keywords})"
+        if names:
+            # at any position a whole target name beats a keyword starting there
+            source = r"\b(?P<t>" + trie_pattern(names) + r")\b|" + source
+        compiled = (re.compile(source), names)
+        self._patterns[targets] = compiled
+        if len(self._patterns) > self.max_rosters:
+            self._patterns.popitem(last=False)
+        return compiled
+
+    def classify(self, text: str, targets: Sequence[str] = ()) -> Intent:
+        """Action, first mentioned target from ``targets`` and modifiers of ``text``."""
+        pattern, names = self._pattern(tuple(targets))
+        best = len(self._actions)
+        target = None
+        modifiers: List[str] = []
+        kinds = self._kinds
+        for match in pattern.finditer(text.lower()):
+            word = match.group("k")
+            if word is None:
+                if target is None:
+                    target = names[match.group("t")]
+                continue
+            kind, value = kinds[word]
+            if kind == "action":
+                best = min(best, value)
+            elif value not in modifiers:
+                modifiers.append(value)
+        action = self._actions[best] if best < len(self._actions) else self.lexicon.default_action
+        return Intent(action, target, tuple(modifiers))
+
+    def classify_many(self, texts: Iterable[str], targets: Sequence[str] = ()) -> List[Intent]:
+        """Classify a batch; repeated intents (AI turns, replays) are classified once."""
+        targets = tuple(targets)
+        seen: Dict[str, Intent] = {}
+        results = []
+        for text in texts:
+            intent = seen.get(text)
+            if intent is None:
+                intent = seen[text] = self.classify(text, targets)
+            results.append(intent)
+        return results
+
+    def action(self, text: str) -> str:
+        """Just the action of ``text``; the hot path of ``GameEngine.parse_action``.
+
+        Results are memoized per exact text (up to ``max_memo`` entries) since the same
+        intents recur every turn.
+        """
+        action = self._memo.get(text)
+        if action is not None:
+            return action
+        best = len(self._actions)
+        for match in self._action_pattern.finditer(text.lower()):
+            best = min(best, self._kinds[match.group()][1])
+            if best == 0:
+                break
+        action = self._actions[best] if best < len(self._actions) else self.lexicon.default_action
+        if self.max_memo:
+            if len(self._memo) >= self.max_memo:
+                self._memo.clear()
+            self._memo[text] = action
+        return action
+
+
+_default_classifier: Optional[IntentClassifier] = None
+
+
+def default_classifier() -> IntentClassifier:
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = IntentClassifier()
+    return _default_classifier
+
+
+def classify(text: str, targets: Sequence[str] = ()) -> Intent:
+    return default_classifier().classify(text, targets)
+
+
+def classify_many(texts: Iterable[str], targets: Sequence[str] = ()) -> List[Intent]:
+    return default_classifier().classify_many(texts, targets)
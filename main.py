@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import random
 import re
+import sys
 from typing import Dict, List, Optional, Tuple
 
 from character import AbilityScores, Character
 from equipment import Armor, Weapon
 from narrator import Narrator
 from session import AdventureSession
+from template_narrator import EscalatingNarrator, TemplateNarrator
 
 
-def build_default_session() -> Tuple[AdventureSession, str]:
+_NON_LETTERS = re.compile(r"[^a-zA-Z]")
+
+AI_HEAL_INTENT = "I steady myself and recover."
+AI_ATTACK_INTENT = "I fire a quick attack at my foe."
+
+
+def build_default_session(
+    narrator: Optional[Narrator] = None, seed: Optional[int] = None, history_limit: Optional[int] = None
+) -> Tuple[AdventureSession, str]:
+    """The CLI duel; narrated from templates, escalating notable beats to the LLM by default.
+
+    ``seed`` makes dice and initiative reproducible.
+    """
     ability_scores1 = AbilityScores(strength=18, dexterity=14, wisdom=12, constitution=15, intelligence=13, charisma=16)
     ability_scores2 = AbilityScores(strength=11, dexterity=18, wisdom=12, constitution=15, intelligence=13, charisma=16)
 
@@ -41,26 +56,21 @@ def build_default_session() -> Tuple[AdventureSession, str]:
 
     session = AdventureSession(
         [char1, char2],
-        narrator=Narrator(),
+        narrator=narrator or EscalatingNarrator(),
         scene_overview="A ruined chapel in the underdark, lit by bioluminescent moss and torch smoke.",
+        rng=random.Random(seed) if seed is not None else None,
+        initiative_rng=random.Random(f"initiative-{seed}") if seed is not None else None,
+        history_limit=history_limit,
     )
     return session, char1.name
 
 
 def alive_names(session: AdventureSession) -> List[str]:
-    return [c.name for c in session.engine.turn_order if c.health > 0]
+    return session.encounter.alive_names()
 
 
 def resolve_target(session: AdventureSession, token: str, actor_name: str) -> Optional[str]:
-    token = token.strip().lower()
-    for name in alive_names(session):
-        if name.lower() == token and name.lower() != actor_name.lower():
-            return name
-    for name in alive_names(session):
-        lowered = name.lower()
-        if lowered.startswith(token) and lowered != actor_name.lower():
-            return name
-    return None
+    return session.encounter.resolve_target(token, actor_name)
 
 
 def print_status(session: AdventureSession) -> None:
@@ -70,33 +80,60 @@ def print_status(session: AdventureSession) -> None:
         print(f"- {actor['name']} ({actor['class']}): {actor['hp']} HP [{state}]")
 
 
-def print_turn_result(result) -> None:
+def print_mechanics(mechanics_summary: str, state_delta) -> None:
     print("  Mechanics:")
-    for line in result.mechanics_summary.splitlines():
+    for line in mechanics_summary.splitlines():
         print(f"    {line}")
-    print(f"  State delta: {result.state_delta}")
-    print(f"  Narrative: {result.narrative}")
+    print(f"  State delta: {state_delta}")
+
+
+def print_turn_details(result) -> None:
     if result.ai_state_notes:
         print(f"  AI state notes: {result.ai_state_notes}")
     print(f"  Image prompt: {result.image_prompt}")
 
 
+def print_turn_result(result) -> None:
+    print_mechanics(result.mechanics_summary, result.state_delta)
+    print(f"  Narrative: {result.narrative}")
+    print_turn_details(result)
+
+
+def print_turn_stream(chunks):
+    """Print a ``process_turn_stream`` as it arrives and return the final result."""
+    streamed = []
+    result = None
+    for chunk in chunks:
+        if chunk.kind == "mechanics":
+            print_mechanics(chunk.mechanics_summary, chunk.state_delta)
+            print("  Narrative: ", end="", flush=True)
+        elif chunk.kind == "narrative":
+            streamed.append(chunk.text)
+            print(chunk.text, end="", flush=True)
+        elif chunk.kind == "result":
+            result = chunk.result
+    print()
+    if result is None:
+        return None
+    if "".join(streamed).strip() != result.narrative:
+        print(f"  Narrative (final): {result.narrative}")
+    print_turn_details(result)
+    return result
+
+
 def choose_default_target(session: AdventureSession, actor_name: str) -> Optional[str]:
-    for name in alive_names(session):
-        if name.lower() != actor_name.lower():
-            return name
-    return None
+    return session.encounter.default_target(actor_name)
 
 
 def parse_player_command(
     session: AdventureSession, actor_name: str, command: str
 ) -> Optional[Tuple[str, str, str]]:
-    raw = "".join(ch for ch in command if ch.isprintable()).strip()
+    raw = (command if command.isprintable() else "".join(ch for ch in command if ch.isprintable())).strip()
     if not raw:
         return None
 
     parts = raw.split()
-    verb = re.sub(r"[^a-zA-Z]", "", parts[0]).lower()
+    verb = _NON_LETTERS.sub("", parts[0]).lower()
 
     if verb in {"quit", "exit"}:
         return ("quit", actor_name, "")
@@ -130,54 +167,80 @@ def parse_player_command(
         intent = " ".join(parts[2:]).strip() or f"I attack {target} with my weapon."
         return (actor_name, target, intent)
 
-    # Fallback: free text treated as attack intent against first available target.
-    target = choose_default_target(session, actor_name)
+    # Fallback: free text is an intent against the enemy it names, else the first available one.
+    named = session.engine.classifier.classify(raw, alive_names(session)).target
+    target = named if named and named.lower() != actor_name.lower() else choose_default_target(session, actor_name)
     if not target:
         return None
     return (actor_name, target, raw)
 
 
-def ai_turn(session: AdventureSession, actor_name: str, player_name: str):
+def ai_intent(session: AdventureSession, actor_name: str, player_name: str) -> Optional[Tuple[str, str, str]]:
     actor = session.engine.characters[actor_name.lower()]
     player = session.engine.characters[player_name.lower()]
 
     if actor.health <= 7:
-        return session.process_turn(actor.name, actor.name, "I steady myself and recover.")
+        return (actor.name, actor.name, AI_HEAL_INTENT)
 
     if player.health > 0:
-        return session.process_turn(actor.name, player.name, "I fire a quick attack at my foe.")
+        return (actor.name, player.name, AI_ATTACK_INTENT)
 
     target = choose_default_target(session, actor_name)
     if target is None:
         return None
-    return session.process_turn(actor.name, target, "I strike at the nearest enemy.")
+    return (actor.name, target, "I strike at the nearest enemy.")
+
+
+def ai_turn(session: AdventureSession, actor_name: str, player_name: str):
+    parsed = ai_intent(session, actor_name, player_name)
+    if parsed is None:
+        return None
+    return session.process_turn(*parsed)
 
 
-def run_cli() -> None:
-    session, player_name = build_default_session()
-    turn_index = 0
-    turn_order = [c.name for c in session.engine.turn_order]
+def play_turn(session: AdventureSession, actor: str, target: str, intent: str, stream: bool = False) -> None:
+    if stream:
+        print_turn_stream(session.process_turn_stream(actor, target, intent))
+    else:
+        print_turn_result(session.process_turn(actor, target, intent))
+
+
+def run_cli(stream: bool = False, speculate: bool = False, offline: bool = False) -> None:
+    speculator = None
+    if speculate and not offline:
+        # imported here: the probability engine behind it pulls in numpy
+        from speculation import SpeculativeNarrator
+
+        # speculation prefetches full LLM narrations, so it replaces the template default
+        speculator = SpeculativeNarrator(Narrator())
+        print(
+            f"Speculative narration is on: each AI turn may cost up to {2 * speculator.max_candidates} extra "
+            f"narrator calls (at most {speculator.max_calls_per_minute} per minute), most of them discarded."
+        )
+    # offline play never constructs the LLM narrator, so the SDK is never imported
+    session, player_name = build_default_session(narrator=TemplateNarrator() if offline else speculator)
+    encounter = session.encounter
 
     print("Dungeon Master CLI")
     print("Commands: attack <target> [intent], heal [intent], observe [target] [intent], status, help, quit")
+    print(f"Initiative: {', '.join(f'{c.name} ({encounter.initiative[c.name.lower()]})' for c in session.engine.turn_order)}")
     print_status(session)
 
     while True:
-        alive = alive_names(session)
-        if player_name not in [name for name in alive]:
+        if not encounter.is_alive(player_name):
             print("\nYou were defeated. Game over.")
             break
-        if len(alive) <= 1:
-            print(f"\nCombat complete. Winner: {alive[0]}")
+        if encounter.is_over():
+            print(f"\nCombat complete. Winner: {', '.join(alive_names(session))}")
             break
 
-        actor_name = turn_order[turn_index % len(turn_order)]
-        if session.engine.is_defeated(actor_name):
-            turn_index += 1
-            continue
-
-        print(f"\nTurn {session.turn_number + 1}: {actor_name}")
+        actor_name = encounter.current().name
+        print(f"\nTurn {session.turn_number + 1} (round {encounter.round + 1}): {actor_name}")
         if actor_name.lower() == player_name.lower():
+            upcoming = encounter.upcoming()
+            if speculator is not None and upcoming is not None and upcoming.name.lower() != player_name.lower():
+                # narrate the AI's likely reply in the background while the player types
+                speculator.speculate(session, upcoming.name, player_name, AI_HEAL_INTENT, AI_ATTACK_INTENT)
             command = input("> ").strip()
             parsed = parse_player_command(session, actor_name, command)
             if parsed is None:
@@ -195,19 +258,29 @@ def run_cli() -> None:
                 continue
 
             actor, target, intent = parsed
-            result = session.process_turn(actor, target, intent)
-            print_turn_result(result)
-            turn_index += 1
+            play_turn(session, actor, target, intent, stream)
+            encounter.advance()
             continue
 
-        result = ai_turn(session, actor_name, player_name)
-        if result is not None:
-            print_turn_result(result)
-        turn_index += 1
+        parsed = ai_intent(session, actor_name, player_name)
+        if parsed is not None:
+            play_turn(session, *parsed, stream=stream)
+        encounter.advance()
 
     print("\nFinal state:")
     print_status(session)
+    if speculator is not None:
+        stats = speculator.stats
+        print(
+            f"Speculation: {stats.hits}/{stats.hits + stats.misses} AI turns prefetched "
+            f"({stats.hit_rate * 100:.0f}%), {stats.prefetched} narrations requested, {stats.wasted} unused"
+        )
+        speculator.close()
 
 
 if __name__ == "__main__":
-    run_cli()
+    run_cli(
+        stream="--stream" in sys.argv[1:],
+        speculate="--speculate" in sys.argv[1:],
+        offline="--offline" in sys.argv[1:],
+    )
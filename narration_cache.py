@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from game_engine import CombatEvent
+
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize_text(text: Optional[str]) -> str:
+    return _NON_WORD.sub(" ", (text or "").casefold()).strip()
+
+
+# upper bounds of the damage and HP buckets a cached narration is shared across
+DAMAGE_BUCKETS = (0, 2, 6)  # none, graze, solid, heavy
+HP_BUCKETS = (0, 5, 12)  # down, critical, bloodied, healthy
+_NUMBER_FIELDS = ("damage", "actor_hp", "target_hp")
+_PLACEHOLDER = re.compile(r"\{(damage|actor_hp|target_hp)\}")
+
+
+def _bucket(value: int, bounds: Tuple[int, ...]) -> int:
+    return bisect_left(bounds, value)
+
+
+def narration_key(event: CombatEvent, action_text: str, scene_state: Optional[dict]) -> str:
+    """Content address for a narration request.
+
+    The event is keyed on its outcome (hit, damage and HP buckets) rather than exact
+    numbers, which ``template_directives``/``render_directives`` swap back in. Scene
+    actors contribute who they are, their gear and whether they are down, but not their
+    HP; intent and scene text are case/punctuation normalized and the turn counter is
+    ignored, so repeated beats share an entry.
+    """
+    scene = None
+    if isinstance(scene_state, dict):
+        scene = {
+            "overview": _normalize_text(scene_state.get("scene_overview")),
+            "actors": [
+                [
+                    _normalize_text(actor.get("name")),
+                    bool(actor.get("defeated")),
+                    _normalize_text(actor.get("weapon")),
+                    _normalize_text(actor.get("armor")),
+                ]
+                for actor in scene_state.get("actors", [])
+            ],
+        }
+    payload = {
+        "event": [
+            event.actor.lower(),
+            event.target.lower(),
+            event.action,
+            event.hit,
+            (event.damage < 0, _bucket(abs(event.damage), DAMAGE_BUCKETS)),
+            _bucket(event.actor_hp, HP_BUCKETS),
+            _bucket(event.target_hp, HP_BUCKETS),
+        ],
+        "intent": _normalize_text(action_text),
+        "scene": scene,
+    }
+    encoded = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _event_numbers(event: CombatEvent) -> Dict[str, int]:
+    numbers = {"damage": abs(event.damage), "actor_hp": event.actor_hp}
+    if event.target.lower() != event.actor.lower():
+        numbers["target_hp"] = event.target_hp
+    return numbers
+
+
+def _directive_texts(directives: dict) -> List[str]:
+    texts = [value for value in directives.values() if isinstance(value, str)]
+    return texts + [note for note in directives.get("state_notes", []) if isinstance(note, str)]
+
+
+def _map_texts(directives: dict, convert: Callable[[str], str]) -> dict:
+    mapped = {key: convert(value) if isinstance(value, str) else value for key, value in directives.items()}
+    if isinstance(mapped.get("state_notes"), list):
+        mapped["state_notes"] = [convert(note) if isinstance(note, str) else note for note in mapped["state_notes"]]
+    return mapped
+
+
+def template_directives(directives: dict, event: CombatEvent) -> Optional[dict]:
+    """``directives`` with the event's damage and HP replaced by placeholders.
+
+    Returns None when two of those numbers are equal and one of them is quoted, since the
+    text cannot say which it meant; such narrations are not shared.
+    """
+    numbers = _event_numbers(event)
+    quoted = {}
+    for name, value in numbers.items():
+        pattern = re.compile(rf"(?<![\d{{]){value}(?![\d}}])")
+        if any(pattern.search(text) for text in _directive_texts(directives)):
+            quoted[name] = pattern
+    values = [numbers[name] for name in quoted]
+    if any(list(numbers.values()).count(value) > 1 for value in values):
+        return None
+    if not quoted:
+        return _copy_directives(directives)
+
+    def convert(text: str) -> str:
+        for name, pattern in quoted.items():
+            text = pattern.sub("{" + name + "}", text)
+        return text
+
+    return _map_texts(directives, convert)
+
+
+def render_directives(template: dict, event: CombatEvent) -> dict:
+    """Fill a ``template_directives`` result with ``event``'s exact numbers."""
+    numbers = {name: str(value) for name, value in _event_numbers(event).items()}
+    numbers.setdefault("target_hp", str(event.target_hp))
+    return _map_texts(template, lambda text: _PLACEHOLDER.sub(lambda match: numbers[match.group(1)], text))
+
+
+def _copy_directives(value: dict) -> dict:
+    copied = dict(value)
+    if isinstance(copied.get("state_notes"), list):
+        copied["state_notes"] = list(copied["state_notes"])
+    return copied
+
+
+class SQLiteNarrationStore:
+    """On-disk narration store so cached beats survive restarts and are shared by workers."""
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        import sqlite3
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS narrations ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS narrations_used ON narrations (used)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM narrations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM narrations WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE narrations SET used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO narrations (key, value, created, used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM narrations WHERE created < ?", (now - self.ttl,))
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM narrations WHERE key IN ("
+                    "SELECT key FROM narrations ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM narrations").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class NarrationCache:
+    """In-memory LRU of validated narrator directives with TTL and an optional backing store."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        store: Optional[SQLiteNarrationStore] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_directives(entry[1])
+
+        value = self.store.get(key) if self.store is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._insert(key, value, now)
+        return _copy_directives(value)
+
+    def put(self, key: str, value: dict) -> None:
+        value = _copy_directives(value)
+        with self._lock:
+            self._insert(key, value, self._clock())
+        if self.store is not None:
+            self.store.put(key, value)
+
+    def _insert(self, key: str, value: dict, now: float) -> None:
+        self._entries[key] = (now, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+@dataclass
+class NarrationChunk:
+    """One piece of a streamed narration: a ``narrative`` text delta or the ``final`` directives."""
+
+    kind: str
+    text: str = ""
+    directives: Optional[dict] = None
+
+
+class IncrementalNarrativeParser:
+    """Pulls the top-level ``narrative`` string out of a JSON object as it streams in.
+
+    ``feed`` accepts arbitrary chunks of the model's output and returns the newly decoded
+    characters of the ``narrative`` value (escapes resolved), so narrative text can be
+    shown before later keys such as ``state_notes`` have arrived. The complete text is
+    kept in ``text`` for a normal parse/validation once the stream ends.
+    """
+
+    def __init__(self, key: str = "narrative"):
+        self.key = key
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        self._expect_key = False
+        self._string_is_key = False
+        self._key_buffer: List[str] = []
+        self._last_key: Optional[str] = None
+        self._capturing = False
+        self.captured_complete = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> str:
+        self._parts.append(chunk)
+        out: List[str] = []
+        for char in chunk:
+            if self._in_string:
+                self._string_char(char, out)
+            elif char == '"':
+                self._in_string = True
+                self._string_is_key = self._depth == 1 and self._expect_key
+                self._capturing = (
+                    self._depth == 1 and not self._expect_key and self._last_key == self.key
+                )
+                self._key_buffer = []
+            elif char in "{[":
+                self._depth += 1
+                if char == "{" and self._depth == 1:
+                    self._expect_key = True
+            elif char in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and char == ",":
+                self._expect_key = True
+                self._last_key = None
+            elif self._depth == 1 and char == ":":
+                self._expect_key = False
+        return "".join(out)
+
+    def _emit(self, text: str, out: List[str]) -> None:
+        if self._string_is_key:
+            self._key_buffer.append(text)
+        elif self._capturing:
+            out.append(text)
+
+    def _string_char(self, char: str, out: List[str]) -> None:
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) < 4:
+                return
+            code = int(self._unicode, 16)
+            self._unicode = None
+            if 0xD800 <= code < 0xDC00:
+                self._high_surrogate = code
+                return
+            if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+                code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+            self._high_surrogate = None
+            self._emit(chr(code), out)
+            return
+        if self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+            else:
+                self._emit(_SIMPLE_ESCAPES.get(char, char), out)
+            return
+        if char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._last_key = "".join(self._key_buffer)
+                self._string_is_key = False
+            elif self._capturing:
+                self._capturing = False
+                self.captured_complete = True
+        else:
+            self._emit(char, out)
@@ -2,31 +2,86 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Optional
+import time
+from typing import Iterator, Optional, Protocol, Tuple
 
 from game_engine import CombatEvent
+from instrumentation import Instrumentation
+from narration_cache import NarrationCache, narration_key, render_directives, template_directives
+from narration_stream import IncrementalNarrativeParser, NarrationChunk
+from narrator_transport import CircuitOpenError, NarratorTransport, is_retryable, shared_clients
+from prompt_builder import BuiltPrompt, PromptBuilder
 from settings import get_openai_api_key, get_openai_model, load_dotenv
 
-import importlib.util
 
-OpenAI = None
-if importlib.util.find_spec("openai") is not None:
-    from openai import OpenAI
+logger = logging.getLogger(__name__)
 
 
-logger = logging.getLogger(__name__)
+class AsyncNarrator(Protocol):
+    """Narrators usable from ``AdventureSession.process_turn_async`` without blocking the loop."""
+
+    async def narrate_structured_async(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        ...
 
 
 class Narrator:
-    """Narrates combat outcomes with optional OpenAI enhancement."""
+    """Narrates combat outcomes with optional OpenAI enhancement.
+
+    Requests go through ``transport`` (deadline, retries, circuit breaker) on the
+    process-wide shared clients; any failure falls back to the deterministic narrative.
+    The clients (and the SDK) are only loaded by the first narration that needs them.
+    """
+
+    _UNSET = object()
 
-    def __init__(self, model: Optional[str] = None):
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        cache: Optional[NarrationCache] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        prompt_builder: Optional[PromptBuilder] = None,
+        transport: Optional[NarratorTransport] = None,
+    ):
         self.model = model or get_openai_model()
-        self._client = None
+        self.cache = cache
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.instrumentation = instrumentation or Instrumentation()
+        self.transport = transport or NarratorTransport()
         load_dotenv()
-        api_key = get_openai_api_key()
-        if OpenAI and api_key:
-            self._client = OpenAI(api_key=api_key)
+        self._sync_slot = self._async_slot = Narrator._UNSET
+
+    def _connect(self) -> None:
+        sync_client, async_client = shared_clients(get_openai_api_key())
+        if self._sync_slot is Narrator._UNSET:
+            self._sync_slot = sync_client
+        if self._async_slot is Narrator._UNSET:
+            self._async_slot = async_client
+
+    @property
+    def _client(self):
+        if self._sync_slot is Narrator._UNSET:
+            self._connect()
+        return self._sync_slot
+
+    @_client.setter
+    def _client(self, client) -> None:
+        self._sync_slot = client
+
+    @property
+    def _async_client(self):
+        if self._async_slot is Narrator._UNSET:
+            self._connect()
+        return self._async_slot
+
+    @_async_client.setter
+    def _async_client(self, client) -> None:
+        self._async_slot = client
 
     def narrate(self, event: CombatEvent, action_text: str) -> str:
         return self.narrate_structured(
@@ -45,39 +100,204 @@ class Narrator:
     ) -> dict:
         fallback = self._fallback_structured(event, action_text)
         if self._client is None:
+            self.instrumentation.count("narrator_fallback", reason="offline")
             return fallback
+        cache_key, cached = self._cache_lookup(event, action_text, scene_state)
+        if cached is not None:
+            return cached
 
-        prompt = (
-            "You are a Dungeon Master assistant for a deterministic rules engine.\n"
-            "Return a JSON object only with keys: narrative, scene_overview_update, state_notes, image_prompt_addendum.\n"
-            "Rules:\n"
-            "- narrative: 2-3 sentences, grounded in mechanics.\n"
-            "- scene_overview_update: short string, empty if unchanged.\n"
-            "- state_notes: array of short notes about non-mechanical world state changes.\n"
-            "- image_prompt_addendum: visual details to append to an image prompt.\n"
-            f"Player intent: {action_text}\n"
-            f"Resolved event: action={event.action}, actor={event.actor}, target={event.target}, "
-            f"hit={event.hit}, damage={event.damage}, actor_hp={event.actor_hp}, target_hp={event.target_hp}.\n"
-            f"Roll details: {[(r.formula, r.rolls, r.modifier, r.total) for r in event.rolls]}\n"
-            f"Mechanics summary: {mechanics_summary}\n"
-            f"Scene state: {scene_state}"
-        )
+        prompt = self._instrumented_prompt(event, action_text, mechanics_summary, scene_state)
+        try:
+            with self.instrumentation.stage("narrator_request"):
+                response = self.transport.call(
+                    self._client.responses.create,
+                    model=self.model,
+                    input=prompt.messages(),
+                    temperature=0.5,
+                )
+            result = self._parse_response(response.output_text, fallback)
+        except Exception as exc:
+            self._log_failure(exc)
+            return fallback
+        self._cache_store(cache_key, event, result, fallback)
+        return result
+
+    def stream_structured(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> Iterator[NarrationChunk]:
+        """Yield ``narrative`` deltas as the completion streams, then one ``final`` chunk.
+
+        The final directives are validated exactly like ``narrate_structured``. If the
+        stream fails before any narrative text arrived, the fallback narrative is yielded
+        instead; if it fails midway, the final chunk carries the fallback and callers
+        should prefer it over the partial text.
+        """
+        fallback = self._fallback_structured(event, action_text)
+        result = None
+        if self._client is None:
+            self.instrumentation.count("narrator_fallback", reason="offline")
+            result = fallback
+        else:
+            key, cached = self._cache_lookup(event, action_text, scene_state)
+            if cached is not None:
+                result = cached
+        if result is not None:
+            yield NarrationChunk("narrative", result["narrative"])
+            yield NarrationChunk("final", directives=result)
+            return
+
+        prompt = self._instrumented_prompt(event, action_text, mechanics_summary, scene_state)
+        parser = IncrementalNarrativeParser()
+        streamed = False
+        # time spent waiting on the backend only, not while the consumer handles a chunk
+        waited = 0.0
+        started: Optional[float] = time.perf_counter()
         try:
-            response = self._client.responses.create(
-                model=self.model,
-                input=[{"role": "user", "content": prompt}],
-                temperature=0.5,
+            stream = iter(
+                self.transport.call(
+                    self._client.responses.create,
+                    model=self.model,
+                    input=prompt.messages(),
+                    temperature=0.5,
+                    stream=True,
+                )
             )
-            parsed = json.loads(response.output_text.strip())
-            return self._validate_structured(parsed, fallback)
+            try:
+                while True:
+                    stream_event = next(stream, None)
+                    waited += time.perf_counter() - started
+                    started = None
+                    if stream_event is None:
+                        break
+                    if getattr(stream_event, "type", "") == "response.output_text.delta":
+                        delta = parser.feed(stream_event.delta)
+                        if delta:
+                            streamed = True
+                            yield NarrationChunk("narrative", delta)
+                    started = time.perf_counter()
+            except Exception as exc:
+                # the transport only sees the stream open; a drop midway counts too
+                if is_retryable(exc):
+                    self.transport.breaker.record_failure()
+                raise
+            result = self._parse_response(parser.text, fallback)
         except Exception as exc:
-            logger.warning(
-                "OpenAI narration failed; using fallback narrative. model=%s error=%s: %s",
-                self.model,
-                type(exc).__name__,
-                exc,
+            if started is not None:
+                waited += time.perf_counter() - started
+            self._log_failure(exc)
+            result = fallback
+        self.instrumentation.timing("narrator_request", waited, mode="stream")
+        self._cache_store(key, event, result, fallback)
+        if not streamed:
+            yield NarrationChunk("narrative", result["narrative"])
+        yield NarrationChunk("final", directives=result)
+
+    async def narrate_structured_async(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        fallback = self._fallback_structured(event, action_text)
+        if self._client is None:
+            self.instrumentation.count("narrator_fallback", reason="offline")
+            return fallback
+        if self._async_client is None:
+            import asyncio
+
+            return await asyncio.to_thread(
+                self.narrate_structured, event, action_text, mechanics_summary, scene_state
             )
+
+        cache_key, cached = self._cache_lookup(event, action_text, scene_state)
+        if cached is not None:
+            return cached
+
+        prompt = self._instrumented_prompt(event, action_text, mechanics_summary, scene_state)
+        try:
+            with self.instrumentation.stage("narrator_request"):
+                response = await self.transport.call_async(
+                    self._async_client.responses.create,
+                    model=self.model,
+                    input=prompt.messages(),
+                    temperature=0.5,
+                )
+            result = self._parse_response(response.output_text, fallback)
+        except Exception as exc:
+            self._log_failure(exc)
             return fallback
+        self._cache_store(cache_key, event, result, fallback)
+        return result
+
+    def _cache_lookup(
+        self, event: CombatEvent, action_text: str, scene_state: Optional[dict]
+    ) -> Tuple[Optional[str], Optional[dict]]:
+        if self.cache is None:
+            return None, None
+        key = narration_key(event, action_text, scene_state)
+        cached = self.cache.get(key)
+        self.instrumentation.count("narration_cache", result="miss" if cached is None else "hit")
+        # entries are shared across a damage/HP bucket; quote this event's exact numbers
+        return key, render_directives(cached, event) if cached is not None else None
+
+    def _cache_store(self, key: Optional[str], event: CombatEvent, result: dict, fallback: dict) -> None:
+        if key is None or result is fallback:
+            return
+        template = template_directives(result, event)
+        if template is not None:
+            self.cache.put(key, template)
+
+    def _instrumented_prompt(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> BuiltPrompt:
+        # mechanics_summary repeats the event and rolls, which the builder encodes itself
+        with self.instrumentation.stage("narrator_prompt"):
+            prompt = self.prompt_builder.build(event, action_text, scene_state)
+        self._report_prompt(prompt)
+        return prompt
+
+    def _report_prompt(self, prompt: BuiltPrompt) -> None:
+        instrumentation = self.instrumentation
+        if not instrumentation.enabled:
+            return
+        instrumentation.observe("narrator_prompt_bytes", len(prompt.text.encode("utf-8")))
+        instrumentation.observe("narrator_prompt_tokens", prompt.prefix_tokens, part="prefix")
+        instrumentation.observe("narrator_prompt_tokens", prompt.body_tokens, part="turn")
+        for step in prompt.truncated:
+            instrumentation.count("narrator_prompt_truncated", step=step)
+
+    def _parse_response(self, output_text: str, fallback: dict) -> dict:
+        instrumentation = self.instrumentation
+        if instrumentation.enabled:
+            instrumentation.observe("narrator_response_bytes", len(output_text.encode("utf-8")))
+        with instrumentation.stage("narrator_parse"):
+            result = self._validate_structured(json.loads(output_text.strip()), fallback)
+        if result is fallback:
+            instrumentation.count("narrator_fallback", reason="invalid")
+        else:
+            instrumentation.count("narrator_success")
+        return result
+
+    def _log_failure(self, exc: Exception) -> None:
+        if isinstance(exc, CircuitOpenError):
+            self.instrumentation.count("narrator_fallback", reason="circuit_open")
+            return
+        self.instrumentation.count("narrator_fallback", reason="error")
+        logger.warning(
+            "OpenAI narration failed; using fallback narrative. model=%s error=%s: %s",
+            self.model,
+            type(exc).__name__,
+            exc,
+        )
 
     @staticmethod
     def _fallback(event: CombatEvent, action_text: str) -> str:
@@ -151,3 +371,45 @@ class Narrator:
             "state_notes": state_notes,
             "image_prompt_addendum": image_prompt_addendum.strip(),
         }
+
+
+class StubNarrator:
+    """Offline narrator that returns the deterministic fallback, optionally after a delay.
+
+    Used for load tests and benchmarks so they exercise the narration path without network.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def narrate(self, event: CombatEvent, action_text: str) -> str:
+        return self.narrate_structured(event, action_text, "", None)["narrative"]
+
+    def narrate_structured(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        if self.delay:
+            time.sleep(self.delay)
+        return self._directives(event, action_text)
+
+    async def narrate_structured_async(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        if self.delay:
+            import asyncio
+
+            await asyncio.sleep(self.delay)
+        return self._directives(event, action_text)
+
+    def _directives(self, event: CombatEvent, action_text: str) -> dict:
+        self.calls += 1
+        return Narrator._fallback_structured(event, action_text)
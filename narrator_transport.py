@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+_clients: Dict[str, Tuple[object, object]] = {}
+_clients_lock = threading.Lock()
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend the circuit breaker considers unhealthy."""
+
+
+def shared_clients(api_key: Optional[str]) -> Tuple[Optional[object], Optional[object]]:
+    """Process-wide (sync, async) OpenAI clients for ``api_key``; ``(None, None)`` offline.
+
+    Every narrator shares one connection pool per key instead of opening its own. SDK
+    retries are off because ``NarratorTransport`` retries within the turn deadline.
+    The SDK is imported on the first call with a key, so offline processes never load it.
+    """
+    if not api_key:
+        return None, None
+    with _clients_lock:
+        if api_key not in _clients:
+            try:
+                from openai import AsyncOpenAI, OpenAI
+            except ImportError:
+                _clients[api_key] = (None, None)
+            else:
+                _clients[api_key] = (
+                    OpenAI(api_key=api_key, max_retries=0),
+                    AsyncOpenAI(api_key=api_key, max_retries=0),
+                )
+        return _clients[api_key]
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Timeouts, dropped connections, throttling and server errors; not bad requests."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS or status >= 500
+    # asyncio.TimeoutError only became the builtin in 3.11; matching by name avoids importing asyncio
+    return type(exc).__name__ in ("TimeoutError", "APIConnectionError", "APITimeoutError")
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and ``allow`` refuses
+    calls for ``reset_timeout`` seconds. Then a single probe is let through (half-open):
+    success closes the circuit, failure opens it for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                if self._opened_at is None:
+                    logger.warning("Narrator backend unhealthy after %d failures; opening circuit", self._failures)
+                self._opened_at = self._clock()
+                self._probing = False
+                self.times_opened += 1
+
+
+class NarratorTransport:
+    """Deadline, retry and circuit-breaker policy around narrator backend calls.
+
+    Each call gets ``turn_budget`` seconds in total. Attempts pass the remaining time as
+    the request ``timeout`` (async calls are also cut off with ``wait_for``), and
+    retryable failures are tried again, ``attempts`` times in all, after a full-jitter
+    backoff that never sleeps past the deadline. While the breaker is open calls raise
+    ``CircuitOpenError`` at once, so callers can fall back without waiting on the backend.
+    """
+
+    def __init__(
+        self,
+        turn_budget: float = 2.0,
+        attempts: int = 3,
+        base_delay: float = 0.05,
+        max_delay: float = 0.5,
+        breaker: Optional[CircuitBreaker] = None,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if attempts <= 0:
+            raise ValueError("attempts must be positive")
+        self.turn_budget = turn_budget
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self.retries = 0
+
+    def call(self, create: Callable[..., object], **request) -> object:
+        deadline = self._clock() + self.turn_budget
+        attempt = 0
+        while True:
+            remaining = self._admit(deadline)
+            try:
+                response = create(**request, timeout=remaining)
+            except Exception as exc:
+                time.sleep(self._after_failure(exc, attempt, deadline))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return response
+
+    async def call_async(self, create: Callable[..., object], **request) -> object:
+        """Like ``call``; ``create`` may be a coroutine function or a blocking one."""
+        import asyncio
+
+        deadline = self._clock() + self.turn_budget
+        attempt = 0
+        while True:
+            remaining = self._admit(deadline)
+            try:
+                if asyncio.iscoroutinefunction(create):
+                    pending = create(**request, timeout=remaining)
+                else:
+                    pending = asyncio.to_thread(create, **request, timeout=remaining)
+                response = await asyncio.wait_for(pending, remaining)
+            except Exception as exc:
+                await asyncio.sleep(self._after_failure(exc, attempt, deadline))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return response
+
+    def _admit(self, deadline: float) -> float:
+        if not self.breaker.allow():
+            raise CircuitOpenError("narrator backend circuit is open")
+        remaining = deadline - self._clock()
+        if remaining <= 0:
+            raise TimeoutError(f"narration exceeded its {self.turn_budget:.2f}s budget")
+        return remaining
+
+    def _after_failure(self, exc: Exception, attempt: int, deadline: float) -> float:
+        """Backoff before the next attempt; re-raises when there is none to make."""
+        if not is_retryable(exc):
+            # the backend answered, it just rejected this request
+            self.breaker.record_success()
+            raise exc
+        self.breaker.record_failure()
+        remaining = deadline - self._clock()
+        if attempt + 1 >= self.attempts or remaining <= 0:
+            raise exc
+        self.retries += 1
+        backoff = self._rng.uniform(0.0, min(self.max_delay, self.base_delay * 2**attempt))
+        return min(backoff, remaining)
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import copy
+import os
+import random
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from character import AbilityScores, Character
+from equipment import Armor, Weapon
+from session import AdventureSession, TurnResult
+
+
+SNAPSHOT_MAGIC = b"DMSS"
+SNAPSHOT_VERSION = 1
+_RECORD_HEADER = struct.Struct("<II")
+_TURN_FIELDS = struct.Struct("<Iii")
+_CHARACTER_FIELDS = struct.Struct("<iii6i")
+_WEAPON_FIELDS = struct.Struct("<iiii")
+_ARMOR_FIELDS = struct.Struct("<iii")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot or journal cannot be decoded or does not replay cleanly."""
+
+
+@dataclass
+class SessionSnapshot:
+    turn_number: int
+    scene_overview: str
+    scene_overview_turn: int
+    characters: List[Character]
+    max_hp: Dict[str, int]
+    rng_state: tuple
+
+
+@dataclass
+class JournalRecord:
+    turn: int
+    actor: str
+    target: str
+    intent: str
+    actor_hp: int
+    target_hp: int
+    scene_overview: Optional[str] = None
+
+
+def capture(session: AdventureSession) -> SessionSnapshot:
+    return SessionSnapshot(
+        turn_number=session.turn_number,
+        scene_overview=session.scene_overview,
+        scene_overview_turn=session._scene_overview_turn,
+        characters=copy.deepcopy(session.engine.turn_order),
+        max_hp=dict(session._max_hp),
+        rng_state=session.engine._rng.getstate(),
+    )
+
+
+def apply_snapshot(session: AdventureSession, snapshot: SessionSnapshot) -> None:
+    """Rewind ``session`` in place to ``snapshot`` (the roster must be the same)."""
+    for saved in snapshot.characters:
+        live = session.engine.characters[saved.name.lower()]
+        live.health = saved.health
+        live.level = saved.level
+        live.ability_scores = copy.copy(saved.ability_scores)
+        live.weapon = copy.copy(saved.weapon)
+        live.armor = copy.copy(saved.armor)
+    session._max_hp = dict(snapshot.max_hp)
+    session.turn_number = snapshot.turn_number
+    session.scene_overview = snapshot.scene_overview
+    session._scene_overview_turn = snapshot.scene_overview_turn
+    session.engine._rng.setstate(snapshot.rng_state)
+    session.scene.resync()
+    if session._encounter is not None:
+        session._encounter.refresh(*(saved.name for saved in snapshot.characters))
+
+
+def restore_session(snapshot: SessionSnapshot, narrator=None, **session_kwargs) -> AdventureSession:
+    session = AdventureSession(
+        copy.deepcopy(snapshot.characters),
+        narrator=narrator,
+        scene_overview=snapshot.scene_overview,
+        rng=random.Random(),
+        **session_kwargs,
+    )
+    apply_snapshot(session, snapshot)
+    return session
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return struct.pack("<I", len(data)) + data
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        if self.offset + layout.size > len(self.data):
+            raise SnapshotError("truncated data")
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def string(self) -> str:
+        (length,) = self.unpack(struct.Struct("<I"))
+        if self.offset + length > len(self.data):
+            raise SnapshotError("truncated string")
+        value = self.data[self.offset : self.offset + length].decode("utf-8")
+        self.offset += length
+        return value
+
+
+def encode_snapshot(snapshot: SessionSnapshot) -> bytes:
+    parts = [
+        SNAPSHOT_MAGIC,
+        struct.pack("<HII", SNAPSHOT_VERSION, snapshot.turn_number, snapshot.scene_overview_turn),
+        _pack_str(snapshot.scene_overview),
+        struct.pack("<H", len(snapshot.characters)),
+    ]
+    for character in snapshot.characters:
+        scores = character.ability_scores
+        parts += [
+            _pack_str(character.name),
+            _pack_str(character.race),
+            _pack_str(character.char_class),
+            _CHARACTER_FIELDS.pack(
+                character.level,
+                character.health,
+                snapshot.max_hp[character.name.lower()],
+                scores.strength,
+                scores.dexterity,
+                scores.constitution,
+                scores.intelligence,
+                scores.wisdom,
+                scores.charisma,
+            ),
+        ]
+        weapon, armor = character.weapon, character.armor
+        parts.append(struct.pack("<B", weapon is not None))
+        if weapon is not None:
+            parts += [
+                _pack_str(weapon.name),
+                _WEAPON_FIELDS.pack(weapon.weight, weapon.speed, weapon.min_damage, weapon.max_damage),
+            ]
+        parts.append(struct.pack("<B", armor is not None))
+        if armor is not None:
+            parts += [_pack_str(armor.name), _ARMOR_FIELDS.pack(armor.weight, armor.speed, armor.protection)]
+
+    version, internal, gauss_next = snapshot.rng_state
+    parts.append(struct.pack(f"<BH{len(internal)}I", version, len(internal), *internal))
+    parts.append(struct.pack("<Bd", gauss_next is not None, gauss_next or 0.0))
+    return b"".join(parts)
+
+
+def decode_snapshot(data: bytes) -> SessionSnapshot:
+    if data[:4] != SNAPSHOT_MAGIC:
+        raise SnapshotError("not a session snapshot")
+    reader = _Reader(data)
+    reader.offset = 4
+    version, turn_number, scene_overview_turn = reader.unpack(struct.Struct("<HII"))
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+    scene_overview = reader.string()
+    (count,) = reader.unpack(struct.Struct("<H"))
+
+    characters = []
+    max_hp = {}
+    for _ in range(count):
+        name, race, char_class = reader.string(), reader.string(), reader.string()
+        level, health, character_max_hp, *scores = reader.unpack(_CHARACTER_FIELDS)
+        weapon = armor = None
+        if reader.unpack(struct.Struct("<B"))[0]:
+            weapon_name = reader.string()
+            weapon = Weapon(weapon_name, *reader.unpack(_WEAPON_FIELDS))
+        if reader.unpack(struct.Struct("<B"))[0]:
+            armor_name = reader.string()
+            armor = Armor(armor_name, *reader.unpack(_ARMOR_FIELDS))
+        characters.append(
+            Character(
+                name=name,
+                race=race,
+                char_class=char_class,
+                level=level,
+                health=health,
+                ability_scores=AbilityScores(*scores),
+                weapon=weapon,
+                armor=armor,
+            )
+        )
+        max_hp[name.lower()] = character_max_hp
+
+    rng_version, length = reader.unpack(struct.Struct("<BH"))
+    internal = reader.unpack(struct.Struct(f"<{length}I"))
+    has_gauss, gauss = reader.unpack(struct.Struct("<Bd"))
+    return SessionSnapshot(
+        turn_number=turn_number,
+        scene_overview=scene_overview,
+        scene_overview_turn=scene_overview_turn,
+        characters=characters,
+        max_hp=max_hp,
+        rng_state=(rng_version, tuple(internal), gauss if has_gauss else None),
+    )
+
+
+def _encode_record(record: JournalRecord) -> bytes:
+    payload = b"".join(
+        [
+            _TURN_FIELDS.pack(record.turn, record.actor_hp, record.target_hp),
+            _pack_str(record.actor),
+            _pack_str(record.target),
+            _pack_str(record.intent),
+            struct.pack("<B", record.scene_overview is not None),
+            _pack_str(record.scene_overview) if record.scene_overview is not None else b"",
+        ]
+    )
+    return _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_record(payload: bytes) -> JournalRecord:
+    reader = _Reader(payload)
+    turn, actor_hp, target_hp = reader.unpack(_TURN_FIELDS)
+    actor, target, intent = reader.string(), reader.string(), reader.string()
+    scene_overview = reader.string() if reader.unpack(struct.Struct("<B"))[0] else None
+    return JournalRecord(turn, actor, target, intent, actor_hp, target_hp, scene_overview)
+
+
+class TurnJournal:
+    """Append-only, checksummed log of turn inputs.
+
+    Each record is ``length, crc32, payload``. Reading stops at the first short or
+    corrupt record, so a write torn by a crash loses at most the turn being written.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = Path(path)
+        self.fsync = fsync
+        self._handle: Optional[BinaryIO] = None
+
+    def _open(self) -> BinaryIO:
+        if self._handle is None:
+            valid_length = self._valid_length()
+            self._handle = open(self.path, "ab")
+            if self._handle.tell() != valid_length:
+                self._handle.truncate(valid_length)
+                self._handle.seek(valid_length)
+        return self._handle
+
+    def _scan(self) -> Iterator[Tuple[int, JournalRecord]]:
+        if not self.path.exists():
+            return
+        data = self.path.read_bytes()
+        offset = 0
+        while offset + _RECORD_HEADER.size <= len(data):
+            length, checksum = _RECORD_HEADER.unpack_from(data, offset)
+            start = offset + _RECORD_HEADER.size
+            payload = data[start : start + length]
+            if len(payload) != length or zlib.crc32(payload) != checksum:
+                return
+            offset = start + length
+            yield offset, _decode_record(payload)
+
+    def _valid_length(self) -> int:
+        end = 0
+        for end, _ in self._scan():
+            pass
+        return end
+
+    def append(self, record: JournalRecord) -> None:
+        handle = self._open()
+        handle.write(_encode_record(record))
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+
+    def records(self) -> Iterator[JournalRecord]:
+        for _, record in self._scan():
+            yield record
+
+    def reset(self) -> None:
+        handle = self._open()
+        handle.truncate(0)
+        handle.seek(0)
+        handle.flush()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class SessionStore:
+    """Crash-safe persistence for one session: periodic snapshots plus a turn journal.
+
+    Call ``save`` after every ``process_turn``: it appends one small journal record and
+    only writes a full snapshot every ``checkpoint_every`` turns, after which the journal
+    is reset. ``recover`` loads the latest snapshot and replays just the journal tail
+    (mechanics only, no narrator calls). Turn history is not persisted.
+    """
+
+    SNAPSHOT_NAME = "session.snapshot"
+    JOURNAL_NAME = "session.journal"
+
+    def __init__(self, directory: str, checkpoint_every: int = 100, fsync: bool = False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_every = checkpoint_every
+        self.fsync = fsync
+        self.journal = TurnJournal(str(self.directory / self.JOURNAL_NAME), fsync=fsync)
+        self._last_overview: Optional[str] = None
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.directory / self.SNAPSHOT_NAME
+
+    def checkpoint(self, session: AdventureSession) -> None:
+        temporary = self.snapshot_path.with_suffix(".tmp")
+        with open(temporary, "wb") as handle:
+            handle.write(encode_snapshot(capture(session)))
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+        os.replace(temporary, self.snapshot_path)
+        self.journal.reset()
+        self._last_overview = session.scene_overview
+
+    def save(self, session: AdventureSession, result: TurnResult) -> None:
+        if not self.snapshot_path.exists():
+            raise SnapshotError("call checkpoint() with the starting session before saving turns")
+        overview = result.scene.overview
+        event = result.event
+        self.journal.append(
+            JournalRecord(
+                turn=result.scene.turn,
+                actor=event.actor,
+                target=event.target,
+                intent=result.intent,
+                actor_hp=event.actor_hp,
+                target_hp=event.target_hp,
+                scene_overview=overview if overview != self._last_overview else None,
+            )
+        )
+        self._last_overview = overview
+        if self.checkpoint_every and session.turn_number % self.checkpoint_every == 0:
+            self.checkpoint(session)
+
+    def recover(self, narrator=None, **session_kwargs) -> Optional[AdventureSession]:
+        if not self.snapshot_path.exists():
+            return None
+        snapshot = decode_snapshot(self.snapshot_path.read_bytes())
+        session = restore_session(snapshot, narrator=narrator, **session_kwargs)
+        for record in self.journal.records():
+            if record.turn <= session.turn_number:
+                continue
+            if record.turn != session.turn_number + 1:
+                raise SnapshotError(f"journal gap: expected turn {session.turn_number + 1}, found {record.turn}")
+            event = session.replay_turn(record.actor, record.target, record.intent)
+            if (event.actor_hp, event.target_hp) != (record.actor_hp, record.target_hp):
+                raise SnapshotError(f"turn {record.turn} replayed to a different outcome")
+            if record.scene_overview is not None:
+                session.scene_overview = record.scene_overview
+                session._scene_overview_turn = record.turn
+        self._last_overview = session.scene_overview
+        return session
+
+    def close(self) -> None:
+        self.journal.close()
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from character import Character
+from combat_profile import combat_profile
+
+
+DEFAULT_HEAL_THRESHOLD = 7
+HEAL_DIE = 8
+TABLE_CACHE_SIZE = 128
+
+Pmf = Tuple[Tuple[int, float], ...]
+
+
+@dataclass(frozen=True)
+class DuelOdds:
+    """Exact outcome of a duel; ``expected_turns`` is conditional on the duel ending."""
+
+    first: str
+    second: str
+    first_wins: float
+    second_wins: float
+    draw: float
+    expected_turns: float
+
+    def win_rate(self, name: str) -> float:
+        if name == self.first:
+            return self.first_wins
+        if name == self.second:
+            return self.second_wins
+        return 0.0
+
+
+def hit_probability(attacker: Character, defender: Character) -> float:
+    """P(d20 + to-hit >= armor class), as resolved by ``GameEngine.perform_action``."""
+    return _hit_probability(combat_profile(attacker).to_hit - combat_profile(defender).armor_class)
+
+
+def damage_pmf(attacker: Character, defender: Character) -> Dict[int, float]:
+    """Damage dealt by one attack action, misses included as 0."""
+    return dict(_damage_pmf_for(attacker, defender))
+
+
+def heal_pmf(character: Character) -> Dict[int, float]:
+    """HP restored by one heal action before the max-HP cap."""
+    return dict(_heal_pmf(combat_profile(character).constitution_mod))
+
+
+@lru_cache(maxsize=None)
+def _hit_probability(margin: int) -> float:
+    return sum(1 for roll in range(1, 21) if roll + margin >= 0) / 20
+
+
+@lru_cache(maxsize=4096)
+def _damage_pmf(margin: int, sides: int, strength_mod: int, min_damage: int) -> Pmf:
+    hit = _hit_probability(margin)
+    pmf: Dict[int, float] = {0: 1.0 - hit} if hit < 1.0 else {}
+    if hit > 0.0:
+        for roll in range(1, sides + 1):
+            damage = max(min_damage, roll + strength_mod)
+            if damage < 0:
+                raise ValueError("negative weapon damage is not supported")
+            pmf[damage] = pmf.get(damage, 0.0) + hit / sides
+    return tuple(sorted(pmf.items()))
+
+
+@lru_cache(maxsize=None)
+def _heal_pmf(constitution_mod: int) -> Pmf:
+    pmf: Dict[int, float] = {}
+    for roll in range(1, HEAL_DIE + 1):
+        amount = max(1, roll + constitution_mod)
+        pmf[amount] = pmf.get(amount, 0.0) + 1 / HEAL_DIE
+    return tuple(sorted(pmf.items()))
+
+
+def _damage_pmf_for(attacker: Character, defender: Character) -> Pmf:
+    profile = combat_profile(attacker)
+    if profile.damage_sides is None:
+        raise ValueError(f"{attacker.name} needs a weapon to fight")
+    margin = profile.to_hit - combat_profile(defender).armor_class
+    return _damage_pmf(margin, profile.damage_sides, profile.strength_mod, profile.min_damage)
+
+
+def duel_key(first: Character, second: Character, heal_threshold: Optional[int] = DEFAULT_HEAL_THRESHOLD) -> tuple:
+    """Everything the duel outcome depends on; characters with equal keys have equal odds."""
+    for character in (first, second):
+        if character.health <= 0:
+            raise ValueError(f"{character.name} must start with positive health")
+    return (
+        first.health,
+        _heal_pmf(combat_profile(first).constitution_mod),
+        _damage_pmf_for(first, second),
+        second.health,
+        _heal_pmf(combat_profile(second).constitution_mod),
+        _damage_pmf_for(second, first),
+        heal_threshold,
+    )
+
+
+def duel_odds(
+    first: Character,
+    second: Character,
+    heal_threshold: Optional[int] = DEFAULT_HEAL_THRESHOLD,
+) -> DuelOdds:
+    """Exact odds of ``first`` (acting first) against ``second`` under the ``main.ai_turn`` policy.
+
+    Same rules as ``simulator.simulate_duels``: a combatant at or below ``heal_threshold``
+    heals (capped at starting HP), otherwise attacks; ``heal_threshold=None`` means
+    attack only. Unlike the simulator there is no turn limit, so ``draw`` is the
+    probability the duel never ends.
+    """
+    key, swapped = _table_key(first, second, heal_threshold)
+    if swapped:
+        table = _tables.get(key, second.health, first.health)[1, :, second.health - 1, first.health - 1]
+    else:
+        table = _tables.get(key, first.health, second.health)[0, :, first.health - 1, second.health - 1]
+    first_wins, ends, turns = (float(value) for value in table)
+    return DuelOdds(
+        first=first.name,
+        second=second.name,
+        first_wins=first_wins,
+        second_wins=max(0.0, ends - first_wins),
+        draw=max(0.0, 1.0 - ends),
+        expected_turns=turns / ends if ends > 0 else math.inf,
+    )
+
+
+def matchup_table(
+    characters: Iterable[Character],
+    heal_threshold: Optional[int] = DEFAULT_HEAL_THRESHOLD,
+) -> np.ndarray:
+    """``table[i, j]`` is the probability that character i, acting first, beats character j.
+
+    Pairs are grouped by their HP-free table key, and each group is answered from one
+    solve sized to its largest HPs, which covers both turn orders and every lower
+    starting HP. The diagonal is NaN.
+    """
+    roster = list(characters)
+    table = np.full((len(roster), len(roster)), np.nan)
+    groups: Dict[tuple, List[Tuple[int, int, int, int, bool]]] = {}
+    for i, first in enumerate(roster):
+        for j, second in enumerate(roster):
+            if i != j:
+                key, swapped = _table_key(first, second, heal_threshold)
+                hp = (second.health, first.health) if swapped else (first.health, second.health)
+                groups.setdefault(key, []).append((i, j, *hp, swapped))
+    for key, pairs in groups.items():
+        solved = _tables.get(key, max(pair[2] for pair in pairs), max(pair[3] for pair in pairs))
+        for i, j, hp1, hp2, swapped in pairs:
+            table[i, j] = solved[int(swapped), 0, hp1 - 1, hp2 - 1]
+    return table
+
+
+def _heal_reach(heal: Pmf, threshold: Optional[int]) -> int:
+    """Highest HP a heal can land on; 0 when the policy never heals."""
+    if threshold is None or threshold < 1:
+        return 0
+    return threshold + heal[-1][0]
+
+
+def _table_key(first: Character, second: Character, heal_threshold: Optional[int]) -> Tuple[tuple, bool]:
+    """HP-free key of the table holding this duel, and whether it is stored with the sides swapped.
+
+    Starting HP only matters through the heal cap, and only when a heal can reach it, so a
+    side's HP appears in the key only below its heal reach (0 otherwise). The two turn
+    orders of a pair share one key.
+    """
+    sides = []
+    for attacker, defender in ((first, second), (second, first)):
+        if attacker.health <= 0:
+            raise ValueError(f"{attacker.name} must start with positive health")
+        heal = _heal_pmf(combat_profile(attacker).constitution_mod)
+        cap = attacker.health if attacker.health < _heal_reach(heal, heal_threshold) else 0
+        sides.append((heal, _damage_pmf_for(attacker, defender), cap))
+    forward, backward = (sides[0], sides[1], heal_threshold), (sides[1], sides[0], heal_threshold)
+    if backward < forward:
+        return backward, True
+    return forward, False
+
+
+class _TableCache:
+    """LRU of solved duel tables keyed by ``_table_key``; a table answers every HP it covers."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.tables: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, first_hp: int, second_hp: int) -> np.ndarray:
+        table = self.tables.get(key)
+        if table is not None and table.shape[2] >= first_hp and table.shape[3] >= second_hp:
+            self.hits += 1
+            self.tables.move_to_end(key)
+            return table
+        self.misses += 1
+        if table is not None:
+            first_hp, second_hp = max(first_hp, table.shape[2]), max(second_hp, table.shape[3])
+        (first_heal, first_damage, _), (second_heal, second_damage, _), threshold = key
+        table = _solve_duel(first_hp, first_heal, first_damage, second_hp, second_heal, second_damage, threshold)
+        self.tables[key] = table
+        self.tables.move_to_end(key)
+        while len(self.tables) > self.maxsize:
+            self.tables.popitem(last=False)
+        return table
+
+    def clear(self) -> None:
+        self.tables.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_tables = _TableCache(TABLE_CACHE_SIZE)
+
+
+def _heal_matrix(pmf: Pmf, max_hp: int, threshold: Optional[int]) -> np.ndarray:
+    matrix = np.zeros((max_hp, max_hp))
+    if threshold is None or threshold < 1:
+        return matrix
+    hp = np.arange(1, min(threshold, max_hp) + 1)
+    for amount, probability in pmf:
+        matrix[hp - 1, np.minimum(max_hp, hp + amount) - 1] += probability
+    return matrix
+
+
+def _hit_matrix(pmf: Pmf, max_hp: int) -> Tuple[np.ndarray, np.ndarray]:
+    matrix = np.zeros((max_hp, max_hp))
+    kill = np.zeros(max_hp)
+    hp = np.arange(1, max_hp + 1)
+    for damage, probability in pmf:
+        left = hp - damage
+        alive = left >= 1
+        matrix[hp[alive] - 1, left[alive] - 1] += probability
+        kill[~alive] += probability
+    return matrix, kill
+
+
+def _core_size(heal: Pmf, max_hp: int, threshold: Optional[int]) -> int:
+    return min(max_hp, _heal_reach(heal, threshold))
+
+
+def _solve_duel(
+    first_hp: int,
+    first_heal: Pmf,
+    first_damage: Pmf,
+    second_hp: int,
+    second_heal: Pmf,
+    second_damage: Pmf,
+    threshold: Optional[int],
+) -> np.ndarray:
+    """(P(mover wins), P(duel ends), E[turns; duel ends]) from every HP pair.
+
+    ``table[0, :, h1 - 1, h2 - 1]`` is the duel with first acting first from (h1, h2),
+    ``table[1]`` the same HP pair with second acting first. Entries below the table
+    size are exact for characters starting there when each side starts at or above its
+    heal reach, since the cap then never binds.
+
+    States are (first HP, second HP) at the start of a round. A round is first's
+    half-turn then second's; each half only moves one HP coordinate, so the round
+    operator is ``V -> sum(X @ V @ Y.T)`` over four pairs of per-HP matrices. Heals are
+    the only source of cycles and start at or below the threshold, so everything above
+    ``threshold + max heal`` HP is solved one HP level at a time (a level only feeds on
+    itself and lower levels) after a small cyclic core. The level blocks are identical,
+    so each is inverted once; the result equals a dense solve over all states.
+    """
+    heal1 = _heal_matrix(first_heal, first_hp, threshold)
+    heal2 = _heal_matrix(second_heal, second_hp, threshold)
+    hit12, kill12 = _hit_matrix(first_damage, second_hp)
+    hit21, kill21 = _hit_matrix(second_damage, first_hp)
+    d1 = (heal1.sum(axis=1) == 0).astype(float)
+    d2 = (heal2.sum(axis=1) == 0).astype(float)
+
+    terms = [
+        (heal1, heal2),
+        (heal1 @ hit21, np.diag(d2)),
+        (np.diag(d1), hit12 @ heal2),
+        (hit21 * d1[:, None], hit12 * d2[None, :]),
+    ]
+    won = np.outer(d1, kill12)
+    lost = np.outer(heal1 @ kill21, d2) + np.outer(d1 * kill21, hit12 @ d2)
+
+    # values[0]: P(first wins), values[1]: P(duel ends), values[2]: E[turns; duel ends]
+    values = np.zeros((3, first_hp, second_hp))
+    core1 = _core_size(first_heal, first_hp, threshold)
+    core2 = _core_size(second_heal, second_hp, threshold)
+
+    if core1 and core2:
+        inner = sum(np.kron(x[:core1, :core1], y[:core2, :core2]) for x, y in terms)
+        solve = _block_solver(inner, reused=False)
+        w, l = won[:core1, :core2].ravel(), lost[:core1, :core2].ravel()
+        solved = solve(np.column_stack([w, w + l]))
+        turns = solve(w + 2 * l + inner @ (2 * solved[:, 1]))
+        values[:, :core1, :core2] = np.vstack([solved.T, turns]).reshape(3, core1, core2)
+
+    solver = None
+    for h1 in range(core1, first_hp) if core2 else ():
+        lower = values[:, :h1, :core2]
+        feed = sum(x[h1, :h1] @ lower @ y[:core2, :core2].T for x, y in terms)
+        inner = sum(x[h1, h1] * y[:core2, :core2] for x, y in terms)
+        solver = _reuse_solver(solver, inner)
+        values[:, h1, :core2] = _solve_level(solver[1], inner, feed, won[h1, :core2], lost[h1, :core2])
+
+    solver = None
+    for h2 in range(core2, second_hp):
+        lower = values[:, :, :h2]
+        feed = sum(x @ lower @ y[h2, :h2] for x, y in terms)
+        inner = sum(x * y[h2, h2] for x, y in terms)
+        solver = _reuse_solver(solver, inner)
+        values[:, :, h2] = _solve_level(solver[1], inner, feed, won[:, h2], lost[:, h2])
+
+    # second acting first from (h1, h2) is the mid-round state after first's half-turn
+    ends = values[1] @ heal2.T + d2 * (kill21[:, None] + hit21 @ values[1])
+    first_wins = values[0] @ heal2.T + d2 * (hit21 @ values[0])
+    done = values[2] + values[1]
+    turns = done @ heal2.T + d2 * (kill21[:, None] + hit21 @ done)
+    return np.stack([values, np.stack([ends - first_wins, ends, turns])])
+
+
+def _solve_level(solve, inner: np.ndarray, feed: np.ndarray, won: np.ndarray, lost: np.ndarray) -> np.ndarray:
+    """Values of one HP level given ``feed``, the lower levels' contribution per quantity."""
+    wins, ends = solve(np.column_stack([won + feed[0], won + lost + feed[1]])).T
+    turns = solve(won + 2 * lost + 2 * feed[1] + feed[2] + inner @ (2 * ends))
+    return np.vstack([wins, ends, turns])
+
+
+def _reuse_solver(previous, inner: np.ndarray):
+    if previous is not None and np.array_equal(previous[0], inner):
+        return previous
+    return inner, _block_solver(inner)
+
+
+def _block_solver(inner: np.ndarray, reused: bool = True):
+    """``rhs -> x`` with ``x = inner @ x + rhs``; states that can never leave the block get 0.
+
+    A state that cannot reach one with outflow (to lower levels or a finished duel) is
+    stuck forever, so the duel never ends from it. Dropping those keeps the system
+    non-singular.
+    """
+    leaks = inner.sum(axis=1) < 1.0 - 1e-12
+    live = _can_leave(inner, leaks)
+    system = np.eye(int(live.sum())) - (inner if live.all() else inner[np.ix_(live, live)])
+    if reused:
+        # level blocks are solved many times; the one-off core is cheaper to solve directly
+        inverse = np.linalg.inv(system)
+        apply = lambda rhs: inverse @ rhs
+    else:
+        apply = lambda rhs: np.linalg.solve(system, rhs)
+    if live.all():
+        return apply
+
+    def solve(rhs: np.ndarray) -> np.ndarray:
+        out = np.zeros(rhs.shape)
+        out[live] = apply(rhs[live])
+        return out
+
+    return solve
+
+
+def _can_leave(inner: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    reachable = exits.copy()
+    while True:
+        grown = reachable | (inner[:, reachable].sum(axis=1) > 0)
+        if (grown == reachable).all():
+            return reachable
+        reachable = grown
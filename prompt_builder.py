@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from game_engine import CombatEvent
+from scene import SceneActors
+
+
+logger = logging.getLogger(__name__)
+
+# rough size of an English/JSON token; good enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+NARRATION_RULES = (
+    "Rules:\n"
+    "- narrative: 2-3 sentences, grounded in mechanics.\n"
+    "- scene_overview_update: short string, empty if unchanged.\n"
+    "- state_notes: array of short notes about non-mechanical world state changes.\n"
+    "- image_prompt_addendum: visual details to append to an image prompt.\n"
+)
+
+ENCODING_LEGEND = (
+    "Turn format:\n"
+    "- intent: the player's words.\n"
+    "- event: the resolved outcome; hit=1/0 (- when no attack), dmg is negative for healing.\n"
+    "- rolls: dice as formula:rolls+modifier=total.\n"
+    "- scene: the current scene overview.\n"
+    "- actors: name,class,race,hp,weapon,armor for the actor and target; "
+    "others: name:hp for bystanders; '!' marks a defeated combatant.\n"
+)
+
+NARRATION_PREFIX = (
+    "You are a Dungeon Master assistant for a deterministic rules engine.\n"
+    "Return a JSON object only with keys: narrative, scene_overview_update, state_notes, image_prompt_addendum.\n"
+    f"{NARRATION_RULES}"
+    f"{ENCODING_LEGEND}"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class BuiltPrompt:
+    """A narration prompt split into the shared prefix and this turn's block."""
+
+    prefix: str
+    body: str
+    truncated: List[str] = field(default_factory=list)
+    over_budget: bool = False
+
+    @property
+    def prefix_tokens(self) -> int:
+        return estimate_tokens(self.prefix)
+
+    @property
+    def body_tokens(self) -> int:
+        return estimate_tokens(self.body)
+
+    @property
+    def text(self) -> str:
+        return f"{self.prefix}{self.body}"
+
+    def messages(self) -> List[Dict[str, str]]:
+        # the prefix never changes between turns, so it goes first and alone to keep it cacheable
+        return [{"role": "system", "content": self.prefix}, {"role": "user", "content": self.body}]
+
+
+class PromptBuilder:
+    """Compact, budgeted narration prompts.
+
+    The instructions and encoding legend form a constant prefix shared by every request.
+    The per-turn block carries the intent, the resolved event, its rolls, the scene
+    overview, full rows for the actor and target and ``name:hp`` for up to
+    ``max_bystanders`` other combatants (the rest are only counted). If the block is
+    over ``budget_tokens`` it is trimmed in order: bystanders, rolls, overview, intent.
+    The event and the involved actors are never dropped.
+    """
+
+    def __init__(self, budget_tokens: int = 256, max_bystanders: int = 8, prefix: str = NARRATION_PREFIX):
+        if budget_tokens <= 0:
+            raise ValueError("budget_tokens must be positive")
+        self.budget_tokens = budget_tokens
+        self.max_bystanders = max_bystanders
+        self.prefix = prefix
+
+    def build(self, event: CombatEvent, action_text: str, scene_state: Optional[dict]) -> BuiltPrompt:
+        body, truncated, over_budget = self.turn_block(event, action_text, scene_state)
+        if over_budget:
+            logger.warning(
+                "Narration prompt for %s -> %s exceeds %d tokens after trimming",
+                event.actor,
+                event.target,
+                self.budget_tokens,
+            )
+        return BuiltPrompt(self.prefix, body, truncated, over_budget)
+
+    def turn_block(
+        self, event: CombatEvent, action_text: str, scene_state: Optional[dict]
+    ) -> Tuple[str, List[str], bool]:
+        """(block, trimming steps applied, still over budget) for one turn."""
+        limit = self.budget_tokens * CHARS_PER_TOKEN
+        intent = " ".join(action_text.split())
+        hit = "-" if event.hit is None else int(event.hit)
+        event_line = (
+            f"event actor={event.actor} target={event.target} action={event.action} "
+            f"hit={hit} dmg={event.damage} actor_hp={event.actor_hp} target_hp={event.target_hp}\n"
+        )
+        rolls = " ".join(f"{r.formula}:{_join(r.rolls)}{r.modifier:+d}={r.total}" for r in event.rolls)
+        rolls_line = f"rolls: {rolls}\n" if rolls else ""
+
+        overview = ""
+        involved: List[str] = []
+        shown: List[str] = []
+        bystanders = defeated_bystanders = 0
+        if isinstance(scene_state, dict):
+            overview = " ".join(str(scene_state.get("scene_overview") or "").split())
+            names = {event.actor.lower(), event.target.lower()}
+            involved_rows, shown_rows, bystanders, defeated_bystanders = _focus(
+                scene_state.get("actors", []), names, self.max_bystanders
+            )
+            for actor in involved_rows:
+                mark = "!" if actor.get("defeated") else ""
+                involved.append(
+                    f"{actor.get('name', '')}{mark},{actor.get('class', '')},{actor.get('race', '')},{actor.get('hp')},"
+                    f"{actor.get('weapon') or '-'},{actor.get('armor') or '-'}"
+                )
+            for actor in shown_rows:
+                shown.append(f"{actor.get('name', '')}{'!' if actor.get('defeated') else ''}:{actor.get('hp')}")
+
+        def others_line() -> str:
+            if not bystanders:
+                return ""
+            hidden = bystanders - len(shown)
+            entries = shown + ([f"+{hidden} more ({defeated_bystanders} defeated overall)"] if hidden else [])
+            return f"others: {' '.join(entries)}\n"
+
+        def render() -> str:
+            scene = f"scene: {overview}\n" if overview else ""
+            actors = f"actors: {' | '.join(involved)}\n" if involved else ""
+            return f"intent: {intent}\n{event_line}{rolls_line}{scene}{actors}{others_line()}"
+
+        truncated: List[str] = []
+        block = render()
+        if len(block) > limit and shown:
+            truncated.append("bystanders")
+            while len(block) > limit and shown:
+                shown.pop()
+                block = render()
+        if len(block) > limit and rolls_line:
+            rolls_line = ""
+            truncated.append("rolls")
+            block = render()
+        if len(block) > limit and overview:
+            overview = _clip(overview, len(overview) - (len(block) - limit))
+            truncated.append("overview")
+            block = render()
+        if len(block) > limit:
+            intent = _clip(intent, len(intent) - (len(block) - limit))
+            truncated.append("intent")
+            block = render()
+        return block, truncated, len(block) > limit
+
+
+def _focus(actors, names: set, limit: int) -> Tuple[List[dict], List[dict], int, int]:
+    """(involved rows, first ``limit`` bystander rows, bystanders, defeated bystanders).
+
+    A tracker's ``SceneActors`` answers this without copying the whole roster; a plain
+    list of rows is scanned.
+    """
+    if isinstance(actors, SceneActors):
+        involved = actors.named(names)
+        defeated = actors.defeated() - sum(bool(row.get("defeated")) for row in involved)
+        return involved, actors.others(names, limit), len(actors) - len(involved), defeated
+    involved, others = [], []
+    for actor in actors:
+        (involved if str(actor.get("name", "")).lower() in names else others).append(actor)
+    defeated = sum(bool(actor.get("defeated")) for actor in others)
+    return involved, others[:limit], len(others), defeated
+
+
+def _join(values: List[int]) -> str:
+    return "+".join(str(value) for value in values) or "0"
+
+
+def _clip(text: str, length: int) -> str:
+    if length >= len(text):
+        return text
+    if length <= 1:
+        return ""
+    return text[: length - 1].rstrip() + "…"
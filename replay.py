@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import bisect
+import copy
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from character import Character
+from game_engine import CombatEvent
+from narrator import StubNarrator
+from persistence import JournalRecord, SessionSnapshot, apply_snapshot, capture, restore_session
+from session import AdventureSession
+
+
+@dataclass
+class TurnInput:
+    actor: str
+    target: str
+    intent: str
+    scene_overview: Optional[str] = None
+
+
+InputLike = Union[TurnInput, Tuple[str, str, str], JournalRecord]
+
+
+def _as_input(value: InputLike) -> TurnInput:
+    if isinstance(value, TurnInput):
+        return value
+    if isinstance(value, JournalRecord):
+        return TurnInput(value.actor, value.target, value.intent, value.scene_overview)
+    actor, target, intent = value
+    return TurnInput(actor, target, intent)
+
+
+class ReplayEngine:
+    """Deterministically rebuild a session from its seed and recorded turn inputs.
+
+    The original session must have been created with ``rng=random.Random(seed)`` (or be
+    resumed from a snapshot via ``from_snapshot``). Turns are re-resolved through the
+    engine only, never the narrator; a checkpoint is kept every ``checkpoint_every``
+    turns so ``jump_to`` restores the nearest one instead of replaying from turn zero.
+    """
+
+    def __init__(
+        self,
+        characters: List[Character],
+        seed: Optional[int],
+        inputs: Iterable[InputLike] = (),
+        checkpoint_every: int = 50,
+        scene_overview: str = "A tense dungeon skirmish lit by torches.",
+        _session: Optional[AdventureSession] = None,
+    ):
+        if checkpoint_every <= 0:
+            raise ValueError("checkpoint_every must be positive")
+        self.inputs: List[TurnInput] = [_as_input(value) for value in inputs]
+        self.checkpoint_every = checkpoint_every
+        self.session = _session or AdventureSession(
+            copy.deepcopy(characters),
+            narrator=StubNarrator(),
+            scene_overview=scene_overview,
+            rng=random.Random(seed),
+            history_limit=0,
+        )
+        self.session.engine.log = deque(maxlen=1)
+        self._base_turn = self.session.turn_number
+        self._checkpoints: Dict[int, SessionSnapshot] = {self._base_turn: capture(self.session)}
+        self._checkpoint_turns: List[int] = [self._base_turn]
+
+    @classmethod
+    def from_snapshot(
+        cls, snapshot: SessionSnapshot, inputs: Iterable[InputLike] = (), checkpoint_every: int = 50
+    ) -> "ReplayEngine":
+        """Start from a persisted snapshot; ``inputs`` are the turns recorded after it."""
+        session = restore_session(snapshot, narrator=StubNarrator(), history_limit=0)
+        return cls([], None, inputs, checkpoint_every=checkpoint_every, _session=session)
+
+    @property
+    def turn(self) -> int:
+        return self.session.turn_number
+
+    @property
+    def last_turn(self) -> int:
+        return self._base_turn + len(self.inputs)
+
+    def record(self, value: InputLike) -> None:
+        self.inputs.append(_as_input(value))
+
+    def step(self) -> CombatEvent:
+        index = self.turn - self._base_turn
+        if index >= len(self.inputs):
+            raise IndexError(f"no recorded input for turn {self.turn + 1}")
+        turn_input = self.inputs[index]
+        event = self.session.replay_turn(turn_input.actor, turn_input.target, turn_input.intent)
+        if turn_input.scene_overview is not None:
+            self.session.scene_overview = turn_input.scene_overview
+            self.session._scene_overview_turn = self.turn
+        if self.turn % self.checkpoint_every == 0 and self.turn not in self._checkpoints:
+            self._checkpoints[self.turn] = capture(self.session)
+            bisect.insort(self._checkpoint_turns, self.turn)
+        return event
+
+    def fast_forward(self, count: Optional[int] = None) -> List[CombatEvent]:
+        """Replay ``count`` more turns (default: every remaining recorded turn)."""
+        target = self.last_turn if count is None else min(self.last_turn, self.turn + count)
+        return [self.step() for _ in range(target - self.turn)]
+
+    def jump_to(self, turn: int) -> AdventureSession:
+        """Put the session in the state it had right after ``turn``."""
+        if not self._base_turn <= turn <= self.last_turn:
+            raise IndexError(f"turn {turn} is outside {self._base_turn}..{self.last_turn}")
+        position = bisect.bisect_right(self._checkpoint_turns, turn) - 1
+        nearest = self._checkpoint_turns[position]
+        if turn < self.turn or nearest > self.turn:
+            apply_snapshot(self.session, self._checkpoints[nearest])
+        while self.turn < turn:
+            self.step()
+        return self.session
+
+    def event_at(self, turn: int) -> CombatEvent:
+        """The event resolved on ``turn`` (1-based), reconstructed without narration."""
+        self.jump_to(turn - 1)
+        return self.step()
+
+    def checkpoints(self) -> Sequence[int]:
+        return tuple(self._checkpoint_turns)
@@ -0,0 +1,49 @@
+"""Deterministic generated rosters for tournaments, matchup tables and benchmarks."""
+from __future__ import annotations
+
+import copy
+import random
+from typing import List
+
+from character import AbilityScores, Character
+from equipment import Armor, Weapon
+
+
+WEAPONS = (
+    Weapon(name="Sword", weight=10, speed=3, min_damage=1, max_damage=8),
+    Weapon(name="Bow", weight=6, speed=4, min_damage=1, max_damage=6),
+    Weapon(name="Axe", weight=12, speed=2, min_damage=2, max_damage=10),
+    Weapon(name="Dagger", weight=1, speed=5, min_damage=1, max_damage=4),
+)
+ARMORS = (
+    None,
+    Armor(name="Leather", weight=10, speed=0, protection=1),
+    Armor(name="Chain Shirt", weight=20, speed=0, protection=2),
+)
+RACES = ("Human", "Drow Elf", "Dwarf", "Half-Orc")
+CLASSES = ("Warrior", "Rogue", "Ranger", "Cleric")
+
+
+def build_roster(size: int, seed: int = 0, health: int = 25) -> List[Character]:
+    """Deterministic roster of ``size`` varied combatants.
+
+    Each combatant gets its own copy of its weapon and armor, so tuning one character's
+    gear leaves the catalogue, the rest of the roster and later rosters untouched.
+    """
+    rng = random.Random(seed)
+    roster = []
+    for index in range(size):
+        scores = AbilityScores(*(rng.randint(8, 18) for _ in range(6)))
+        roster.append(
+            Character(
+                name=f"Combatant{index:03d}",
+                race=RACES[index % len(RACES)],
+                char_class=CLASSES[index % len(CLASSES)],
+                level=rng.randint(1, 10),
+                health=health,
+                ability_scores=scores,
+                weapon=copy.copy(WEAPONS[index % len(WEAPONS)]),
+                armor=copy.copy(ARMORS[index % len(ARMORS)]),
+            )
+        )
+    return roster
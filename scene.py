@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from character import Character
+
+
+ActorDiff = Dict[int, Dict[str, object]]
+
+
+def actor_row(character: Character) -> Dict[str, object]:
+    return {
+        "name": character.name,
+        "class": character.char_class,
+        "race": character.race,
+        "hp": character.health,
+        "defeated": character.health <= 0,
+        "weapon": character.weapon.name if character.weapon else None,
+        "armor": character.armor.name if character.armor else None,
+    }
+
+
+class SceneTracker:
+    """Actor rows of the scene, kept current incrementally with per-version diffs.
+
+    ``update`` re-reads only the characters a turn touched and records the changed
+    fields as a new version. Any retained version can be materialized later from the
+    nearest keyframe (one full copy every ``keyframe_every`` versions) plus diffs, so
+    history holds small diffs instead of full scene copies. With ``max_versions`` only
+    that many recent versions stay materializable; owners that know which versions they
+    still reference (a bounded turn history) can instead ``release_before`` the oldest.
+    """
+
+    def __init__(
+        self,
+        characters: Iterable[Character],
+        keyframe_every: int = 64,
+        max_versions: Optional[int] = None,
+    ):
+        if keyframe_every <= 0:
+            raise ValueError("keyframe_every must be positive")
+        self._characters: List[Character] = list(characters)
+        self._index = {c.name.lower(): i for i, c in enumerate(self._characters)}
+        self._rows: List[Dict[str, object]] = [actor_row(c) for c in self._characters]
+        self._defeated = sum(bool(row["defeated"]) for row in self._rows)
+        self.keyframe_every = keyframe_every
+        self.max_versions = max_versions
+        self.version = 0
+        # state as of ``_base_version``; expired diffs are folded into it
+        self._base_version = 0
+        self._base_rows = [dict(row) for row in self._rows]
+        self._diffs: Deque[ActorDiff] = deque()
+        self._keyframes: Deque[Tuple[int, Tuple[Dict[str, object], ...]]] = deque()
+
+    def update(self, *names: str) -> ActorDiff:
+        """Refresh the named actors and record a new version; returns the changed fields."""
+        changes = self._refresh(names)
+        self._commit(changes)
+        return changes
+
+    def resync(self) -> ActorDiff:
+        """Re-read every actor, for changes made outside the turn pipeline.
+
+        A new version is recorded only if something actually changed.
+        """
+        changes = self._refresh(c.name for c in self._characters)
+        if changes:
+            self._commit(changes)
+        return changes
+
+    def _refresh(self, names: Iterable[str]) -> ActorDiff:
+        changes: ActorDiff = {}
+        for name in names:
+            index = self._index[name.lower()]
+            if index in changes:
+                continue
+            fresh = actor_row(self._characters[index])
+            row = self._rows[index]
+            changed = {key: value for key, value in fresh.items() if row[key] != value}
+            if changed:
+                if "defeated" in changed:
+                    self._defeated += 1 if changed["defeated"] else -1
+                row.update(changed)
+                changes[index] = changed
+        return changes
+
+    def _commit(self, changes: ActorDiff) -> None:
+        self.version += 1
+        self._diffs.append(changes)
+        if self.version % self.keyframe_every == 0:
+            self._keyframes.append((self.version, tuple(dict(row) for row in self._rows)))
+        if self.max_versions is not None and len(self._diffs) > self.max_versions:
+            self._fold(self.version - self.max_versions)
+
+    def release_before(self, version: int) -> None:
+        """Forget versions older than ``version``; it and later ones stay materializable."""
+        self._fold(min(version, self.version + 1) - 1)
+
+    def _fold(self, base_version: int) -> None:
+        while self._base_version < base_version:
+            for index, changed in self._diffs.popleft().items():
+                self._base_rows[index].update(changed)
+            self._base_version += 1
+        while self._keyframes and self._keyframes[0][0] <= self._base_version:
+            self._keyframes.popleft()
+
+    @property
+    def oldest_version(self) -> int:
+        """Earliest version that can still be materialized."""
+        return self._base_version
+
+    def diff(self, version: int) -> ActorDiff:
+        """Fields changed by ``version`` (by actor position in the roster)."""
+        if not self._base_version < version <= self.version:
+            raise LookupError(f"scene diff for version {version} is no longer retained")
+        return self._diffs[version - self._base_version - 1]
+
+    def view(self) -> "SceneActors":
+        """The current actor rows, copied only as far as a reader looks at them."""
+        return SceneActors(self, self.version)
+
+    def actors(self, version: Optional[int] = None) -> List[Dict[str, object]]:
+        """Fresh copies of every actor row as of ``version`` (default: now)."""
+        if version is None or version == self.version:
+            return [dict(row) for row in self._rows]
+        if not self._base_version <= version <= self.version:
+            raise LookupError(f"scene version {version} is no longer retained")
+        start, rows = self._base_version, self._base_rows
+        for keyframe_version, keyframe_rows in self._keyframes:
+            if keyframe_version > version:
+                break
+            start, rows = keyframe_version, keyframe_rows
+        actors = [dict(row) for row in rows]
+        for position in range(start - self._base_version, version - self._base_version):
+            for index, changed in self._diffs[position].items():
+                actors[index].update(changed)
+        return actors
+
+
+class SceneRef:
+    """A turn's scene state, materialized into the full dict only when asked for."""
+
+    __slots__ = ("tracker", "version", "turn", "_overview", "_state")
+
+    def __init__(self, tracker: Optional[SceneTracker], version: int, turn: int, overview: str):
+        self.tracker = tracker
+        self.version = version
+        self.turn = turn
+        self._overview = overview
+        self._state: Optional[Dict[str, object]] = None
+
+    @classmethod
+    def from_state(cls, state: Dict[str, object]) -> "SceneRef":
+        """A ref around an already materialized scene dict, with no tracker behind it."""
+        ref = cls(None, 0, state.get("turn", 0), state.get("scene_overview", ""))
+        ref._state = state
+        return ref
+
+    @property
+    def overview(self) -> str:
+        return self._overview
+
+    @overview.setter
+    def overview(self, value: str) -> None:
+        self._overview = value
+        if self._state is not None:
+            self._state["scene_overview"] = value
+
+    @property
+    def diff(self) -> ActorDiff:
+        if self.tracker is None:
+            raise LookupError("scene diff is not available for a plain scene snapshot")
+        return self.tracker.diff(self.version)
+
+    def materialize(self) -> Dict[str, object]:
+        if self._state is None:
+            self._state = {
+                "turn": self.turn,
+                "scene_overview": self._overview,
+                "actors": self.tracker.actors(self.version),
+            }
+        return self._state
+
+
+class SceneActors:
+    """A version's actor rows as a read-only sequence, copied only when read.
+
+    While the tracker is still at that version, ``get``, ``others`` and ``defeated``
+    read the maintained rows directly, so a prompt that shows a few actors costs
+    O(shown) rather than O(roster). Iterating or indexing materializes every row once;
+    so does any read after the tracker has moved on.
+    """
+
+    __slots__ = ("_tracker", "_version", "_rows")
+
+    def __init__(self, tracker: SceneTracker, version: int):
+        self._tracker = tracker
+        self._version = version
+        self._rows: Optional[List[Dict[str, object]]] = None
+
+    def _live(self) -> bool:
+        return self._rows is None and self._tracker.version == self._version
+
+    def materialize(self) -> List[Dict[str, object]]:
+        if self._rows is None:
+            self._rows = self._tracker.actors(self._version)
+        return self._rows
+
+    def named(self, names: Set[str]) -> List[Dict[str, object]]:
+        """Copies of the rows whose lowercased name is in ``names``, in roster order."""
+        if self._live():
+            index = self._tracker._index
+            return [dict(self._tracker._rows[i]) for i in sorted(index[n] for n in names if n in index)]
+        return [row for row in self.materialize() if str(row["name"]).lower() in names]
+
+    def get(self, name: str) -> Optional[Dict[str, object]]:
+        """Copy of the named actor's row, or None."""
+        rows = self.named({name.lower()})
+        return rows[0] if rows else None
+
+    def others(self, names: Set[str], limit: int) -> List[Dict[str, object]]:
+        """The first ``limit`` rows, in roster order, whose lowercased name is not in ``names``."""
+        rows = self._tracker._rows if self._live() else self.materialize()
+        picked = []
+        for row in rows:
+            if len(picked) >= limit:
+                break
+            if str(row["name"]).lower() not in names:
+                picked.append(dict(row))
+        return picked
+
+    def defeated(self) -> int:
+        """Number of defeated actors."""
+        if self._live():
+            return self._tracker._defeated
+        return sum(bool(row["defeated"]) for row in self.materialize())
+
+    def __len__(self) -> int:
+        return len(self._tracker._characters)
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        return iter(self.materialize())
+
+    def __getitem__(self, index):
+        return self.materialize()[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SceneActors):
+            other = other.materialize()
+        return isinstance(other, list) and self.materialize() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SceneActors({self.materialize()!r})"
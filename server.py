@@ -0,0 +1,542 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import struct
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from game_engine import CombatEvent
+from image_jobs import ImageCache, ImageJobQueue
+from main import ai_intent, build_default_session, parse_player_command
+from narrator import Narrator, StubNarrator
+from session import AdventureSession, TurnResult
+from template_narrator import EscalatingNarrator
+
+
+logger = logging.getLogger(__name__)
+
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class SessionBusy(RuntimeError):
+    """Raised when a session's command queue is full; clients should retry later."""
+
+
+class HostFull(RuntimeError):
+    """Raised when the host is already running ``max_sessions`` sessions."""
+
+
+class SessionClosed(RuntimeError):
+    """Raised to callers whose command was still queued when its session closed or the host stopped."""
+
+
+class BoundedNarrator:
+    """Shares one narrator across sessions with a concurrency cap and load shedding.
+
+    At most ``limit`` narrations run at once and at most ``backlog`` wait for a slot;
+    anything beyond that keeps the deterministic fallback so narration can never queue
+    up without bound behind mechanics.
+    """
+
+    def __init__(self, narrator, limit: int = 64, backlog: int = 1024):
+        self.narrator = narrator
+        self.limit = limit
+        self.backlog = backlog
+        self._semaphore = asyncio.Semaphore(limit)
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.shed = 0
+
+    def narrate(self, event: CombatEvent, action_text: str) -> str:
+        return self.narrator.narrate(event, action_text)
+
+    async def narrate_structured_async(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        if self.pending >= self.limit + self.backlog:
+            self.shed += 1
+            return Narrator._fallback_structured(event, action_text)
+
+        self.pending += 1
+        try:
+            async with self._semaphore:
+                narrate_async = getattr(self.narrator, "narrate_structured_async", None)
+                if callable(narrate_async):
+                    result = await narrate_async(event, action_text, mechanics_summary, scene_state)
+                else:
+                    result = await asyncio.to_thread(
+                        self.narrator.narrate_structured, event, action_text, mechanics_summary, scene_state
+                    )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        return result
+
+
+class HostedSession:
+    def __init__(self, session_id: str, session: AdventureSession, player_name: str, queue_size: int):
+        self.session_id = session_id
+        self.session = session
+        self.player_name = player_name
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.scheduled = False
+        self.closed = False
+        self.subscribers: Set[asyncio.Queue] = set()
+
+    def game_over(self) -> bool:
+        encounter = self.session.encounter
+        return not encounter.is_alive(self.player_name) or encounter.is_over()
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "session_id": self.session_id,
+            "player": self.player_name,
+            "turn": self.session.turn_number,
+            "actors": [
+                {"name": c.name, "hp": c.health, "defeated": c.health <= 0}
+                for c in self.session.engine.turn_order
+            ],
+            "game_over": self.game_over(),
+        }
+
+    def publish(self, message: Dict[str, object]) -> None:
+        for subscriber in list(self.subscribers):
+            subscriber.put_nowait(message)
+
+    def fail_queued(self, reason: str) -> int:
+        """Fail every queued command with ``SessionClosed`` so no ``submit`` caller hangs."""
+        failed = 0
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(SessionClosed(f"session {self.session_id} {reason}"))
+                failed += 1
+        return failed
+
+
+def turn_payload(result: TurnResult) -> Dict[str, object]:
+    event = result.event
+    return {
+        "turn": result.scene.turn,
+        "actor": event.actor,
+        "target": event.target,
+        "action": event.action,
+        "hit": event.hit,
+        "damage": event.damage,
+        "actor_hp": event.actor_hp,
+        "target_hp": event.target_hp,
+        "narrative": result.narrative,
+    }
+
+
+class SessionHost:
+    """Hosts many sessions in one event loop.
+
+    Each session has a bounded command queue (``SessionBusy`` when full) and at most one
+    command in flight, so turns stay ordered. A fixed pool of ``workers`` coroutines pulls
+    ready sessions and resolves their mechanics; narration runs in the background through
+    a shared ``BoundedNarrator``. With an ``ImageJobQueue`` each narrated turn's image
+    prompt is queued for rendering and subscribers get an ``image`` message when it is ready.
+    """
+
+    def __init__(
+        self,
+        narrator=None,
+        workers: int = 8,
+        queue_size: int = 16,
+        max_sessions: int = 10000,
+        narration_limit: int = 64,
+        narration_backlog: int = 1024,
+        session_factory: Optional[Callable[..., Tuple[AdventureSession, str]]] = None,
+        images: Optional[ImageJobQueue] = None,
+    ):
+        self.narrator = narrator
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_sessions = max_sessions
+        self.narration_limit = narration_limit
+        self.narration_backlog = narration_backlog
+        self.session_factory = session_factory or build_default_session
+        self.images = images
+        self.sessions: Dict[str, HostedSession] = {}
+        self.commands_processed = 0
+        self.commands_rejected = 0
+        self.commands_dropped = 0
+        self._ids = itertools.count(1)
+        self._bounded_narrator: Optional[BoundedNarrator] = None
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._bounded_narrator = BoundedNarrator(
+            self.narrator or EscalatingNarrator(), self.narration_limit, self.narration_backlog
+        )
+        self._ready = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for hosted in self.sessions.values():
+            self.commands_dropped += hosted.fail_queued("was stopped with the host")
+            hosted.scheduled = False
+        for hosted in self.sessions.values():
+            await hosted.session.wait_for_narration()
+
+    def create_session(self) -> HostedSession:
+        if self._ready is None:
+            raise RuntimeError("SessionHost.start() must be awaited first")
+        if len(self.sessions) >= self.max_sessions:
+            raise HostFull(f"host is at capacity ({self.max_sessions} sessions)")
+        session_id = f"s{next(self._ids)}"
+        session, player_name = self.session_factory(narrator=self._bounded_narrator)
+        hosted = HostedSession(session_id, session, player_name, self.queue_size)
+        self.sessions[session_id] = hosted
+        return hosted
+
+    def close_session(self, session_id: str) -> None:
+        hosted = self.sessions.pop(session_id, None)
+        if hosted is not None:
+            # a command already running finishes; the worker skips the session after that
+            hosted.closed = True
+            self.commands_dropped += hosted.fail_queued("was closed")
+
+    def get(self, session_id: str) -> HostedSession:
+        return self.sessions[session_id]
+
+    async def submit(self, session_id: str, command: str) -> Dict[str, object]:
+        hosted = self.sessions[session_id]
+        if not self._tasks:
+            raise SessionClosed("host is not running")
+        if hosted.queue.full():
+            self.commands_rejected += 1
+            raise SessionBusy(f"session {session_id} has {hosted.queue.qsize()} queued commands")
+        future = asyncio.get_running_loop().create_future()
+        hosted.queue.put_nowait((command, future))
+        if not hosted.scheduled:
+            hosted.scheduled = True
+            self._ready.put_nowait(hosted)
+        return await future
+
+    def stats(self) -> Dict[str, object]:
+        narrator = self._bounded_narrator
+        return {
+            "sessions": len(self.sessions),
+            "ready_sessions": self._ready.qsize() if self._ready else 0,
+            "commands_processed": self.commands_processed,
+            "commands_rejected": self.commands_rejected,
+            "commands_dropped": self.commands_dropped,
+            "narrations_pending": narrator.pending if narrator else 0,
+            "narrations_completed": narrator.completed if narrator else 0,
+            "narrations_failed": narrator.failed if narrator else 0,
+            "narrations_shed": narrator.shed if narrator else 0,
+            "images_pending": self.images.pending() if self.images else 0,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            hosted = await self._ready.get()
+            if hosted.closed or hosted.queue.empty():
+                hosted.scheduled = False
+                continue
+            command, future = hosted.queue.get_nowait()
+            try:
+                outcome = await self._run_command(hosted, command)
+            except asyncio.CancelledError:
+                if not future.done():
+                    self.commands_dropped += 1
+                    future.set_exception(SessionClosed(f"session {hosted.session_id} was stopped with the host"))
+                raise
+            except Exception as exc:
+                logger.exception("Command failed for session %s", hosted.session_id)
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(outcome)
+            self.commands_processed += 1
+            if hosted.queue.empty():
+                hosted.scheduled = False
+            else:
+                self._ready.put_nowait(hosted)
+            # Yield so narration callbacks and socket I/O run between mechanics batches.
+            await asyncio.sleep(0)
+
+    async def _run_command(self, hosted: HostedSession, command: str) -> Dict[str, object]:
+        session = hosted.session
+        if hosted.game_over():
+            return {"error": "game over", **hosted.status()}
+
+        parsed = parse_player_command(session, hosted.player_name, command)
+        if parsed is None:
+            return {"error": "invalid command", **hosted.status()}
+        if parsed[0] in ("quit", "help", "status"):
+            return hosted.status()
+
+        results = [await session.process_turn_async(*parsed)]
+        for character in session.engine.turn_order:
+            if hosted.game_over():
+                break
+            if character.name == hosted.player_name or character.health <= 0:
+                continue
+            ai_parsed = ai_intent(session, character.name, hosted.player_name)
+            if ai_parsed is not None:
+                results.append(await session.process_turn_async(*ai_parsed))
+
+        for result in results:
+            result.narration.add_done_callback(lambda _task, result=result: self._narrated(hosted, result))
+        return {"turns": [turn_payload(result) for result in results], **hosted.status()}
+
+    def _narrated(self, hosted: HostedSession, result: TurnResult) -> None:
+        hosted.publish({"type": "narration", **turn_payload(result)})
+        if self.images is None:
+            return
+        # the image prompt is final only once narration has filled in its details
+        loop = asyncio.get_running_loop()
+        turn = result.scene.turn
+
+        def rendered(job) -> None:
+            if not job.cancelled() and job.exception() is None:
+                message = {"type": "image", "turn": turn, "path": job.result()}
+                loop.call_soon_threadsafe(hosted.publish, message)
+
+        self.images.submit_turn(hosted.session_id, result).add_done_callback(rendered)
+
+
+class SessionServer:
+    """Minimal HTTP/1.1 + WebSocket front end for a ``SessionHost`` (stdlib only).
+
+    Routes:
+      POST /sessions                   create a session
+      GET  /sessions/<id>              session status
+      POST /sessions/<id>/commands     {"command": "..."} -> resolved turns
+      GET  /sessions/<id>/ws           WebSocket; text frames are commands, narration is pushed
+      GET  /stats                      host counters
+    """
+
+    def __init__(self, host: SessionHost, address: str = "127.0.0.1", port: int = 8765):
+        self.host = host
+        self.address = address
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> None:
+        await self.host.start()
+        self._server = await asyncio.start_server(self._handle, self.address, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.host.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        logger.info("Serving sessions on http://%s:%s", self.address, self.port)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self._websocket(path, headers, reader, writer)
+                    break
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, object]]:
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+        try:
+            if method == "GET" and parts == ["stats"]:
+                return 200, self.host.stats()
+            if method == "POST" and parts == ["sessions"]:
+                return 201, self.host.create_session().status()
+            if len(parts) >= 2 and parts[0] == "sessions":
+                hosted = self.host.get(parts[1])
+                if method == "GET" and len(parts) == 2:
+                    return 200, hosted.status()
+                if method == "POST" and parts[2:] == ["commands"]:
+                    request = json.loads(body or b"{}")
+                    if not isinstance(request, dict):
+                        return 400, {"error": "body must be a JSON object"}
+                    command = request.get("command", "")
+                    if not isinstance(command, str):
+                        return 400, {"error": "command must be a string"}
+                    return 200, await self.host.submit(hosted.session_id, command)
+        except KeyError:
+            return 404, {"error": "unknown session"}
+        except SessionBusy as exc:
+            return 429, {"error": str(exc)}
+        except (HostFull, SessionClosed) as exc:
+            return 503, {"error": str(exc)}
+        except json.JSONDecodeError:
+            return 400, {"error": "body must be a JSON object"}
+        except Exception as exc:
+            # command failures already carry a traceback from the worker that ran them
+            logger.warning("%s %s failed: %s: %s", method, path, type(exc).__name__, exc)
+            return 500, {"error": "internal error"}
+        return 404, {"error": "not found"}
+
+    async def _websocket(self, path, headers, reader, writer) -> None:
+        parts = [part for part in path.split("/") if part]
+        hosted = self.host.sessions.get(parts[1]) if len(parts) == 3 and parts[2] == "ws" else None
+        key = headers.get("sec-websocket-key")
+        if hosted is None or not key:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+
+        accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode("latin-1")
+        )
+        outbox: asyncio.Queue = asyncio.Queue()
+        hosted.subscribers.add(outbox)
+
+        async def pump() -> None:
+            while True:
+                message = await outbox.get()
+                if message is None:
+                    # everything queued before the close has been sent
+                    writer.write(_encode_frame(0x8, struct.pack("!H", 1011)))
+                    await writer.drain()
+                    return
+                writer.write(_encode_frame(0x1, json.dumps(message).encode("utf-8")))
+                await writer.drain()
+
+        sender = asyncio.create_task(pump())
+        try:
+            while True:
+                opcode, payload = await _read_frame(reader)
+                if opcode == 0x8:
+                    writer.write(_encode_frame(0x8, payload[:2]))
+                    break
+                if opcode == 0x9:
+                    writer.write(_encode_frame(0xA, payload))
+                    continue
+                if opcode != 0x1:
+                    continue
+                try:
+                    outcome = await self.host.submit(hosted.session_id, payload.decode("utf-8"))
+                    outbox.put_nowait({"type": "turns", **outcome})
+                except SessionBusy as exc:
+                    outbox.put_nowait({"type": "error", "error": str(exc)})
+                except (SessionClosed, KeyError) as exc:
+                    # the session (or the whole host) is gone: say why, then close the socket
+                    error = str(exc) if isinstance(exc, SessionClosed) else "unknown session"
+                    outbox.put_nowait({"type": "error", "error": error})
+                    outbox.put_nowait(None)
+                    await sender
+                    break
+                except Exception:
+                    # the worker already logged it; keep the socket usable
+                    outbox.put_nowait({"type": "error", "error": "internal error"})
+        finally:
+            hosted.subscribers.discard(outbox)
+            sender.cancel()
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+    return first & 0x0F, payload
+
+
+def _encode_frame(opcode: int, payload: bytes) -> bytes:
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack("!H", length)
+    else:
+        header += bytes([127]) + struct.pack("!Q", length)
+    return header + payload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Host many Dungeon Master sessions over HTTP/WebSocket.")
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--narration-limit", type=int, default=64)
+    parser.add_argument("--stub-narrator", action="store_true", help="never call the OpenAI API")
+    parser.add_argument("--images", help="render turn illustrations (stub renderer) into this cache directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    host = SessionHost(
+        narrator=StubNarrator() if args.stub_narrator else None,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        max_sessions=args.max_sessions,
+        narration_limit=args.narration_limit,
+        images=ImageJobQueue(ImageCache(args.images)) if args.images else None,
+    )
+    asyncio.run(SessionServer(host, args.address, args.port).serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,109 @@
 from __future__ import annotations
 
+import itertools
+import logging
 import random
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 from character import Character
+from combat_log import CombatLog
+from encounter import Encounter
 from game_engine import CombatEvent, GameEngine
+from instrumentation import Instrumentation
 from narrator import Narrator
+from scene import SceneRef, SceneTracker
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+logger = logging.getLogger(__name__)
+
+_session_ids = itertools.count(1)
 
 
-@dataclass
 class TurnResult:
-    event: CombatEvent
-    mechanics_summary: str
-    state_delta: Dict[str, object]
-    scene_state: Dict[str, object]
-    narrative: str
-    image_prompt: str
-    ai_state_notes: List[str]
+    """One recorded turn: mechanics, narration and a reference to the scene after it.
+
+    ``scene`` is a ``SceneRef`` that materializes the full scene on demand, so equality
+    and ``repr`` go through ``scene_state`` rather than the ref itself.
+    """
+
+    def __init__(
+        self,
+        event: CombatEvent,
+        mechanics_summary: str,
+        state_delta: Dict[str, object],
+        scene: Union[SceneRef, Dict[str, object], None] = None,
+        narrative: str = "",
+        image_prompt: str = "",
+        ai_state_notes: Optional[List[str]] = None,
+        intent: str = "",
+        narration: Optional[asyncio.Future] = None,
+        scene_state: Optional[Dict[str, object]] = None,
+    ):
+        # ``scene_state=`` (or a dict in place of the ref) is the pre-SceneRef signature
+        if scene is None:
+            if scene_state is None:
+                raise TypeError("TurnResult needs a scene")
+            scene = scene_state
+        self.event = event
+        self.mechanics_summary = mechanics_summary
+        self.state_delta = state_delta
+        self.scene = scene if isinstance(scene, SceneRef) else SceneRef.from_state(scene)
+        self.narrative = narrative
+        self.image_prompt = image_prompt
+        self.ai_state_notes = [] if ai_state_notes is None else ai_state_notes
+        self.intent = intent
+        self.narration = narration
+
+    @property
+    def scene_state(self) -> Dict[str, object]:
+        """Full scene snapshot after this turn, rebuilt from the scene diffs on first access."""
+        return self.scene.materialize()
+
+    @scene_state.setter
+    def scene_state(self, state: Dict[str, object]) -> None:
+        self.scene = SceneRef.from_state(state)
+
+    def _fields(self) -> tuple:
+        return (
+            self.event,
+            self.mechanics_summary,
+            self.state_delta,
+            self.scene_state,
+            self.narrative,
+            self.image_prompt,
+            self.ai_state_notes,
+            self.intent,
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TurnResult):
+            return NotImplemented
+        return self is other or self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"TurnResult(event={self.event!r}, mechanics_summary={self.mechanics_summary!r}, "
+            f"state_delta={self.state_delta!r}, scene_state={self.scene_state!r}, "
+            f"narrative={self.narrative!r}, image_prompt={self.image_prompt!r}, "
+            f"ai_state_notes={self.ai_state_notes!r}, intent={self.intent!r})"
+        )
+
+
+@dataclass
+class TurnStreamChunk:
+    kind: str
+    text: str = ""
+    result: Optional[TurnResult] = None
+    event: Optional[CombatEvent] = None
+    mechanics_summary: str = ""
+    state_delta: Optional[Dict[str, object]] = None
 
 
 class AdventureSession:
@@ -29,15 +115,127 @@ class AdventureSession:
         narrator: Optional[Narrator] = None,
         scene_overview: str = "A tense dungeon skirmish lit by torches.",
         rng: Optional[random.Random] = None,
+        event_log: Optional[CombatLog] = None,
+        history_limit: Optional[int] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        factions: Optional[Dict[str, str]] = None,
+        initiative_rng: Optional[random.Random] = None,
+        session_id: Optional[str] = None,
     ):
-        self.engine = GameEngine(characters, rng=rng)
-        self.narrator = narrator or Narrator()
+        # tells narrators shared between sessions which scene a request belongs to
+        self.session_id = session_id or f"session-{next(_session_ids)}"
+        self.engine = GameEngine(characters, rng=rng, log=event_log)
+        self.instrumentation = instrumentation or Instrumentation()
+        self.narrator = narrator or Narrator(instrumentation=self.instrumentation)
         self.scene_overview = scene_overview
         self.turn_number = 0
-        self.history: List[TurnResult] = []
+        self.history: Union[List[TurnResult], Deque[TurnResult]] = (
+            [] if history_limit is None else deque(maxlen=history_limit)
+        )
+        # a bounded history releases scene versions older than its oldest turn (see _record_turn)
+        self.scene = SceneTracker(characters)
         self._max_hp: Dict[str, int] = {c.name.lower(): c.health for c in characters}
+        self._scene_overview_turn = 0
+        self._factions = factions
+        self._initiative_rng = initiative_rng
+        self._encounter: Optional[Encounter] = None
+        self._pending_narrations: Set[asyncio.Future] = set()
+
+    @property
+    def encounter(self) -> Encounter:
+        """Initiative scheduler and alive indexes, built on first use.
+
+        Initiative uses its own RNG so rolling it never shifts the engine's dice stream.
+        """
+        if self._encounter is None:
+            self._encounter = Encounter(self.engine.turn_order, factions=self._factions, rng=self._initiative_rng)
+        return self._encounter
 
     def process_turn(self, actor_name: str, target_name: str, intent: str) -> TurnResult:
+        instrumentation = self.instrumentation
+        with instrumentation.stage("turn"):
+            with instrumentation.stage("mechanics"):
+                event, mechanics, state_delta = self._resolve_mechanics(actor_name, target_name, intent)
+            with instrumentation.stage("scene_state"):
+                pre_narration_scene_state = self._narration_scene()
+            with instrumentation.stage("narration"):
+                directives = self._narrator_directives(event, intent, mechanics, pre_narration_scene_state)
+            return self._record_turn(event, intent, mechanics, state_delta, directives)
+
+    def process_turn_stream(self, actor_name: str, target_name: str, intent: str) -> Iterator[TurnStreamChunk]:
+        """Resolve a turn, yielding mechanics first, then narrative deltas, then the result.
+
+        Chunks arrive as ``mechanics`` (event, summary and state delta), zero or more
+        ``narrative`` text deltas, and a final ``result`` carrying the same ``TurnResult``
+        ``process_turn`` would return. Narrators without ``stream_structured`` produce a
+        single narrative chunk.
+        """
+        with self.instrumentation.stage("mechanics"):
+            event, mechanics, state_delta = self._resolve_mechanics(actor_name, target_name, intent)
+        pre_narration_scene_state = self._narration_scene()
+        result = None
+        try:
+            yield TurnStreamChunk("mechanics", event=event, mechanics_summary=mechanics, state_delta=state_delta)
+            directives = None
+            stream_structured = getattr(self.narrator, "stream_structured", None)
+            if callable(stream_structured):
+                for chunk in stream_structured(event, intent, mechanics, pre_narration_scene_state):
+                    if chunk.kind == "narrative":
+                        yield TurnStreamChunk("narrative", text=chunk.text)
+                    elif chunk.kind == "final":
+                        directives = chunk.directives
+            if not isinstance(directives, dict) or "narrative" not in directives:
+                directives = self._narrator_directives(event, intent, mechanics, pre_narration_scene_state)
+                yield TurnStreamChunk("narrative", text=directives["narrative"])
+            result = self._record_turn(event, intent, mechanics, state_delta, directives)
+        finally:
+            if result is None:
+                # the consumer abandoned the stream (or narration raised) after the mechanics
+                # were applied; record the turn anyway so history matches ``turn_number``
+                result = self._record_turn(
+                    event, intent, mechanics, state_delta, Narrator._fallback_structured(event, intent)
+                )
+        yield TurnStreamChunk("result", result=result, event=event, mechanics_summary=mechanics, state_delta=state_delta)
+
+    async def process_turn_async(self, actor_name: str, target_name: str, intent: str) -> TurnResult:
+        """Resolve mechanics now and narrate in the background.
+
+        The returned result carries the deterministic fallback narrative; ``result.narration``
+        is a task that fills in the enhanced narrative, notes and scene update when the
+        narrator answers. Await it (or ``wait_for_narration``) to observe the final text.
+        """
+        with self.instrumentation.stage("mechanics"):
+            event, mechanics, state_delta = self._resolve_mechanics(actor_name, target_name, intent)
+        with self.instrumentation.stage("scene_state"):
+            pre_narration_scene_state = self._narration_scene()
+            # the narration runs after later turns may have released this version
+            pre_narration_scene_state["actors"] = pre_narration_scene_state["actors"].materialize()
+        result = self._record_turn(
+            event, intent, mechanics, state_delta, Narrator._fallback_structured(event, intent)
+        )
+        import asyncio
+
+        result.narration = asyncio.ensure_future(
+            self._enhance_narration(result, intent, pre_narration_scene_state)
+        )
+        self._pending_narrations.add(result.narration)
+        result.narration.add_done_callback(self._pending_narrations.discard)
+        return result
+
+    async def wait_for_narration(self) -> None:
+        if self._pending_narrations:
+            import asyncio
+
+            await asyncio.gather(*list(self._pending_narrations), return_exceptions=True)
+
+    def replay_turn(self, actor_name: str, target_name: str, intent: str) -> CombatEvent:
+        """Re-apply a recorded turn's mechanics without narration or history."""
+        event, _, _ = self._resolve_mechanics(actor_name, target_name, intent)
+        return event
+
+    def _resolve_mechanics(
+        self, actor_name: str, target_name: str, intent: str
+    ) -> Tuple[CombatEvent, str, Dict[str, object]]:
         actor = self.engine.characters[actor_name.lower()]
         target = self.engine.characters[target_name.lower()]
         actor_hp_before = actor.health
@@ -45,44 +243,95 @@ class AdventureSession:
 
         event = self.engine.perform_action(actor_name, target_name, intent)
         self._cap_healing(actor.name, actor_hp_before, event)
+        self.scene.update(actor.name, target.name)
+        if self._encounter is not None:
+            self._encounter.refresh(actor.name, target.name)
 
         self.turn_number += 1
         mechanics = self._mechanics_summary(event)
         state_delta = self._state_delta(event, actor_hp_before, target_hp_before)
-        pre_narration_scene_state = self.scene_state()
-        directives = self._narrator_directives(event, intent, mechanics, pre_narration_scene_state)
-        self._apply_scene_overview_update(directives.get("scene_overview_update", ""))
-        scene_state = self.scene_state()
+        return event, mechanics, state_delta
+
+    def _record_turn(
+        self,
+        event: CombatEvent,
+        intent: str,
+        mechanics: str,
+        state_delta: Dict[str, object],
+        directives: Dict[str, object],
+    ) -> TurnResult:
+        self._apply_scene_overview_update(directives.get("scene_overview_update", ""), self.turn_number)
+        scene = SceneRef(self.scene, self.scene.version, self.turn_number, self.scene_overview)
         narrative = directives["narrative"]
-        image_prompt = self._image_prompt(event, intent, narrative, directives.get("image_prompt_addendum", ""))
+        with self.instrumentation.stage("image_prompt"):
+            image_prompt = self._image_prompt(event, intent, narrative, directives.get("image_prompt_addendum", ""))
 
         result = TurnResult(
             event=event,
             mechanics_summary=mechanics,
             state_delta=state_delta,
-            scene_state=scene_state,
+            scene=scene,
             narrative=narrative,
             image_prompt=image_prompt,
             ai_state_notes=directives.get("state_notes", []),
+            intent=intent,
         )
         self.history.append(result)
+        if isinstance(self.history, deque):
+            # only versions referenced by retained turns need their diffs; resyncs between
+            # turns (status checks, restores, external edits) don't push turns out
+            oldest = self.history[0].scene.version if self.history else self.scene.version + 1
+            self.scene.release_before(oldest)
+        return result
+
+    async def _enhance_narration(
+        self, result: TurnResult, intent: str, scene_state: Dict[str, object]
+    ) -> TurnResult:
+        turn = scene_state["turn"]
+        try:
+            with self.instrumentation.stage("narration", mode="async"):
+                directives = await self._narrator_directives_async(
+                    result.event, intent, result.mechanics_summary, scene_state
+                )
+        except Exception as exc:
+            logger.warning("Async narration failed for turn %s: %s: %s", turn, type(exc).__name__, exc)
+            return result
+
+        if self._apply_scene_overview_update(directives.get("scene_overview_update", ""), turn):
+            result.scene.overview = self.scene_overview
+        result.narrative = directives["narrative"]
+        result.ai_state_notes = directives.get("state_notes", [])
+        result.image_prompt = self._image_prompt(
+            result.event,
+            intent,
+            result.narrative,
+            directives.get("image_prompt_addendum", ""),
+            turn_number=turn,
+            scene_overview=result.scene.overview,
+        )
         return result
 
     def scene_state(self) -> Dict[str, object]:
-        actors = []
-        for character in self.engine.turn_order:
-            actors.append(
-                {
-                    "name": character.name,
-                    "class": character.char_class,
-                    "race": character.race,
-                    "hp": character.health,
-                    "defeated": character.health <= 0,
-                    "weapon": character.weapon.name if character.weapon else None,
-                    "armor": character.armor.name if character.armor else None,
-                }
-            )
-        return {"turn": self.turn_number, "scene_overview": self.scene_overview, "actors": actors}
+        """Full scene snapshot, re-reading every actor to pick up changes made outside turns."""
+        self.scene.resync()
+        return self._scene_snapshot()
+
+    def _scene_snapshot(self) -> Dict[str, object]:
+        # turns keep the tracker current, so this only copies the maintained rows
+        return {"turn": self.turn_number, "scene_overview": self.scene_overview, "actors": self.scene.actors()}
+
+    def _narration_scene(self) -> Dict[str, object]:
+        """The scene as handed to the narrator, plus this session's id.
+
+        Actor rows stay behind a ``SceneActors`` view, so a prompt that shows the actor,
+        the target and a few bystanders does not copy the whole roster every turn.
+        """
+        return {
+            "turn": self.turn_number,
+            "scene_overview": self.scene_overview,
+            "actors": self.scene.view(),
+            "session": self.session_id,
+        }
 
     def _cap_healing(self, actor_name: str, actor_hp_before: int, event: CombatEvent) -> None:
         if event.action != "heal":
@@ -96,6 +345,8 @@ class AdventureSession:
         event.damage = -healed
         event.actor_hp = actor.health
         event.target_hp = actor.health
+        if self.engine.log:
+            self.engine.log[-1] = event
 
     def _state_delta(self, event: CombatEvent, actor_hp_before: int, target_hp_before: int) -> Dict[str, object]:
         actor_hp_after = self.engine.characters[event.actor.lower()].health
@@ -130,11 +381,23 @@ class AdventureSession:
         lines.append(f"hit={event.hit} | damage={event.damage} | actor_hp={event.actor_hp} | target_hp={event.target_hp}")
         return "\n".join(lines)
 
-    def _image_prompt(self, event: CombatEvent, intent: str, narrative: str, addendum: str) -> str:
+    def _image_prompt(
+        self,
+        event: CombatEvent,
+        intent: str,
+        narrative: str,
+        addendum: str,
+        turn_number: Optional[int] = None,
+        scene_overview: Optional[str] = None,
+    ) -> str:
+        if turn_number is None:
+            turn_number = self.turn_number
+        if scene_overview is None:
+            scene_overview = self.scene_overview
         base = (
             "Illustration prompt for a fantasy RPG scene. "
-            f"Scene: {self.scene_overview} "
-            f"Turn {self.turn_number}: {event.actor} attempts '{intent}' against {event.target}. "
+            f"Scene: {scene_overview} "
+            f"Turn {turn_number}: {event.actor} attempts '{intent}' against {event.target}. "
             f"Outcome: action={event.action}, hit={event.hit}, damage={event.damage}, "
             f"{event.actor} hp={event.actor_hp}, {event.target} hp={event.target_hp}. "
             f"Narrative tone: {narrative}"
@@ -168,10 +431,35 @@ class AdventureSession:
             "image_prompt_addendum": "",
         }
 
-    def _apply_scene_overview_update(self, update: str) -> None:
+    async def _narrator_directives_async(
+        self,
+        event: CombatEvent,
+        intent: str,
+        mechanics_summary: str,
+        scene_state: Dict[str, object],
+    ) -> Dict[str, object]:
+        narrate_structured_async = getattr(self.narrator, "narrate_structured_async", None)
+        if callable(narrate_structured_async):
+            result = await narrate_structured_async(
+                event=event,
+                action_text=intent,
+                mechanics_summary=mechanics_summary,
+                scene_state=scene_state,
+            )
+            if isinstance(result, dict) and "narrative" in result:
+                return result
+            return Narrator._fallback_structured(event, intent)
+
+        import asyncio
+
+        return await asyncio.to_thread(self._narrator_directives, event, intent, mechanics_summary, scene_state)
+
+    def _apply_scene_overview_update(self, update: str, turn: int) -> bool:
         if not isinstance(update, str):
-            return
+            return False
         update = update.strip()
-        if not update:
-            return
+        if not update or turn < self._scene_overview_turn:
+            return False
         self.scene_overview = update
+        self._scene_overview_turn = turn
+        return True
@@ -2,11 +2,21 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
+from typing import Set
 
+_loaded: Set[str] = set()
 
-def load_dotenv(dotenv_path: str = ".env") -> None:
-    """Load simple KEY=VALUE pairs from a local .env file into process env."""
-    path = Path(dotenv_path)
+
+def load_dotenv(dotenv_path: str = ".env", reload: bool = False) -> None:
+    """Load simple KEY=VALUE pairs from a local .env file into process env.
+
+    Each file is read once per process; ``reload`` reads it again.
+    """
+    resolved = os.path.abspath(dotenv_path)
+    if resolved in _loaded and not reload:
+        return
+    _loaded.add(resolved)
+    path = Path(resolved)
     if not path.exists():
         return
 
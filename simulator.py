@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import copy
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from character import Character
+from combat_profile import combat_profile
+from game_engine import GameEngine
+
+
+DEFAULT_HEAL_THRESHOLD = 7
+DEFAULT_MAX_TURNS = 500
+
+
+@dataclass
+class DuelStats:
+    """Aggregated outcome of many independent duels between the same two characters."""
+
+    first: str
+    second: str
+    trials: int
+    wins: Dict[str, int]
+    draws: int
+    turn_counts: np.ndarray
+    damage_histograms: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def win_rate(self, name: str) -> float:
+        return self.wins.get(name, 0) / self.trials if self.trials else 0.0
+
+    @property
+    def mean_turns(self) -> float:
+        finished = self.turn_counts.sum()
+        if not finished:
+            return 0.0
+        return float((np.arange(len(self.turn_counts)) * self.turn_counts).sum() / finished)
+
+
+def _combat_numbers(character: Character) -> Tuple[int, int, int, int, int, int]:
+    profile = combat_profile(character)
+    if profile.damage_sides is None:
+        raise ValueError(f"{character.name} needs a weapon to be simulated")
+    return (
+        profile.to_hit,
+        profile.armor_class,
+        profile.damage_sides,
+        profile.strength_mod,
+        profile.min_damage,
+        profile.constitution_mod,
+    )
+
+
+def simulate_duels(
+    first: Character,
+    second: Character,
+    trials: int,
+    seed: Optional[int] = None,
+    heal_threshold: Optional[int] = DEFAULT_HEAL_THRESHOLD,
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> DuelStats:
+    """Resolve ``trials`` duels at once with NumPy, mirroring ``GameEngine.perform_action``.
+
+    ``first`` acts on even turns and ``second`` on odd turns. A combatant at or below
+    ``heal_threshold`` HP heals instead of attacking (the ``main.ai_turn`` policy) and
+    healing is capped at starting HP like ``AdventureSession`` does. Pass
+    ``heal_threshold=None`` for attack-only duels.
+    """
+    if trials <= 0:
+        raise ValueError("trials must be positive")
+    rng = np.random.default_rng(seed)
+    sides = [_combat_numbers(first), _combat_numbers(second)]
+    max_hp = [first.health, second.health]
+    names = [first.name, second.name]
+
+    hp = [np.full(trials, first.health, dtype=np.int64), np.full(trials, second.health, dtype=np.int64)]
+    active = np.arange(trials)
+    winners = np.full(trials, -1, dtype=np.int8)
+    turns = np.zeros(trials, dtype=np.int64)
+    damage_counts = [np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)]
+
+    for turn in range(max_turns):
+        if active.size == 0:
+            break
+        me, foe = turn % 2, 1 - turn % 2
+        to_hit, _, dmg_sides, dmg_mod, min_damage, con_mod = sides[me]
+        foe_ac = sides[foe][1]
+        my_hp = hp[me][active]
+        foe_hp = hp[foe][active]
+
+        if heal_threshold is None:
+            healing = np.zeros(active.size, dtype=bool)
+        else:
+            healing = my_hp <= heal_threshold
+        if healing.any():
+            healed = np.maximum(1, rng.integers(1, 9, size=active.size) + con_mod)
+            my_hp = np.where(healing, np.minimum(my_hp + healed, max_hp[me]), my_hp)
+            hp[me][active] = my_hp
+
+        attack = rng.integers(1, 21, size=active.size) + to_hit
+        hit = (attack >= foe_ac) & ~healing
+        damage = np.maximum(min_damage, rng.integers(1, dmg_sides + 1, size=active.size) + dmg_mod)
+        damage = np.where(hit, damage, 0)
+        foe_hp = foe_hp - damage
+        hp[foe][active] = foe_hp
+
+        if hit.any():
+            counts = np.bincount(np.maximum(damage[hit], 0))
+            if counts.size > damage_counts[me].size:
+                counts[: damage_counts[me].size] += damage_counts[me]
+                damage_counts[me] = counts
+            else:
+                damage_counts[me][: counts.size] += counts
+
+        done = foe_hp <= 0
+        if done.any():
+            finished = active[done]
+            winners[finished] = me
+            turns[finished] = turn + 1
+            active = active[~done]
+
+    finished = winners >= 0
+    return DuelStats(
+        first=names[0],
+        second=names[1],
+        trials=trials,
+        wins={names[0]: int((winners == 0).sum()), names[1]: int((winners == 1).sum())},
+        draws=int((~finished).sum()),
+        turn_counts=np.bincount(turns[finished], minlength=1),
+        damage_histograms={names[0]: damage_counts[0], names[1]: damage_counts[1]},
+    )
+
+
+def simulate_duel(
+    first: Character,
+    second: Character,
+    rng: random.Random,
+    heal_threshold: Optional[int] = DEFAULT_HEAL_THRESHOLD,
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> Tuple[Optional[str], int, Dict[str, list]]:
+    """Play one duel through ``GameEngine.perform_action``; returns (winner, turns, damage dealt)."""
+    combatants = [copy.deepcopy(first), copy.deepcopy(second)]
+    max_hp = [c.health for c in combatants]
+    engine = GameEngine(combatants, rng=rng)
+    damage: Dict[str, list] = {c.name: [] for c in combatants}
+
+    for turn in range(max_turns):
+        me, foe = combatants[turn % 2], combatants[1 - turn % 2]
+        if heal_threshold is not None and me.health <= heal_threshold:
+            engine.perform_action(me.name, me.name, "I steady myself and recover.")
+            me.health = min(me.health, max_hp[turn % 2])
+            continue
+        event = engine.perform_action(me.name, foe.name, "I attack.")
+        if event.hit:
+            damage[me.name].append(event.damage)
+        if foe.health <= 0:
+            return me.name, turn + 1, damage
+    return None, max_turns, damage
+
+
+def simulate_duels_scalar(
+    first: Character,
+    second: Character,
+    trials: int,
+    seed: Optional[int] = None,
+    heal_threshold: Optional[int] = DEFAULT_HEAL_THRESHOLD,
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> DuelStats:
+    """Reference implementation of ``simulate_duels`` using the scalar engine path."""
+    rng = random.Random(seed)
+    wins = {first.name: 0, second.name: 0}
+    draws = 0
+    turn_list = []
+    damage_lists: Dict[str, list] = {first.name: [], second.name: []}
+    for _ in range(trials):
+        winner, turns, damage = simulate_duel(first, second, rng, heal_threshold, max_turns)
+        for name, values in damage.items():
+            damage_lists[name].extend(values)
+        if winner is None:
+            draws += 1
+            continue
+        wins[winner] += 1
+        turn_list.append(turns)
+
+    return DuelStats(
+        first=first.name,
+        second=second.name,
+        trials=trials,
+        wins=wins,
+        draws=draws,
+        turn_counts=np.bincount(np.asarray(turn_list, dtype=np.int64), minlength=1),
+        damage_histograms={
+            name: np.bincount(np.maximum(np.asarray(values, dtype=np.int64), 0), minlength=0)
+            for name, values in damage_lists.items()
+        },
+    )
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from game_engine import CombatEvent
+from instrumentation import Instrumentation
+from narration_cache import narration_key, render_directives, template_directives
+from narration_stream import NarrationChunk
+from narrator import Narrator
+from probability import DEFAULT_HEAL_THRESHOLD, damage_pmf, heal_pmf, hit_probability
+
+
+logger = logging.getLogger(__name__)
+
+TurnInput = Tuple[str, str, str]
+
+
+@dataclass
+class Candidate:
+    """One predicted turn: the event it would produce and how likely it is."""
+
+    probability: float
+    event: CombatEvent
+    intent: str
+    scene_state: Dict[str, object]
+
+
+@dataclass
+class SpeculationStats:
+    rounds: int = 0
+    prefetched: int = 0
+    skipped_budget: int = 0
+    hits: int = 0
+    misses: int = 0
+    wasted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def turn_outcomes(session, actor_name: str, target_name: str, intent: str, hp: Dict[str, int]) -> List[Tuple[float, CombatEvent]]:
+    """Every event ``intent`` can resolve to from the HP state ``hp``, with probabilities.
+
+    Mirrors ``GameEngine.perform_action`` and the session's heal cap; hits are bucketed
+    by exact damage, which is what narration keys distinguish.
+    """
+    engine = session.engine
+    actor = engine.characters[actor_name.lower()]
+    target = engine.characters[target_name.lower()]
+    action = engine.parse_action(intent)
+    actor_hp, target_hp = hp[actor.name.lower()], hp[target.name.lower()]
+
+    if action == "observe":
+        return [(1.0, CombatEvent(actor.name, target.name, action, None, 0, actor_hp, target_hp))]
+    if action == "heal":
+        max_hp = session._max_hp[actor.name.lower()]
+        healed: Dict[int, float] = {}
+        for amount, probability in heal_pmf(actor).items():
+            after = max(actor_hp, min(max_hp, actor_hp + amount))
+            healed[after] = healed.get(after, 0.0) + probability
+        return [
+            (probability, CombatEvent(actor.name, actor.name, action, None, actor_hp - after, after, after))
+            for after, probability in healed.items()
+        ]
+
+    hit = hit_probability(actor, target)
+    outcomes = []
+    if hit < 1.0:
+        outcomes.append((1.0 - hit, CombatEvent(actor.name, target.name, action, False, 0, actor_hp, target_hp)))
+    for damage, probability in damage_pmf(actor, target).items():
+        if damage == 0:
+            probability -= 1.0 - hit
+        if probability > 1e-12:
+            outcomes.append(
+                (probability, CombatEvent(actor.name, target.name, action, True, damage, actor_hp, target_hp - damage))
+            )
+    return outcomes
+
+
+def _apply(hp: Dict[str, int], event: CombatEvent) -> Dict[str, int]:
+    after = dict(hp)
+    after[event.actor.lower()] = event.actor_hp
+    after[event.target.lower()] = event.target_hp
+    return after
+
+
+def _match_key(event: CombatEvent, intent: str, scene_state: Optional[dict]) -> str:
+    """``narration_key`` without the scene overview.
+
+    The player's narration usually rewrites the overview after the AI's turn was
+    predicted, so keying on it would make every prefetch miss; a prefetch narrated
+    against the previous overview is still a fitting narration for the beat.
+    """
+    if isinstance(scene_state, dict):
+        scene_state = {**scene_state, "scene_overview": ""}
+    return narration_key(event, intent, scene_state)
+
+
+def _scene_after(scene: Dict[str, object], hp: Dict[str, int]) -> Dict[str, object]:
+    # only HP and defeat change within a turn; narration keys ignore the turn number
+    actors = []
+    for actor in scene["actors"]:
+        health = hp[str(actor["name"]).lower()]
+        actors.append({**actor, "hp": health, "defeated": health <= 0})
+    return {**scene, "actors": actors}
+
+
+class SpeculativeNarrator:
+    """Narrator wrapper that prefetches narrations for the AI's likely next turn.
+
+    ``speculate`` is called while the player is still deciding. It enumerates the
+    outcomes of the player's expected action, applies the AI policy (heal at or below
+    ``heal_threshold``, otherwise attack the player) to each, and narrates the most
+    likely AI events in background threads. When the player's turn is then narrated
+    through this wrapper its exact outcome is known, so the round is narrowed to the
+    AI events still possible from there (prefetching them while the player's own
+    narration runs) and the rest are cancelled. When the AI's real turn matches a
+    prefetch its narration is served with no backend round trip.
+
+    Speculation is paid for in backend calls: each AI turn can cost up to
+    ``max_candidates`` narrations per phase (two phases) on top of the real ones, and
+    all but one are thrown away. The defaults keep that to a few calls per turn;
+    ``min_probability`` drops unlikely candidates and ``max_calls_per_minute`` caps
+    speculative calls overall. Prefetches expire after ``ttl`` seconds. ``stats``
+    tracks hits, misses and wasted prefetches.
+    """
+
+    def __init__(
+        self,
+        narrator=None,
+        max_candidates: int = 3,
+        min_probability: float = 0.03,
+        max_calls_per_minute: int = 20,
+        ttl: float = 60.0,
+        workers: int = 4,
+        heal_threshold: int = DEFAULT_HEAL_THRESHOLD,
+        instrumentation: Optional[Instrumentation] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.narrator = narrator or Narrator()
+        self.max_candidates = max_candidates
+        self.min_probability = min_probability
+        self.max_calls_per_minute = max_calls_per_minute
+        self.ttl = ttl
+        self.heal_threshold = heal_threshold
+        self.instrumentation = instrumentation or getattr(self.narrator, "instrumentation", None) or Instrumentation()
+        self.stats = SpeculationStats()
+        self._clock = clock
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self._prefetched: Dict[str, Tuple[float, Future]] = {}
+        self._plan: Optional[tuple] = None
+        self._call_times: Deque[float] = deque()
+
+    def predict(
+        self,
+        session,
+        ai_name: str,
+        player_name: str,
+        heal_intent: str,
+        attack_intent: str,
+        player_turn: Optional[TurnInput] = None,
+    ) -> List[Candidate]:
+        """Most likely AI events after ``player_turn`` (default: the player attacks the AI).
+
+        ``heal_intent`` and ``attack_intent`` are the texts the AI policy acts with; they
+        are part of the narration key, so they must match the real turn's intent.
+        """
+        hp = {key: character.health for key, character in session.engine.characters.items()}
+        scene = session._narration_scene()
+        plan = (session, ai_name, player_name, heal_intent, attack_intent)
+        candidates: List[Candidate] = []
+        for probability, event in turn_outcomes(session, *(player_turn or (player_name, ai_name, "I attack")), hp):
+            candidates.extend(self._ai_candidates(plan, _apply(hp, event), scene, probability))
+        return self._most_likely(candidates)
+
+    def _ai_candidates(
+        self, plan: tuple, hp: Dict[str, int], scene: Dict[str, object], prior: float
+    ) -> List[Candidate]:
+        session, ai_name, player_name, heal_intent, attack_intent = plan
+        if hp[ai_name.lower()] <= 0 or hp[player_name.lower()] <= 0:
+            return []
+        if hp[ai_name.lower()] <= self.heal_threshold:
+            ai_turn = (ai_name, ai_name, heal_intent)
+        else:
+            ai_turn = (ai_name, player_name, attack_intent)
+        return [
+            Candidate(prior * probability, event, ai_turn[2], _scene_after(scene, _apply(hp, event)))
+            for probability, event in turn_outcomes(session, *ai_turn, hp)
+            if prior * probability >= self.min_probability
+        ]
+
+    def _most_likely(self, candidates: List[Candidate]) -> List[Candidate]:
+        """The ``max_candidates`` likeliest distinct narrations.
+
+        Events in the same damage/HP bucket share a narration key (and one prefetch), so
+        their probabilities are pooled before ranking.
+        """
+        merged: Dict[str, Candidate] = {}
+        for candidate in sorted(candidates, key=lambda candidate: -candidate.probability):
+            key = _match_key(candidate.event, candidate.intent, candidate.scene_state)
+            if key in merged:
+                merged[key].probability += candidate.probability
+            else:
+                merged[key] = candidate
+        return sorted(merged.values(), key=lambda candidate: -candidate.probability)[: self.max_candidates]
+
+    def speculate(
+        self,
+        session,
+        ai_name: str,
+        player_name: str,
+        heal_intent: str,
+        attack_intent: str,
+        player_turn: Optional[TurnInput] = None,
+    ) -> int:
+        """Start prefetching the AI's likely next narrations; returns how many were queued."""
+        candidates = self.predict(session, ai_name, player_name, heal_intent, attack_intent, player_turn)
+        with self._lock:
+            self._discard()
+            self._plan = (session, ai_name, player_name, heal_intent, attack_intent)
+            self.stats.rounds += 1
+            return self._queue(candidates)
+
+    def _refine(self, scene_state: Optional[dict]) -> None:
+        """Narrow the round to the AI events possible from the state after the player's turn."""
+        plan = self._plan
+        if plan is None or not isinstance(scene_state, dict):
+            return
+        try:
+            hp = {str(actor["name"]).lower(): int(actor["hp"]) for actor in scene_state["actors"]}
+            candidates = self._most_likely(self._ai_candidates(plan, hp, scene_state, 1.0))
+        except (KeyError, TypeError, ValueError):
+            return
+        keys = {_match_key(c.event, c.intent, c.scene_state) for c in candidates}
+        with self._lock:
+            if self._plan is not plan:
+                return
+            for key in [key for key in self._prefetched if key not in keys]:
+                self._prefetched.pop(key)[1].cancel()
+                self.stats.wasted += 1
+            self._queue(candidates)
+
+    def _queue(self, candidates: List[Candidate]) -> int:
+        now = self._clock()
+        while self._call_times and now - self._call_times[0] >= 60.0:
+            self._call_times.popleft()
+        queued = 0
+        for candidate in candidates:
+            key = _match_key(candidate.event, candidate.intent, candidate.scene_state)
+            if key in self._prefetched:
+                continue
+            if len(self._call_times) >= self.max_calls_per_minute:
+                self.stats.skipped_budget += 1
+                continue
+            self._call_times.append(now)
+            self._prefetched[key] = (now + self.ttl, self._pool.submit(self._narrate, candidate))
+            queued += 1
+        self.stats.prefetched += queued
+        self.instrumentation.count("speculation_prefetch", queued)
+        return queued
+
+    def _narrate(self, candidate: Candidate) -> Optional[dict]:
+        result = self.narrator.narrate_structured(candidate.event, candidate.intent, "", candidate.scene_state)
+        if result == Narrator._fallback_structured(candidate.event, candidate.intent):
+            # the backend failed or is offline; a live call may still do better
+            return None
+        # one prefetch serves every event in its damage/HP bucket; claims fill in the numbers
+        return template_directives(result, candidate.event)
+
+    def _discard(self) -> None:
+        """Drop every outstanding prefetch of the current round as wasted."""
+        for _, future in self._prefetched.values():
+            future.cancel()
+        self.stats.wasted += len(self._prefetched)
+        self._prefetched.clear()
+        self._plan = None
+
+    def _claim(self, event: CombatEvent, action_text: str, scene_state: Optional[dict]) -> Optional[Future]:
+        """The prefetch for this turn, if any; the speculated actor's turn settles the round."""
+        plan = self._plan
+        if plan is None:
+            return None
+        if plan[1].lower() != event.actor.lower():
+            self._refine(scene_state)
+            return None
+        with self._lock:
+            entry = self._prefetched.pop(_match_key(event, action_text, scene_state), None)
+            if entry is not None and (entry[0] <= self._clock() or entry[1].cancelled()):
+                self.stats.wasted += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+            self._discard()
+        self.instrumentation.count("speculation", result="miss" if entry is None else "hit")
+        return None if entry is None else entry[1]
+
+    def narrate(self, event: CombatEvent, action_text: str) -> str:
+        return self.narrator.narrate(event, action_text)
+
+    def narrate_structured(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        future = self._claim(event, action_text, scene_state)
+        result = future.result() if future is not None else None
+        if result is None:
+            return self.narrator.narrate_structured(event, action_text, mechanics_summary, scene_state)
+        return render_directives(result, event)
+
+    def stream_structured(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> Iterator[NarrationChunk]:
+        future = self._claim(event, action_text, scene_state)
+        result = future.result() if future is not None else None
+        if result is not None:
+            result = render_directives(result, event)
+            yield NarrationChunk("narrative", result["narrative"])
+            yield NarrationChunk("final", directives=result)
+            return
+        stream_structured = getattr(self.narrator, "stream_structured", None)
+        if callable(stream_structured):
+            yield from stream_structured(event, action_text, mechanics_summary, scene_state)
+            return
+        result = self.narrator.narrate_structured(event, action_text, mechanics_summary, scene_state)
+        yield NarrationChunk("narrative", result["narrative"])
+        yield NarrationChunk("final", directives=result)
+
+    async def narrate_structured_async(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        future = self._claim(event, action_text, scene_state)
+        result = await asyncio.wrap_future(future) if future is not None else None
+        if result is not None:
+            return render_directives(result, event)
+        narrate_async = getattr(self.narrator, "narrate_structured_async", None)
+        if callable(narrate_async):
+            return await narrate_async(event, action_text, mechanics_summary, scene_state)
+        return await asyncio.to_thread(self.narrator.narrate_structured, event, action_text, mechanics_summary, scene_state)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+from game_engine import CombatEvent
+from instrumentation import Instrumentation
+from narration_stream import NarrationChunk
+from narrator import Narrator
+from scene import SceneActors
+
+
+logger = logging.getLogger(__name__)
+
+# (action, outcome) -> narrative templates; the outcome of an attack that lands is its
+# severity, so a graze and a crushing blow never share wording
+NARRATIVES: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ("attack", "miss"): (
+        "{actor} {strike}, but {target} twists aside at the last instant. {target} remains at {target_hp} HP.",
+        "{actor} {strike}; {target} reads it early and the blow finds only air. {target} holds at {target_hp} HP.",
+        "{target} slips the attack as {actor} {strike}, leaving {actor} off balance. {target} stays at {target_hp} HP.",
+        "{actor} {strike}, too slow by a heartbeat. {target} gives ground but is untouched at {target_hp} HP.",
+    ),
+    ("attack", "graze"): (
+        "{actor} {strike} and clips {target} for {damage} damage. {target} is at {target_hp} HP.",
+        "A glancing blow: {actor} {strike}, drawing a thin line of blood from {target} ({damage} damage, {target_hp} HP left).",
+        "{actor} {strike}, barely catching {target} for {damage}. {target} is at {target_hp} HP.",
+    ),
+    ("attack", "solid"): (
+        "{actor} {strike} and connects cleanly, dealing {damage} damage. {target} staggers to {target_hp} HP.",
+        "{target} is too slow as {actor} {strike}; the hit lands for {damage} and leaves {target} at {target_hp} HP.",
+        "{actor} {strike} and drives {target} back with a {damage}-damage hit. {target} is at {target_hp} HP.",
+        "The blow lands as {actor} {strike}: {damage} damage, and {target} drops to {target_hp} HP.",
+    ),
+    ("attack", "heavy"): (
+        "{actor} {strike} with brutal force, tearing {damage} HP from {target}, who reels at {target_hp} HP.",
+        "A devastating blow: {actor} {strike} and {target} takes {damage} damage, left at {target_hp} HP.",
+        "{actor} {strike} and the impact rings through the chamber. {target} loses {damage} HP and sinks to {target_hp}.",
+    ),
+    ("attack", "kill"): (
+        "{actor} {strike} and the {damage}-damage blow ends it. {target} collapses and does not rise.",
+        "{target} has nothing left as {actor} {strike}; {damage} damage drops {target} to the floor.",
+        "With a final effort {actor} {strike}. {target} falls, defeated.",
+    ),
+    ("heal", "capped"): (
+        "{actor} catches their breath, but is already as steady as they will get at {actor_hp} HP.",
+        "{actor} tends to scratches that barely matter, holding at {actor_hp} HP.",
+    ),
+    ("heal", "recover"): (
+        "{actor} steadies their breath and recovers {healed} HP, rising to {actor_hp} HP.",
+        "{actor} takes a moment to bind a wound, regaining {healed} HP ({actor_hp} HP now).",
+        "A quick draught and a muttered prayer: {actor} recovers {healed} HP and stands at {actor_hp} HP.",
+        "{actor} falls back a step and gathers strength, healing {healed} HP to reach {actor_hp} HP.",
+    ),
+    ("observe", "any"): (
+        "{actor} pauses to assess the battlefield after trying to '{intent}'. {target} stands at {target_hp} HP.",
+        "{actor} circles warily, studying {target}'s guard. {target} is at {target_hp} HP.",
+        "{actor} holds back and watches {target} for an opening. {target} waits at {target_hp} HP.",
+    ),
+}
+
+# appended after the narrative when the target is left in a notable state
+CONDITIONS: Dict[str, Tuple[str, ...]] = {
+    "bloodied": (" {target} is bloodied and breathing hard.", " {target}'s guard is starting to sag."),
+    "critical": (" {target} can barely stay standing.", " One more hit could finish {target}."),
+}
+
+STATE_NOTES: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ("attack", "miss"): ("{target} evades and keeps distance.", "{target} reads {actor}'s rhythm."),
+    ("attack", "graze"): ("{target} is nicked but unbothered.", "{actor} tests {target}'s guard."),
+    ("attack", "solid"): ("{target} is pressured by {actor}'s attack.", "{actor} gains the upper hand."),
+    ("attack", "heavy"): ("{target} is badly hurt.", "{actor} presses a decisive advantage."),
+    ("attack", "kill"): ("{target} is defeated.",),
+    ("heal", "capped"): ("{actor} is already at full strength.",),
+    ("heal", "recover"): ("{actor} regains composure.", "{actor} buys a moment to recover."),
+    ("observe", "any"): ("{actor} studies {target}'s movement.", "{actor} looks for an opening."),
+}
+
+IMAGE_ADDENDA: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ("attack", "miss"): ("A near miss with defensive movement.", "A dodge mid-motion, the attack cutting empty air."),
+    ("attack", "graze"): ("A glancing strike and a spray of sparks.",),
+    ("attack", "solid"): ("Motion blur from a decisive strike.", "A clean hit and a recoiling defender."),
+    ("attack", "heavy"): ("A crushing impact, debris and dust in the air.",),
+    ("attack", "kill"): ("A fallen combatant and a victor standing over them.",),
+    ("heal", "capped"): ("A brief defensive stance and controlled breathing.",),
+    ("heal", "recover"): ("A faint healing glow over a bandaged wound.", "A brief defensive stance and controlled breathing."),
+    ("observe", "any"): ("Tense eye contact and cautious footwork.",),
+}
+
+# weapon keyword -> "{actor} ..." strike phrases; first matching keyword wins
+WEAPON_STRIKES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("crossbow", ("snaps off a bolt", "fires the crossbow")),
+    ("bow", ("looses an arrow", "draws and fires", "sends a shaft hissing across the chamber")),
+    ("sword", ("swings their sword", "lunges with the blade", "cuts in with a sweeping slash")),
+    ("axe", ("hacks with the axe", "brings the axe around in a wide arc")),
+    ("dagger", ("darts in with the dagger", "stabs low and quick")),
+    ("mace", ("brings the mace down", "swings the mace in a heavy arc")),
+    ("staff", ("whirls the staff", "jabs with the staff")),
+)
+DEFAULT_STRIKES = ("presses the attack", "strikes hard", "lashes out")
+
+# race keyword -> visual detail for image addenda; first matching keyword wins
+RACE_DETAILS: Tuple[Tuple[str, str], ...] = (
+    ("drow", "pale hair catching the moss-light"),
+    ("elf", "lithe, sharp-featured silhouette"),
+    ("dwarf", "braided beard and heavy stance"),
+    ("orc", "tusked snarl and scarred hide"),
+    ("halfling", "small, quick figure"),
+    ("human", "weathered, determined face"),
+)
+
+SEVERITY_GRAZE = 2  # damage at or below this is a graze
+SEVERITY_HEAVY = 7  # damage at or above this is a heavy hit
+BLOODIED_HP = 12
+CRITICAL_HP = 5
+
+
+def _pick(options: Tuple[str, ...], seed: int, slot: int) -> str:
+    # each slot reads its own byte of the seed so the choices vary independently
+    return options[(seed >> (8 * slot)) % len(options)]
+
+
+def _first_match(table, text: str, default):
+    text = (text or "").lower()
+    for keyword, value in table:
+        if keyword in text:
+            return value
+    return default
+
+
+class TemplateNarrator:
+    """Offline narrator that fills varied phrase tables from the resolved event.
+
+    Templates are picked by action, outcome (miss, damage severity, kill, capped heal),
+    the target's remaining HP, the actor's weapon and race. Selection hashes the
+    event, turn and ``seed``, so the same turn always reads the same way while
+    consecutive turns vary. Produces the same directive shape as ``Narrator``.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.calls = 0
+
+    def narrate(self, event: CombatEvent, action_text: str) -> str:
+        return self.narrate_structured(event, action_text, "", None)["narrative"]
+
+    def narrate_structured(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        self.calls += 1
+        actor_row = _actor_row(scene_state, event.actor)
+        outcome = outcome_of(event)
+        table_key = (event.action if event.action in ("heal", "observe") else "attack", outcome)
+        turn = scene_state.get("turn", 0) if isinstance(scene_state, dict) else 0
+        seed = int.from_bytes(
+            hashlib.blake2b(
+                f"{self.seed}|{turn}|{event.actor}|{event.target}|{event.action}|{event.damage}|{event.target_hp}".encode(),
+                digest_size=8,
+            ).digest(),
+            "little",
+        )
+        fields = {
+            "actor": event.actor,
+            "target": event.target,
+            "damage": event.damage,
+            "healed": abs(event.damage),
+            "actor_hp": event.actor_hp,
+            "target_hp": event.target_hp,
+            "intent": action_text,
+            "strike": _pick(_first_match(WEAPON_STRIKES, actor_row.get("weapon"), DEFAULT_STRIKES), seed, 1),
+        }
+
+        narrative = _pick(NARRATIVES[table_key], seed, 0).format_map(fields)
+        condition = _condition(event, outcome)
+        if condition:
+            narrative += _pick(CONDITIONS[condition], seed, 2).format_map(fields)
+        addendum = _pick(IMAGE_ADDENDA[table_key], seed, 3)
+        detail = _first_match(RACE_DETAILS, actor_row.get("race"), "")
+        if detail:
+            addendum = f"{addendum} {event.actor}: {detail}."
+        return {
+            "narrative": narrative,
+            "scene_overview_update": "",
+            "state_notes": [_pick(STATE_NOTES[table_key], seed, 4).format_map(fields)],
+            "image_prompt_addendum": addendum,
+        }
+
+    async def narrate_structured_async(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        return self.narrate_structured(event, action_text, mechanics_summary, scene_state)
+
+
+def outcome_of(event: CombatEvent) -> str:
+    """Phrase-table outcome for ``event``: miss/graze/solid/heavy/kill, capped/recover or any."""
+    if event.action == "observe":
+        return "any"
+    if event.action == "heal":
+        return "recover" if event.damage < 0 else "capped"
+    if not event.hit:
+        return "miss"
+    if event.target_hp <= 0:
+        return "kill"
+    if event.damage <= SEVERITY_GRAZE:
+        return "graze"
+    if event.damage >= SEVERITY_HEAVY:
+        return "heavy"
+    return "solid"
+
+
+def _condition(event: CombatEvent, outcome: str) -> Optional[str]:
+    if event.action != "attack" or outcome in ("miss", "kill"):
+        return None
+    if event.target_hp <= CRITICAL_HP:
+        return "critical"
+    if event.target_hp <= BLOODIED_HP:
+        return "bloodied"
+    return None
+
+
+def _actor_row(scene_state: Optional[dict], name: str) -> dict:
+    if not isinstance(scene_state, dict):
+        return {}
+    actors = scene_state.get("actors", [])
+    if isinstance(actors, SceneActors):
+        return actors.get(name) or {}
+    key = name.lower()
+    return next(
+        (row for row in actors if isinstance(row, dict) and str(row.get("name", "")).lower() == key), {}
+    )
+
+
+def _scene_identity(scene_state: dict) -> object:
+    """The session a scene belongs to; scenes without one are told apart by roster."""
+    session = scene_state.get("session")
+    if session is not None:
+        return ("session", session)
+    return ("roster", tuple(sorted(str(row.get("name", "")).lower() for row in scene_state.get("actors", []))))
+
+
+def is_critical_hit(event: CombatEvent) -> bool:
+    """Whether the attack roll was a natural 20."""
+    return bool(event.hit) and bool(event.rolls) and event.rolls[0].formula == "1d20" and event.rolls[0].rolls == [20]
+
+
+class EscalatingNarrator:
+    """Template narration by default, the LLM narrator only for notable beats.
+
+    Kills, natural 20s, the opening turn and turns where the scene overview changed go
+    to ``remote``; everything else is narrated locally. If the remote narrator falls
+    back (offline, failed, circuit open) the template narrative is used instead of the
+    fixed fallback sentence. Routing decisions are counted as ``narration_route``.
+    """
+
+    def __init__(
+        self,
+        local: Optional[TemplateNarrator] = None,
+        remote=None,
+        instrumentation: Optional[Instrumentation] = None,
+        max_scenes: int = 1024,
+    ):
+        self.local = local or TemplateNarrator()
+        self.remote = remote or Narrator()
+        self.instrumentation = instrumentation or getattr(self.remote, "instrumentation", None) or Instrumentation()
+        self.max_scenes = max_scenes
+        # last overview recorded per session, so shared narrators track each session's scene
+        self._overviews: "OrderedDict[object, str]" = OrderedDict()
+
+    def escalation_reason(self, event: CombatEvent, scene_state: Optional[dict]) -> Optional[str]:
+        """Why this turn deserves the LLM narrator, or None to narrate it locally.
+
+        Only reads the recorded overviews; ``record_scene`` updates them once routed.
+        """
+        if event.action == "attack" and event.hit and event.target_hp <= 0:
+            return "kill"
+        if is_critical_hit(event):
+            return "crit"
+        if isinstance(scene_state, dict) and scene_state.get("turn") == 1:
+            return "opening"
+        if self._scene_changed(scene_state):
+            return "scene"
+        return None
+
+    def record_scene(self, scene_state: Optional[dict]) -> None:
+        """Remember this scene's overview as the one later turns are compared with."""
+        if not isinstance(scene_state, dict):
+            return
+        key = _scene_identity(scene_state)
+        self._overviews[key] = scene_state.get("scene_overview") or ""
+        self._overviews.move_to_end(key)
+        if len(self._overviews) > self.max_scenes:
+            self._overviews.popitem(last=False)
+
+    def _scene_changed(self, scene_state: Optional[dict]) -> bool:
+        if not isinstance(scene_state, dict):
+            return False
+        previous = self._overviews.get(_scene_identity(scene_state))
+        return previous is not None and previous != (scene_state.get("scene_overview") or "")
+
+    def _route(self, event: CombatEvent, scene_state: Optional[dict]) -> Optional[str]:
+        reason = self.escalation_reason(event, scene_state)
+        self.record_scene(scene_state)
+        if reason is None:
+            self.instrumentation.count("narration_route", route="template")
+        else:
+            self.instrumentation.count("narration_route", route="llm", reason=reason)
+        return reason
+
+    def _local(self, event: CombatEvent, action_text: str, mechanics_summary: str, scene_state: Optional[dict]) -> dict:
+        return self.local.narrate_structured(event, action_text, mechanics_summary, scene_state)
+
+    def _settle(
+        self, result: dict, event: CombatEvent, action_text: str, mechanics_summary: str, scene_state: Optional[dict]
+    ) -> dict:
+        if result == Narrator._fallback_structured(event, action_text):
+            self.instrumentation.count("narration_route", route="template", reason="llm_fallback")
+            return self._local(event, action_text, mechanics_summary, scene_state)
+        return result
+
+    def narrate(self, event: CombatEvent, action_text: str) -> str:
+        return self.narrate_structured(event, action_text, "", None)["narrative"]
+
+    def narrate_structured(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        if self._route(event, scene_state) is None:
+            return self._local(event, action_text, mechanics_summary, scene_state)
+        result = self.remote.narrate_structured(event, action_text, mechanics_summary, scene_state)
+        return self._settle(result, event, action_text, mechanics_summary, scene_state)
+
+    def stream_structured(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> Iterator[NarrationChunk]:
+        """Stream escalated turns from the remote narrator; local turns arrive in one chunk.
+
+        If an escalated stream ends on the fallback, the final chunk carries the template
+        directives instead.
+        """
+        reason = self._route(event, scene_state)
+        stream_structured = getattr(self.remote, "stream_structured", None)
+        if reason is not None and callable(stream_structured):
+            for chunk in stream_structured(event, action_text, mechanics_summary, scene_state):
+                if chunk.kind == "final" and isinstance(chunk.directives, dict):
+                    directives = self._settle(chunk.directives, event, action_text, mechanics_summary, scene_state)
+                    chunk = NarrationChunk("final", directives=directives)
+                yield chunk
+            return
+        if reason is None:
+            result = self._local(event, action_text, mechanics_summary, scene_state)
+        else:
+            result = self._settle(
+                self.remote.narrate_structured(event, action_text, mechanics_summary, scene_state),
+                event,
+                action_text,
+                mechanics_summary,
+                scene_state,
+            )
+        yield NarrationChunk("narrative", result["narrative"])
+        yield NarrationChunk("final", directives=result)
+
+    async def narrate_structured_async(
+        self,
+        event: CombatEvent,
+        action_text: str,
+        mechanics_summary: str,
+        scene_state: Optional[dict],
+    ) -> dict:
+        if self._route(event, scene_state) is None:
+            return self._local(event, action_text, mechanics_summary, scene_state)
+        narrate_async = getattr(self.remote, "narrate_structured_async", None)
+        if callable(narrate_async):
+            result = await narrate_async(event, action_text, mechanics_summary, scene_state)
+        else:
+            import asyncio
+
+            result = await asyncio.to_thread(
+                self.remote.narrate_structured, event, action_text, mechanics_summary, scene_state
+            )
+        return self._settle(result, event, action_text, mechanics_summary, scene_state)
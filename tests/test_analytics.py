@@ -0,0 +1,92 @@
+from collections import Counter
+
+import pytest
+
+from analytics import ColumnarDataset, ColumnarWriter, export_history, export_log, export_session
+from combat_log import CombatLog
+from main import ai_intent, build_default_session
+from template_narrator import TemplateNarrator
+
+
+def play_duels(count, event_log=False):
+    sessions = []
+    for seed in range(count):
+        session, player = build_default_session(narrator=TemplateNarrator(), seed=seed)
+        if event_log:
+            session.engine.log = CombatLog()
+        ai = next(c.name for c in session.engine.turn_order if c.name != player)
+        while session.encounter.is_alive(player) and session.encounter.is_alive(ai):
+            if session.engine.characters[player.lower()].health <= 7:
+                session.process_turn(player, player, "I heal")
+            else:
+                session.process_turn(player, ai, "I attack")
+            if session.encounter.is_alive(ai):
+                session.process_turn(*ai_intent(session, ai, player))
+        sessions.append(session)
+    return sessions
+
+
+@pytest.mark.parametrize("format", ["npz", "parquet"])
+def test_streamed_aggregates_match_python_over_history(tmp_path, format):
+    if format == "parquet":
+        pytest.importorskip("pyarrow")
+    sessions = play_duels(6)
+    with ColumnarWriter(str(tmp_path), chunk_rows=16, format=format) as writer:
+        for index, session in enumerate(sessions):
+            export_history(writer, f"s{index}", session.history, session.engine)
+    dataset = ColumnarDataset(str(tmp_path))
+
+    results = [result for session in sessions for result in session.history]
+    damage, attacks, hits, turns, heals = Counter(), Counter(), Counter(), Counter(), Counter()
+    for result in results:
+        delta = result.state_delta
+        damage[delta["actor"]] += delta["damage"]
+        turns[delta["actor"]] += 1
+        heals[delta["actor"]] += delta["action"] == "heal"
+        if result.event.hit is not None:
+            weapon = "Sword" if delta["actor"] == "Sturm" else "Bow"
+            attacks[weapon] += 1
+            hits[weapon] += result.event.hit
+
+    assert len(dataset.paths) > 1 and len(dataset) == len(results)
+    assert dataset.damage_by_actor() == {name: total for name, total in sorted(damage.items()) if total}
+    assert dataset.hit_rates_by_weapon() == pytest.approx({weapon: hits[weapon] / attacks[weapon] for weapon in attacks})
+    assert dataset.heal_frequency() == pytest.approx({name: heals[name] / turns[name] for name in turns})
+    assert sum(1 for result in results if result.state_delta["target_defeated"]) == 6
+    assert set(dataset.turns_to_defeat()) <= {"Sturm", "Daisy"}
+
+
+def test_combat_log_export_matches_event_list_export(tmp_path):
+    columnar, listed = play_duels(3, event_log=True), play_duels(3)
+    with ColumnarWriter(str(tmp_path / "columnar"), format="npz") as writer:
+        for index, session in enumerate(columnar):
+            export_log(writer, f"s{index}", session.engine)
+    with ColumnarWriter(str(tmp_path / "listed"), format="npz") as writer:
+        for index, session in enumerate(listed):
+            export_session(writer, f"s{index}", session, source="log")
+
+    fast, slow = ColumnarDataset(str(tmp_path / "columnar")), ColumnarDataset(str(tmp_path / "listed"))
+    assert len(fast) == len(slow) > 0
+    assert fast.damage_by_actor() == slow.damage_by_actor()
+    assert fast.hit_rates_by_weapon() == slow.hit_rates_by_weapon()
+    assert fast.turns_to_defeat() == slow.turns_to_defeat()
+
+
+def test_attacks_on_a_downed_combatant_are_not_counted_as_defeats(tmp_path):
+    session = play_duels(1, event_log=True)[0]
+    loser = next(c for c in session.engine.turn_order if c.health <= 0)
+    winner = next(c for c in session.engine.turn_order if c.health > 0)
+    defeat_turn = next(r.scene.turn for r in session.history if r.state_delta["target_hp_after"] <= 0)
+    for _ in range(3):
+        session.process_turn(winner.name, loser.name, "I attack")
+
+    with ColumnarWriter(str(tmp_path / "history"), format="npz") as writer:
+        export_history(writer, "s0", session.history, session.engine)
+    with ColumnarWriter(str(tmp_path / "log"), format="npz") as writer:
+        export_log(writer, "s0", session.engine)
+    with ColumnarWriter(str(tmp_path / "events"), format="npz") as writer:
+        for turn, event in enumerate(list(session.engine.log), 1):
+            writer.append("s0", turn, event)
+
+    for directory in ("history", "log", "events"):
+        assert ColumnarDataset(str(tmp_path / directory)).turns_to_defeat() == {loser.name: float(defeat_turn)}
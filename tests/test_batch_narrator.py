@@ -0,0 +1,68 @@
+import asyncio
+import json
+import re
+
+from batch_narrator import BatchingNarrator
+from game_engine import CombatEvent
+from narrator import Narrator
+from narrator_transport import NarratorTransport
+
+
+class FakeAsyncResponses:
+    """Answers every item in the prompt; optionally drops or corrupts some ids."""
+
+    def __init__(self, broken_ids=(), fail=False):
+        self.broken_ids = set(broken_ids)
+        self.fail = fail
+        self.prompts = []
+
+    async def create(self, **kwargs):
+        prompt = "\n".join(message["content"] for message in kwargs["input"])
+        self.prompts.append(prompt)
+        if self.fail:
+            raise TimeoutError("upstream timed out")
+        items = []
+        for item_id, actor in re.findall(r"### Item (\d+)\n.*?actor=(\w+)", prompt, flags=re.S):
+            narrative = "" if item_id in self.broken_ids else f"Batched {actor}"
+            items.append({"id": item_id, "narrative": narrative, "state_notes": ["note"]})
+        return type("Response", (), {"output_text": json.dumps({"items": items})})()
+
+
+def _event(actor):
+    return CombatEvent(actor=actor, target="B", action="attack", hit=True, damage=3, actor_hp=9, target_hp=4)
+
+
+async def _narrate_many(narrator, actors):
+    return await asyncio.gather(
+        *(narrator.narrate_structured_async(_event(actor), "I attack", "", None) for actor in actors)
+    )
+
+
+def test_concurrent_requests_share_one_call_with_per_item_fallback():
+    client = FakeAsyncResponses(broken_ids={"2"})
+    narrator = BatchingNarrator(Narrator(), client=type("Client", (), {"responses": client})(), window=0.01)
+
+    results = asyncio.run(_narrate_many(narrator, ["A", "C", "D"]))
+
+    assert len(client.prompts) == 1
+    assert results[0]["narrative"] == "Batched A"
+    assert results[1] == Narrator._fallback_structured(_event("C"), "I attack")
+    assert results[2]["narrative"] == "Batched D"
+
+
+def test_max_batch_splits_requests_and_failures_fall_back():
+    client = FakeAsyncResponses(fail=True)
+    narrator = BatchingNarrator(
+        Narrator(transport=NarratorTransport(attempts=1)),
+        client=type("Client", (), {"responses": client})(),
+        window=10,
+        max_batch=2,
+    )
+
+    results = asyncio.run(_narrate_many(narrator, ["A", "C", "D", "E"]))
+
+    assert len(client.prompts) == 2
+    assert narrator.items_sent == 4
+    assert [result["narrative"] for result in results] == [
+        Narrator._fallback_structured(_event(actor), "I attack")["narrative"] for actor in "ACDE"
+    ]
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from character import AbilityScores, Character
+from combat_log import CombatLog
+from equipment import Weapon
+from game_engine import CombatEvent, DiceRoll, GameEngine
+from session import AdventureSession
+
+
+class DummyNarrator:
+    def narrate(self, event, action_text):
+        return "fallback"
+
+
+def _characters():
+    c1 = Character(
+        name="A",
+        race="Human",
+        char_class="Fighter",
+        level=1,
+        health=40,
+        ability_scores=AbilityScores(16, 12, 12, 10, 10, 10),
+        weapon=Weapon("Longsword", 3, 0, 1, 8),
+    )
+    c2 = Character(
+        name="B",
+        race="Elf",
+        char_class="Rogue",
+        level=1,
+        health=40,
+        ability_scores=AbilityScores(10, 14, 10, 10, 10, 10),
+        weapon=Weapon("Dagger", 1, 0, 1, 4),
+    )
+    return c1, c2
+
+
+def test_columnar_log_round_trips_engine_events():
+    c1, c2 = _characters()
+    reference = GameEngine(list(_characters()), rng=random.Random(5))
+    engine = GameEngine([c1, c2], rng=random.Random(5), log=CombatLog())
+    intents = ["I attack", "I heal", "I look around"] * 5
+
+    for index, intent in enumerate(intents):
+        actor, target = ("A", "B") if index % 2 == 0 else ("B", "A")
+        reference.perform_action(actor, target, intent)
+        engine.perform_action(actor, target, intent)
+
+    assert len(engine.log) == len(reference.log)
+    assert list(engine.log) == reference.log
+    assert list(engine.log[3:6]) == reference.log[3:6]
+    assert engine.log[-1] == reference.log[-1]
+
+
+def test_bounded_log_keeps_latest_events():
+    log = CombatLog(capacity=3)
+    for damage in range(10):
+        log.append(
+            CombatEvent("A", "B", "attack", True, damage, 10, 10 - damage, [DiceRoll("1d20", [damage + 1], 5)])
+        )
+
+    assert len(log) == 3
+    assert log.dropped == 7
+    assert [event.damage for event in log] == [7, 8, 9]
+    assert log[0].rolls == [DiceRoll("1d20", [8], 5)]
+    assert list(log.column("damage")) == [7, 8, 9]
+
+
+def test_session_heal_cap_is_written_back_to_columnar_log():
+    c1, c2 = _characters()
+    session = AdventureSession([c1, c2], narrator=DummyNarrator(), rng=random.Random(2), event_log=CombatLog())
+    c1.health = 39
+
+    result = session.process_turn("A", "B", "I heal")
+
+    assert session.engine.log[-1].damage == result.event.damage == -1
+    assert session.engine.log[-1].actor_hp == 40
+
+
+def test_replacing_an_earlier_event_updates_its_dice_sides():
+    log = CombatLog()
+    for damage in range(3):
+        log.append(CombatEvent("A", "B", "attack", True, damage, 10, 10, [DiceRoll("1d8", [damage + 1], 2)]))
+
+    replacement = CombatEvent("B", "A", "attack", True, 9, 10, 1, [DiceRoll("1d12", [11], -1)])
+    log[0] = replacement
+
+    assert log[0] == replacement
+    with pytest.raises(ValueError):
+        log[1] = CombatEvent("A", "B", "attack", True, 1, 10, 9, [DiceRoll("2d6", [1], 0)])
+    assert log[1].rolls == [DiceRoll("1d8", [2], 2)]
+
+
+def test_clear_resets_rows_names_and_dropped_counts():
+    log = CombatLog(capacity=2)
+    for damage in range(5):
+        log.append(CombatEvent("A", "B", "attack", True, damage, 10, 10, [DiceRoll("1d20", [damage + 1], 0)]))
+    damage_view = log.column("damage")
+
+    log.clear()
+    log.append(CombatEvent("C", "D", "heal", None, -3, 7, 7, []))
+
+    assert list(damage_view) == [3, 4]
+    assert (len(log), log.dropped, log.names, log.capacity) == (1, 0, ["C", "D"], 2)
+    assert log[0] == CombatEvent("C", "D", "heal", None, -3, 7, 7, [])
@@ -0,0 +1,108 @@
+import copy
+import pickle
+import random
+
+from character import AbilityScores, Character
+from combat_profile import combat_profile
+from equipment import Armor, Weapon
+from game_engine import GameEngine
+
+
+def _characters():
+    c1 = Character(
+        name="A",
+        race="Human",
+        char_class="Fighter",
+        level=1,
+        health=40,
+        ability_scores=AbilityScores(16, 12, 12, 10, 10, 10),
+        weapon=Weapon("Longsword", 3, 0, 1, 8),
+        armor=Armor("Chain", 20, 0, 2),
+    )
+    c2 = Character(
+        name="B",
+        race="Elf",
+        char_class="Rogue",
+        level=1,
+        health=40,
+        ability_scores=AbilityScores(10, 14, 10, 10, 10, 10),
+        weapon=Weapon("Dagger", 1, 0, 1, 4),
+    )
+    return c1, c2
+
+
+def test_profile_is_cached_until_scores_or_equipment_change():
+    c1, _ = _characters()
+    profile = combat_profile(c1)
+    assert (profile.to_hit, profile.armor_class, profile.damage_formula) == (5, 13, "1d8")
+
+    c1.health -= 10
+    assert combat_profile(c1) is profile
+
+    c1.ability_scores.strength = 18
+    assert combat_profile(c1).to_hit == 6
+    c1.armor.protection = 4
+    assert combat_profile(c1).armor_class == 15
+    c1.weapon = Weapon("Greataxe", 7, 0, 1, 12)
+    assert combat_profile(c1).damage_formula == "1d12"
+    c1.armor = None
+    assert combat_profile(c1).armor_class == 11
+
+
+def test_engine_reads_updated_profile_after_equipment_swap():
+    c1, c2 = _characters()
+    engine = GameEngine([c1, c2], rng=random.Random(4))
+    engine.perform_action("A", "B", "I attack")
+    c1.weapon = Weapon("Maul", 10, 0, 6, 6)
+
+    events = [engine.perform_action("A", "B", "I attack") for _ in range(20)]
+
+    hits = [event for event in events if event.hit]
+    assert hits and all(event.rolls[1].formula == "1d6" and event.damage >= 6 for event in hits)
+
+
+def test_copied_character_gets_its_own_profile_after_mutation():
+    c1, _ = _characters()
+    combat_profile(c1)
+    clone = copy.deepcopy(c1)
+
+    clone.ability_scores.dexterity = 20
+    assert combat_profile(clone).armor_class == 17
+    assert combat_profile(c1).armor_class == 13
+
+
+def test_editing_one_characters_equipment_keeps_other_profiles():
+    c1, c2 = _characters()
+    first, second = combat_profile(c1), combat_profile(c2)
+
+    c1.weapon.max_damage = 10
+    c1.ability_scores.dexterity = 16
+
+    assert combat_profile(c2) is second
+    assert combat_profile(c1) is not first and combat_profile(c1).damage_formula == "1d10"
+    assert c1.weapon.revision == 1 and c2.weapon.revision == 0
+
+
+def test_swapped_out_equipment_no_longer_affects_the_profile():
+    c1, _ = _characters()
+    old_weapon = c1.weapon
+    combat_profile(c1)
+    c1.weapon = Weapon("Greataxe", 7, 0, 1, 12)
+    profile = combat_profile(c1)
+
+    old_weapon.max_damage = 20
+
+    assert combat_profile(c1).damage_formula == "1d12"
+    assert combat_profile(c1) == profile
+
+
+def test_pickled_character_round_trips_without_its_cache():
+    c1, _ = _characters()
+    combat_profile(c1)
+
+    restored = pickle.loads(pickle.dumps(c1))
+    restored.armor.protection = 5
+
+    assert restored.name == c1.name and restored.weapon == c1.weapon
+    assert combat_profile(restored).armor_class == 16
+    assert combat_profile(c1).armor_class == 13
@@ -0,0 +1,88 @@
+import random
+
+from character import AbilityScores, Character
+from encounter import Encounter
+from equipment import Weapon
+from session import AdventureSession
+
+
+class DummyNarrator:
+    def narrate(self, event, action_text):
+        return "fallback"
+
+
+def _characters(count=4):
+    return [
+        Character(
+            name=name,
+            race="Human",
+            char_class="Fighter",
+            level=1,
+            health=20,
+            ability_scores=AbilityScores(14, 10 + index, 12, 10, 10, 10),
+            weapon=Weapon("Longsword", 3, 0, 1, 8),
+        )
+        for index, name in enumerate(["Aria", "Arn", "Bram", "Cole"][:count])
+    ]
+
+
+def test_initiative_order_skips_defeated_combatants():
+    characters = _characters()
+    encounter = Encounter(characters, initiative={"Aria": 5, "Arn": 15, "Bram": 10, "Cole": 1})
+
+    assert [encounter.current().name, encounter.advance().name, encounter.advance().name] == ["Arn", "Bram", "Aria"]
+    characters[3].health = 0
+    encounter.refresh("Cole")
+    assert encounter.advance().name == "Arn"
+    assert encounter.round == 1
+    assert encounter.alive_names() == ["Aria", "Arn", "Bram"]
+
+    characters[3].health = 5
+    encounter.refresh("Cole")
+    assert [encounter.advance().name, encounter.advance().name, encounter.advance().name] == ["Bram", "Aria", "Arn"]
+    assert encounter.round == 2
+    assert [encounter.advance().name, encounter.advance().name, encounter.advance().name] == ["Bram", "Aria", "Cole"]
+
+
+def test_resolve_target_prefers_exact_then_roster_order_prefix():
+    encounter = Encounter(_characters(), rng=random.Random(1))
+
+    assert encounter.resolve_target("arn", "Bram") == "Arn"
+    assert encounter.resolve_target("ar", "Bram") == "Aria"
+    assert encounter.resolve_target("ar", "Aria") == "Arn"
+    assert encounter.resolve_target("bram", "Bram") is None
+    assert encounter.resolve_target("z", "Bram") is None
+
+
+def test_factions_drive_default_targets_and_game_over():
+    characters = _characters()
+    encounter = Encounter(characters, factions={"Aria": "party", "Arn": "party", "Bram": "foes", "Cole": "foes"})
+
+    assert encounter.default_target("Aria") == "Bram"
+    assert encounter.default_target("Cole") == "Aria"
+    assert encounter.is_enemy("Aria", "Cole") and not encounter.is_enemy("Aria", "Arn")
+    for character in characters[2:]:
+        character.health = 0
+    encounter.refresh("Bram", "Cole")
+    assert encounter.is_over()
+    assert encounter.living_factions() == ["party"] and encounter.faction_alive("foes") == []
+    assert encounter.default_target("Aria") is None
+
+    characters[3].health = 4
+    encounter.refresh("Cole")
+    assert not encounter.is_over()
+    assert encounter.alive_names() == ["Aria", "Arn", "Cole"]
+    assert encounter.default_target("Arn") == "Cole"
+
+
+def test_session_encounter_tracks_knockouts_without_touching_engine_rng():
+    plain = AdventureSession(_characters(2), narrator=DummyNarrator(), rng=random.Random(3))
+    session = AdventureSession(_characters(2), narrator=DummyNarrator(), rng=random.Random(3))
+    encounter = session.encounter
+
+    while encounter.is_alive("Arn"):
+        event = session.process_turn("Aria", "Arn", "I attack").event
+        assert event == plain.process_turn("Aria", "Arn", "I attack").event
+
+    assert encounter.alive_names() == ["Aria"]
+    assert encounter.is_over()
@@ -0,0 +1,59 @@
+import io
+import json
+
+from headless import HeadlessRunner, ScriptedCommand, read_jsonl, read_script
+
+
+def _records(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def _run(commands, seed=3):
+    output = io.StringIO()
+    summary = HeadlessRunner(output, seed=seed).run(commands)
+    return summary, _records(output)
+
+
+def test_script_files_and_jsonl_streams_play_the_same_session(tmp_path):
+    script = tmp_path / "duel.txt"
+    script.write_text("# opening\nattack daisy\n\nobserve daisy\nheal\n")
+    stream = io.StringIO(
+        "".join(json.dumps({"session": "duel", "command": c}) + "\n" for c in ("attack daisy", "observe daisy", "heal"))
+        + "not json\n"
+    )
+
+    from_script = _run(read_script(str(script)))
+    from_stream = _run(read_jsonl(stream))
+
+    assert from_script[1] == from_stream[1]
+    summary, records = from_script
+    assert summary.sessions == 1 and summary.commands == 3 and summary.turns >= 3
+    assert {record["type"] for record in records} == {"turn", "end"}
+    assert records[-1]["outcome"] == "unfinished" and records[-1]["turns"] == summary.turns
+
+
+def test_interleaved_sessions_end_and_reject_later_commands():
+    commands = [ScriptedCommand("a", "dance wildly"), ScriptedCommand("b", "status")]
+    commands += [ScriptedCommand(name, "attack daisy") for _ in range(40) for name in ("a", "b")]
+    commands += [ScriptedCommand("c", "quit"), ScriptedCommand("c", "attack daisy")]
+
+    summary, records = _run(commands)
+
+    ends = {record["session"]: record for record in records if record["type"] == "end"}
+    assert {ends["a"]["outcome"], ends["b"]["outcome"]} <= {"victory", "defeated"}
+    assert ends["c"]["outcome"] == "quit" and ends["c"]["turns"] == 0
+    assert summary.rejected >= 1 and not any(r["session"] == "c" and r["type"] == "turn" for r in records)
+    assert "status" in [r["type"] for r in records if r["session"] == "b"]
+    assert summary.invalid == 0 and summary.sessions == 3
+    assert sum(r["type"] == "turn" for r in records) == summary.turns
+
+
+def test_only_recent_ended_names_are_remembered():
+    output = io.StringIO()
+    runner = HeadlessRunner(output, seed=3, max_finished=2)
+    runner.run([ScriptedCommand(name, "quit") for name in ("a", "b", "c")] + [ScriptedCommand("c", "status")])
+
+    assert list(runner._finished) == ["b", "c"] and runner.summary.rejected == 1
+
+    runner.run([ScriptedCommand("a", "status")])
+    assert runner.summary.sessions == 4 and runner.summary.rejected == 1
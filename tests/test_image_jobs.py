@@ -0,0 +1,87 @@
+import threading
+
+from image_jobs import ImageCache, ImageJobQueue, StubRenderer, image_key
+
+
+class GatedRenderer(StubRenderer):
+    """Stub renderer that blocks every render until the test opens the gate."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.prompts = []
+
+    def render(self, prompt, size):
+        self.prompts.append(prompt)
+        self.started.set()
+        self.gate.wait(5)
+        return super().render(prompt, size)
+
+
+def test_only_the_latest_queued_scene_per_session_is_rendered(tmp_path):
+    renderer = GatedRenderer()
+    queue = ImageJobQueue(ImageCache(str(tmp_path)), renderer, workers=1, size=8)
+    first = queue.submit("s1", "Turn 1: Sturm swings at Daisy.")
+    renderer.started.wait(5)
+    stale = queue.submit("s1", "Turn 2: Daisy heals.")
+    latest = queue.submit("s1", "Turn 3: Sturm strikes Daisy down.")
+    renderer.gate.set()
+    assert queue.drain(5)
+    queue.close()
+
+    assert stale.cancelled()
+    assert first.result().endswith(".png") and latest.result().endswith(".png")
+    assert renderer.prompts == ["Turn 1: Sturm swings at Daisy.", "Turn 3: Sturm strikes Daisy down."]
+    assert queue.stats.coalesced == 1
+
+
+def test_near_identical_prompts_share_one_render_and_the_disk_cache(tmp_path):
+    renderer = GatedRenderer()
+    queue = ImageJobQueue(ImageCache(str(tmp_path)), renderer, workers=1, size=8)
+    one = queue.submit("s1", "Turn 4: Sturm misses Daisy!")
+    two = queue.submit("s2", "turn 9: sturm misses daisy")
+    renderer.gate.set()
+    assert queue.drain(5)
+    queue.close()
+
+    assert one is two and renderer.calls == 1
+    assert image_key("Turn 4: Sturm misses Daisy!") == image_key("turn 9 - sturm misses daisy")
+
+    restarted = ImageJobQueue(ImageCache(str(tmp_path)), StubRenderer(), workers=1, size=8)
+    cached = restarted.submit("s3", "Turn 12: Sturm misses Daisy.")
+    restarted.close()
+    assert cached.done() and cached.result() == one.result()
+    assert restarted.stats.cache_hits == 1 and restarted.renderer.calls == 0
+
+
+def test_full_queue_drops_the_oldest_job(tmp_path):
+    renderer = GatedRenderer()
+    queue = ImageJobQueue(ImageCache(str(tmp_path)), renderer, workers=1, max_pending=2, size=8)
+    queue.submit("busy", "Turn 1: the worker is busy with this.")
+    renderer.started.wait(5)
+    oldest = queue.submit("a", "Turn 1: a")
+    queue.submit("b", "Turn 1: b")
+    newest = queue.submit("c", "Turn 1: c")
+    renderer.gate.set()
+    assert queue.drain(5)
+    queue.close()
+
+    assert oldest.cancelled() and newest.result()
+    assert queue.stats.dropped == 1 and queue.stats.rendered == 3
+
+
+def test_joining_a_running_render_supersedes_the_sessions_queued_scene(tmp_path):
+    renderer = GatedRenderer()
+    queue = ImageJobQueue(ImageCache(str(tmp_path)), renderer, workers=1, size=8)
+    running = queue.submit("s2", "Turn 5: Sturm misses Daisy.")
+    renderer.started.wait(5)
+    older = queue.submit("s1", "Turn 1: Daisy heals.")
+    newer = queue.submit("s1", "Turn 2: Sturm misses Daisy.")
+    renderer.gate.set()
+    assert queue.drain(5)
+    queue.close()
+
+    assert newer is running and older.cancelled()
+    assert renderer.prompts == ["Turn 5: Sturm misses Daisy."]
+    assert queue.stats.coalesced == 1 and queue.stats.deduplicated == 1
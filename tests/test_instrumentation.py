@@ -0,0 +1,95 @@
+import io
+import json
+import random
+
+from character import AbilityScores, Character
+from equipment import Weapon
+from instrumentation import Instrumentation, JsonlSink, PrometheusSink
+from narrator import Narrator
+from session import AdventureSession
+
+
+class ListSink:
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class FakeResponses:
+    def __init__(self, text):
+        self.text = text
+
+    def create(self, **kwargs):
+        return type("Response", (), {"output_text": self.text})()
+
+
+def _characters():
+    c1 = Character(
+        name="A",
+        race="Human",
+        char_class="Fighter",
+        level=1,
+        health=12,
+        ability_scores=AbilityScores(16, 12, 12, 10, 10, 10),
+        weapon=Weapon("Longsword", 3, 0, 1, 8),
+    )
+    c2 = Character(
+        name="B",
+        race="Elf",
+        char_class="Rogue",
+        level=1,
+        health=10,
+        ability_scores=AbilityScores(10, 14, 10, 10, 10, 10),
+        weapon=Weapon("Dagger", 1, 0, 1, 4),
+    )
+    return [c1, c2]
+
+
+def _session(sink, output_text):
+    instrumentation = Instrumentation(sink)
+    narrator = Narrator(instrumentation=instrumentation)
+    narrator._client = type("Client", (), {"responses": FakeResponses(output_text)})()
+    return AdventureSession(_characters(), narrator=narrator, rng=random.Random(1), instrumentation=instrumentation)
+
+
+def test_turn_emits_stage_timings_sizes_and_outcome_counters():
+    sink = ListSink()
+    session = _session(sink, json.dumps({"narrative": "A clean strike."}))
+
+    session.process_turn("A", "B", "I attack")
+
+    timings = [record["name"] for record in sink.records if record["type"] == "timing"]
+    assert {"turn", "mechanics", "scene_state", "narration", "image_prompt", "narrator_prompt", "narrator_request", "narrator_parse"} <= set(timings)
+    values = {record["name"]: record["value"] for record in sink.records if record["type"] == "value"}
+    assert values["narrator_response_bytes"] == len(json.dumps({"narrative": "A clean strike."}))
+    assert values["narrator_prompt_bytes"] > 0
+    assert [record["name"] for record in sink.records if record["type"] == "counter"] == ["narrator_success"]
+
+
+def test_prometheus_export_counts_fallbacks():
+    sink = PrometheusSink()
+    session = _session(sink, "not json")
+
+    session.process_turn("A", "B", "I attack")
+    text = sink.render()
+
+    assert 'dm_narrator_fallback_total{reason="error"} 1' in text
+    assert 'dm_stage_seconds_count{stage="turn"} 1' in text
+    assert 'dm_stage_seconds_bucket{stage="turn",le="+Inf"} 1' in text
+
+
+def test_jsonl_sink_and_disabled_instrumentation():
+    stream = io.StringIO()
+    instrumentation = Instrumentation()
+    with instrumentation.stage("ignored"):
+        pass
+    instrumentation.count("ignored")
+
+    instrumentation.add_sink(JsonlSink(stream, flush_every=1))
+    instrumentation.count("narration_cache", result="hit")
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["labels"] == {"result": "hit"}
@@ -0,0 +1,57 @@
+import pytest
+
+from intent import DEFAULT_LEXICON, Intent, IntentClassifier, trie_pattern
+from main import build_default_session, parse_player_command
+from narrator import StubNarrator
+
+
+def _legacy_action(text):
+    lowered = text.lower()
+    if any(token in lowered for token in ("heal", "potion", "recover")):
+        return "heal"
+    if any(token in lowered for token in ("inspect", "look", "observe")):
+        return "observe"
+    return "attack"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I attack",
+        "I drink a POTION",
+        "Healing word, then I look around",
+        "I inspect the altar",
+        "overlooking the pit I strike",
+        "I recover and observe",
+        "",
+    ],
+)
+def test_action_matches_the_substring_rules(text):
+    assert IntentClassifier().action(text) == _legacy_action(text)
+
+
+def test_classify_returns_action_target_and_modifiers_in_one_pass():
+    classifier = IntentClassifier(DEFAULT_LEXICON.with_synonyms("heal", "cure wounds").with_synonyms("observe", "scry"))
+
+    assert classifier.classify("I shoot Daisy, quick and careful", ["Sturm", "Daisy"]) == Intent(
+        "attack", "Daisy", ("ranged", "quick", "careful")
+    )
+    assert classifier.classify("Cast Cure Wounds on sturmhold", ["Sturm"]) == Intent("heal", None, ())
+    assert [intent.action for intent in classifier.classify_many(["scry", "scry", "stab"])] == ["observe", "observe", "attack"]
+    assert trie_pattern(["heal", "healing", "hex"]) == "he(?:al(?:ing)?|x)"
+
+
+def test_free_text_command_targets_the_named_enemy():
+    session, player = build_default_session(narrator=StubNarrator())
+
+    assert parse_player_command(session, player, "I loose a volley at daisy") == (player, "Daisy", "I loose a volley at daisy")
+    assert parse_player_command(session, player, "Sturm roars and swings")[1] == "Daisy"
+
+
+def test_target_names_containing_keywords_are_still_targets():
+    classifier = IntentClassifier()
+
+    assert classifier.classify("I attack Healer", ["Healer", "Sturm"]) == Intent("attack", "Healer", ())
+    assert classifier.classify("I strike Dartmoor quickly", ["Dartmoor"]) == Intent("attack", "Dartmoor", ("quick",))
+    assert classifier.classify("hit the firedrake", ["Firedrake"]) == Intent("attack", "Firedrake", ())
+    assert classifier.classify("I heal, then shoot the Healer", ["Healer"]) == Intent("heal", "Healer", ("ranged",))
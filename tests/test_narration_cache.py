@@ -0,0 +1,84 @@
+import json
+
+from game_engine import CombatEvent
+from narration_cache import NarrationCache, SQLiteNarrationStore, narration_key
+from narrator import Narrator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingResponses:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        payload = {"narrative": f"Call {self.calls}: B is left at 6 HP.", "state_notes": ["dust"]}
+        return type("Response", (), {"output_text": json.dumps(payload)})()
+
+
+def _event(damage=4):
+    return CombatEvent(actor="A", target="B", action="attack", hit=True, damage=damage, actor_hp=12, target_hp=6)
+
+
+def _scene(turn, overview="A ruined chapel.", bystander_hp=12):
+    return {
+        "turn": turn,
+        "scene_overview": overview,
+        "actors": [{"name": "A", "hp": bystander_hp, "defeated": False, "weapon": "Sword", "armor": None}],
+    }
+
+
+def test_key_buckets_numbers_and_ignores_turn_and_text_noise():
+    base = narration_key(_event(), "I attack!", _scene(1))
+
+    assert narration_key(_event(), "  i ATTACK ", _scene(7, "a ruined chapel", bystander_hp=9)) == base
+    assert narration_key(_event(damage=5), "I attack!", _scene(1)) == base
+    assert narration_key(_event(damage=9), "I attack!", _scene(1)) != base
+
+
+def test_lru_ttl_and_counters():
+    clock = FakeClock()
+    cache = NarrationCache(max_entries=2, ttl=10, clock=clock)
+    cache.put("a", {"narrative": "a"})
+    cache.put("b", {"narrative": "b"})
+    assert cache.get("a")["narrative"] == "a"
+    cache.put("c", {"narrative": "c"})
+
+    assert cache.get("b") is None
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2, "evictions": 2}
+
+
+def test_sqlite_store_survives_new_cache(tmp_path):
+    path = str(tmp_path / "narrations.db")
+    NarrationCache(store=SQLiteNarrationStore(path)).put("k", {"narrative": "kept", "state_notes": []})
+
+    cache = NarrationCache(store=SQLiteNarrationStore(path, max_entries=10))
+
+    assert cache.get("k") == {"narrative": "kept", "state_notes": []}
+    assert cache.hits == 1
+
+
+def test_narrator_skips_api_on_repeat_turn():
+    narrator = Narrator(cache=NarrationCache())
+    responses = CountingResponses()
+    narrator._client = type("Client", (), {"responses": responses})()
+
+    first = narrator.narrate_structured(_event(), "I attack", "", _scene(1))
+    second = narrator.narrate_structured(_event(), "I attack", "", _scene(2))
+    bucketed = narrator.narrate_structured(
+        CombatEvent(actor="A", target="B", action="attack", hit=True, damage=3, actor_hp=12, target_hp=7), "I attack", "", _scene(3)
+    )
+
+    assert responses.calls == 1
+    assert first == second
+    assert second["narrative"] == "Call 1: B is left at 6 HP."
+    assert bucketed["narrative"] == "Call 1: B is left at 7 HP."
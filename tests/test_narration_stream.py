@@ -0,0 +1,144 @@
+import json
+import random
+import time
+
+from character import AbilityScores, Character
+from equipment import Weapon
+from game_engine import CombatEvent
+from instrumentation import Instrumentation
+from narration_stream import IncrementalNarrativeParser
+from narrator import Narrator
+from session import AdventureSession
+
+
+class StreamingResponses:
+    def __init__(self, text, chunk_size=5, fail_after=None):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.fail_after = fail_after
+
+    def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        pieces = [self.text[i : i + self.chunk_size] for i in range(0, len(self.text), self.chunk_size)]
+        for index, piece in enumerate(pieces):
+            if self.fail_after is not None and index == self.fail_after:
+                raise ConnectionError("stream dropped")
+            yield type("Delta", (), {"type": "response.output_text.delta", "delta": piece})()
+
+
+def _narrator(responses):
+    narrator = Narrator()
+    narrator._client = type("Client", (), {"responses": responses})()
+    return narrator
+
+
+def _characters():
+    c1 = Character(
+        name="A",
+        race="Human",
+        char_class="Fighter",
+        level=1,
+        health=12,
+        ability_scores=AbilityScores(16, 12, 12, 10, 10, 10),
+        weapon=Weapon("Longsword", 3, 0, 1, 8),
+    )
+    c2 = Character(
+        name="B",
+        race="Elf",
+        char_class="Rogue",
+        level=1,
+        health=10,
+        ability_scores=AbilityScores(10, 14, 10, 10, 10, 10),
+        weapon=Weapon("Dagger", 1, 0, 1, 4),
+    )
+    return [c1, c2]
+
+
+def test_parser_extracts_narrative_across_chunk_boundaries():
+    payload = json.dumps(
+        {"state_notes": ["narrative"], "narrative": 'He said "run" — then fled \U0001F525.', "image_prompt_addendum": "x"}
+    )
+    parser = IncrementalNarrativeParser()
+
+    decoded = "".join(parser.feed(payload[i : i + 3]) for i in range(0, len(payload), 3))
+
+    assert decoded == 'He said "run" — then fled \U0001F525.'
+    assert parser.captured_complete
+    assert json.loads(parser.text)["image_prompt_addendum"] == "x"
+
+
+def test_session_stream_yields_mechanics_before_narrative_tokens():
+    payload = json.dumps({"narrative": "Steel flashes in the gloom.", "state_notes": ["Dust falls."]})
+    session = AdventureSession(
+        _characters(), narrator=_narrator(StreamingResponses(payload)), rng=random.Random(1)
+    )
+
+    chunks = list(session.process_turn_stream("A", "B", "I attack"))
+
+    assert chunks[0].kind == "mechanics"
+    assert "action=attack" in chunks[0].mechanics_summary
+    narrative = [chunk.text for chunk in chunks if chunk.kind == "narrative"]
+    assert len(narrative) > 1
+    assert "".join(narrative) == "Steel flashes in the gloom."
+    assert chunks[-1].kind == "result"
+    assert chunks[-1].result.ai_state_notes == ["Dust falls."]
+    assert session.history == [chunks[-1].result]
+
+
+def test_dropped_stream_falls_back_like_narrate_structured():
+    event = CombatEvent(actor="A", target="B", action="attack", hit=False, damage=0, actor_hp=12, target_hp=10)
+    payload = json.dumps({"narrative": "A long and winding tale of a missed swing."})
+
+    chunks = list(_narrator(StreamingResponses(payload, fail_after=3)).stream_structured(event, "I swing", "", None))
+
+    assert chunks[-1].kind == "final"
+    assert chunks[-1].directives == Narrator._fallback_structured(event, "I swing")
+
+
+def test_abandoned_stream_still_records_the_turn():
+    payload = json.dumps({"narrative": "Steel flashes in the gloom.", "state_notes": ["Dust falls."]})
+    session = AdventureSession(_characters(), narrator=_narrator(StreamingResponses(payload)), rng=random.Random(1))
+
+    stream = session.process_turn_stream("A", "B", "I attack")
+    mechanics = next(stream)
+    next(stream)
+    stream.close()
+
+    assert session.turn_number == 1
+    assert [result.event for result in session.history] == [mechanics.event]
+    assert session.history[0].narrative == Narrator._fallback_structured(mechanics.event, "I attack")["narrative"]
+
+
+def test_stream_closed_after_mechanics_still_records_the_turn():
+    session = AdventureSession(_characters(), narrator=_narrator(StreamingResponses("{}")), rng=random.Random(1))
+
+    stream = session.process_turn_stream("A", "B", "I attack")
+    mechanics = next(stream)
+    stream.close()
+
+    assert session.turn_number == 1
+    assert [result.event for result in session.history] == [mechanics.event]
+    assert session.history[0].narrative == Narrator._fallback_structured(mechanics.event, "I attack")["narrative"]
+
+
+def test_stream_request_timing_excludes_consumer_time():
+    class ListSink:
+        def __init__(self):
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    sink = ListSink()
+    narrator = _narrator(StreamingResponses(json.dumps({"narrative": "Steel flashes in the gloom."}), chunk_size=4))
+    narrator.instrumentation = Instrumentation(sink)
+    event = CombatEvent(actor="A", target="B", action="attack", hit=True, damage=3, actor_hp=12, target_hp=7)
+
+    chunks = 0
+    for chunk in narrator.stream_structured(event, "I attack", "", None):
+        chunks += 1
+        time.sleep(0.01)
+
+    timing = next(record for record in sink.records if record["name"] == "narrator_request")
+    assert chunks > 5
+    assert timing["labels"] == {"mode": "stream"} and timing["value"] < 0.01
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import pytest
+
+from game_engine import CombatEvent
+from narrator import Narrator
+from narrator_transport import CircuitBreaker, CircuitOpenError, NarratorTransport
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ServerError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FaultyBackend:
+    """Fake Responses API that plays a script of faults, then answers normally.
+
+    Script entries: ``"ok"``, ``"timeout"``, ``"drop"`` (connection reset), an HTTP status
+    code, or a number of seconds to stall before answering.
+    """
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = []
+
+    def _next(self, kwargs):
+        self.calls.append(kwargs)
+        fault = self.script.pop(0) if self.script else "ok"
+        if fault == "timeout":
+            raise TimeoutError("upstream timed out")
+        if fault == "drop":
+            raise ConnectionResetError("connection reset by peer")
+        if isinstance(fault, int):
+            raise ServerError(fault)
+        return fault
+
+    def create(self, **kwargs):
+        fault = self._next(kwargs)
+        if isinstance(fault, float):
+            time.sleep(min(fault, kwargs["timeout"]))
+            raise TimeoutError("request timed out")
+        return type("Response", (), {"output_text": json.dumps({"narrative": "Backend narrative."})})()
+
+    @property
+    def client(self):
+        return type("Client", (), {"responses": self})()
+
+
+class AsyncFaultyBackend(FaultyBackend):
+    async def create(self, **kwargs):
+        fault = self._next(kwargs)
+        if isinstance(fault, float):
+            await asyncio.sleep(fault)
+        return type("Response", (), {"output_text": json.dumps({"narrative": "Backend narrative."})})()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _event():
+    return CombatEvent(actor="A", target="B", action="attack", hit=True, damage=3, actor_hp=9, target_hp=4)
+
+
+def _narrator(backend, transport):
+    narrator = Narrator(transport=transport)
+    narrator._client = backend.client
+    narrator._async_client = backend.client
+    return narrator
+
+
+def test_transient_faults_are_retried_within_the_deadline():
+    backend = FaultyBackend("timeout", 503, "drop")
+    transport = NarratorTransport(attempts=4, base_delay=0.001, rng=random.Random(1))
+    narrator = _narrator(backend, transport)
+
+    assert narrator.narrate_structured(_event(), "I attack", "", None)["narrative"] == "Backend narrative."
+    assert len(backend.calls) == 4 and transport.retries == 3
+    assert all(0 < call["timeout"] <= transport.turn_budget for call in backend.calls)
+
+    rejected = FaultyBackend(400)
+    with pytest.raises(ServerError):
+        transport.call(rejected.create, model="m")
+    assert len(rejected.calls) == 1 and transport.breaker.state == "closed"
+
+
+def test_slow_backend_falls_back_at_the_turn_deadline():
+    transport = NarratorTransport(turn_budget=0.05, base_delay=0.001)
+    narrator = _narrator(AsyncFaultyBackend(5.0, 5.0, 5.0), transport)
+
+    started = time.perf_counter()
+    result = asyncio.run(narrator.narrate_structured_async(_event(), "I attack", "", None))
+
+    assert time.perf_counter() - started < 1.0
+    assert result == Narrator._fallback_structured(_event(), "I attack")
+
+    sync_narrator = _narrator(FaultyBackend(5.0, 5.0, 5.0), transport)
+    started = time.perf_counter()
+    assert sync_narrator.narrate_structured(_event(), "I attack", "", None) == Narrator._fallback_structured(_event(), "I attack")
+    assert time.perf_counter() - started < 1.0
+
+
+def test_open_circuit_skips_the_backend_until_a_probe_succeeds():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10.0, clock=clock)
+    backend = FaultyBackend(503, 503, 503, 503)
+    narrator = _narrator(backend, NarratorTransport(attempts=2, base_delay=0.0, breaker=breaker, clock=clock))
+    fallback = Narrator._fallback_structured(_event(), "I attack")
+
+    assert narrator.narrate_structured(_event(), "I attack", "", None) == fallback
+    assert narrator.narrate_structured(_event(), "I attack", "", None) == fallback
+    assert breaker.state == "open" and len(backend.calls) == 3
+    for _ in range(5):
+        assert narrator.narrate_structured(_event(), "I attack", "", None) == fallback
+    assert len(backend.calls) == 3
+    with pytest.raises(CircuitOpenError):
+        narrator.transport.call(backend.create, model="m")
+
+    clock.now = 10.0
+    assert narrator.narrate_structured(_event(), "I attack", "", None) == fallback
+    assert breaker.state == "open" and len(backend.calls) == 4
+
+    clock.now = 20.0
+    assert narrator.narrate_structured(_event(), "I attack", "", None)["narrative"] == "Backend narrative."
+    assert breaker.state == "closed" and breaker.times_opened == 2
+
+
+def test_cli_import_defers_heavy_dependencies():
+    probe = "import sys, main; print(sorted(m for m in ('openai', 'asyncio', 'numpy', 'sqlite3') if m in sys.modules))"
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
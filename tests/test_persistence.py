@@ -0,0 +1,85 @@
+import random
+
+from character import AbilityScores, Character
+from equipment import Armor, Weapon
+from persistence import SessionStore, capture, decode_snapshot, encode_snapshot
+from session import AdventureSession
+
+
+class DummyNarrator:
+    def narrate(self, event, action_text):
+        return "fallback"
+
+
+class OverviewNarrator(DummyNarrator):
+    def narrate_structured(self, event, action_text, mechanics_summary, scene_state):
+        return {"narrative": "n", "scene_overview_update": f"Beat {scene_state['turn']}", "state_notes": []}
+
+
+def _characters():
+    c1 = Character(
+        name="A",
+        race="Human",
+        char_class="Fighter",
+        level=1,
+        health=30,
+        ability_scores=AbilityScores(16, 12, 12, 10, 10, 10),
+        weapon=Weapon("Longsword", 3, 0, 1, 8),
+        armor=Armor("Chain Shirt", 20, 0, 2),
+    )
+    c2 = Character(
+        name="B",
+        race="Elf",
+        char_class="Rogue",
+        level=1,
+        health=30,
+        ability_scores=AbilityScores(10, 14, 10, 10, 10, 10),
+        weapon=Weapon("Dagger", 1, 0, 1, 4),
+    )
+    return c1, c2
+
+
+def _play(session, store, turns):
+    for index in range(turns):
+        actor, target = ("A", "B") if index % 2 == 0 else ("B", "A")
+        intent = "I heal" if index % 5 == 4 else "I attack"
+        store.save(session, session.process_turn(actor, target, intent))
+
+
+def test_snapshot_round_trip_preserves_state_and_rng():
+    session = AdventureSession(list(_characters()), narrator=DummyNarrator(), rng=random.Random(4))
+    session.process_turn("A", "B", "I attack")
+
+    snapshot = decode_snapshot(encode_snapshot(capture(session)))
+
+    assert snapshot == capture(session)
+
+
+def test_recover_replays_journal_tail_after_checkpoint(tmp_path):
+    session = AdventureSession(list(_characters()), narrator=OverviewNarrator(), rng=random.Random(9))
+    store = SessionStore(str(tmp_path), checkpoint_every=4)
+    store.checkpoint(session)
+    _play(session, store, 7)
+    store.close()
+
+    recovered = SessionStore(str(tmp_path)).recover(narrator=DummyNarrator())
+
+    assert len(list(store.journal.records())) == 3
+    assert capture(recovered) == capture(session)
+    assert recovered.scene_overview == "Beat 7"
+    assert recovered.process_turn("A", "B", "I attack").event == session.process_turn("A", "B", "I attack").event
+
+
+def test_torn_journal_tail_is_ignored(tmp_path):
+    session = AdventureSession(list(_characters()), narrator=DummyNarrator(), rng=random.Random(3))
+    store = SessionStore(str(tmp_path), checkpoint_every=0)
+    store.checkpoint(session)
+    _play(session, store, 3)
+    store.close()
+    with open(store.journal.path, "ab") as handle:
+        handle.write(b"\x40\x00\x00\x00garbage")
+
+    recovered = SessionStore(str(tmp_path)).recover(narrator=DummyNarrator())
+
+    assert recovered.turn_number == 3
+    assert [c.health for c in recovered.engine.turn_order] == [c.health for c in session.engine.turn_order]
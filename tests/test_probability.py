@@ -0,0 +1,99 @@
+import copy
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from character import AbilityScores, Character
+from equipment import Armor, Weapon
+from probability import _tables, damage_pmf, duel_odds, heal_pmf, hit_probability, matchup_table
+from simulator import simulate_duels
+
+
+def _characters():
+    c1 = Character(
+        name="A",
+        race="Human",
+        char_class="Fighter",
+        level=1,
+        health=20,
+        ability_scores=AbilityScores(16, 12, 14, 10, 10, 10),
+        weapon=Weapon("Longsword", 3, 0, 1, 8),
+        armor=Armor("Chain Shirt", 20, 0, 2),
+    )
+    c2 = Character(
+        name="B",
+        race="Elf",
+        char_class="Rogue",
+        level=1,
+        health=24,
+        ability_scores=AbilityScores(14, 16, 12, 10, 10, 10),
+        weapon=Weapon("Rapier", 2, 0, 2, 8),
+    )
+    return c1, c2
+
+
+def test_attack_and_heal_distributions_follow_engine_rules():
+    c1, c2 = _characters()
+
+    assert hit_probability(c1, c2) == pytest.approx(0.65)
+    pmf = damage_pmf(c2, c1)
+    assert sum(pmf.values()) == pytest.approx(1.0)
+    assert pmf[0] == pytest.approx(1 - hit_probability(c2, c1))
+    assert min(d for d in pmf if d) == 3 and max(pmf) == 10
+    assert heal_pmf(c1) == {amount: 0.125 for amount in range(3, 11)}
+
+
+def test_duel_odds_agree_with_simulation():
+    c1, c2 = _characters()
+
+    odds = duel_odds(c1, c2)
+    simulated = simulate_duels(c1, c2, trials=40000, seed=5)
+
+    assert odds.first_wins + odds.second_wins + odds.draw == pytest.approx(1.0)
+    assert odds.first_wins == pytest.approx(simulated.win_rate("A"), abs=0.01)
+    assert odds.expected_turns == pytest.approx(simulated.mean_turns, rel=0.02)
+    assert duel_odds(c1, c2, heal_threshold=None).expected_turns < odds.expected_turns
+
+
+def test_unwinnable_duel_is_a_draw():
+    c1, c2 = _characters()
+    c1.armor = Armor("Tower", 40, 0, 30)
+    c2.armor = Armor("Tower", 40, 0, 30)
+
+    odds = duel_odds(c1, c2)
+
+    assert odds.draw == pytest.approx(1.0)
+    assert odds.expected_turns == float("inf")
+
+
+def test_matchup_table_reuses_solved_duels():
+    c1, c2 = _characters()
+    roster = [c1, c2] + [copy.deepcopy(c1) for _ in range(3)] + [copy.deepcopy(c2) for _ in range(3)]
+    _tables.clear()
+
+    table = matchup_table(roster)
+
+    assert np.isnan(np.diag(table)).all()
+    assert table[0, 1] == pytest.approx(duel_odds(c1, c2).first_wins)
+    assert _tables.misses == 3
+
+
+def test_one_table_answers_both_turn_orders_and_lower_hp():
+    c1, c2 = _characters()
+    roster = [c1, c2]
+    for health in (30, 40):
+        for template in (c1, c2):
+            clone = copy.deepcopy(template)
+            clone.health = health
+            roster.append(clone)
+    _tables.clear()
+
+    table = matchup_table(roster)
+
+    assert _tables.misses == 3
+    for i, first in enumerate(roster):
+        for j, second in enumerate(roster):
+            if i != j:
+                _tables.clear()
+                assert table[i, j] == pytest.approx(duel_odds(first, second).first_wins, abs=1e-9)
@@ -0,0 +1,96 @@
+import json
+
+from game_engine import CombatEvent, DiceRoll
+from instrumentation import Instrumentation
+from narrator import Narrator
+from prompt_builder import NARRATION_PREFIX, PromptBuilder, estimate_tokens
+
+
+class ListSink:
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class FakeResponses:
+    def __init__(self):
+        self.inputs = []
+
+    def create(self, **kwargs):
+        self.inputs.append(kwargs["input"])
+        return type("Response", (), {"output_text": json.dumps({"narrative": "A clean strike."})})()
+
+
+def _event(actor="Aria", target="Bram"):
+    return CombatEvent(
+        actor=actor,
+        target=target,
+        action="attack",
+        hit=True,
+        damage=6,
+        actor_hp=20,
+        target_hp=4,
+        rolls=[DiceRoll("1d20", [15], 4), DiceRoll("1d8", [4], 2)],
+    )
+
+
+def _scene(bystanders=3, overview="A ruined chapel lit by torches."):
+    actors = [
+        {"name": "Aria", "class": "Fighter", "race": "Human", "hp": 20, "defeated": False, "weapon": "Longsword", "armor": None},
+        {"name": "Bram", "class": "Rogue", "race": "Elf", "hp": 4, "defeated": False, "weapon": "Dagger", "armor": "Leather"},
+    ]
+    for index in range(bystanders):
+        actors.append(
+            {"name": f"Goblin{index}", "class": "Rogue", "race": "Goblin", "hp": index, "defeated": index == 0, "weapon": "Club", "armor": None}
+        )
+    return {"turn": 3, "scene_overview": overview, "actors": actors}
+
+
+def test_turn_block_is_compact_and_keeps_full_rows_for_involved_actors_only():
+    prompt = PromptBuilder(max_bystanders=2).build(_event(), "I  swing hard", _scene(bystanders=5))
+
+    assert prompt.prefix == NARRATION_PREFIX
+    assert prompt.body.splitlines() == [
+        "intent: I swing hard",
+        "event actor=Aria target=Bram action=attack hit=1 dmg=6 actor_hp=20 target_hp=4",
+        "rolls: 1d20:15+4=19 1d8:4+2=6",
+        "scene: A ruined chapel lit by torches.",
+        "actors: Aria,Fighter,Human,20,Longsword,- | Bram,Rogue,Elf,4,Dagger,Leather",
+        "others: Goblin0!:0 Goblin1:1 +3 more (1 defeated overall)",
+    ]
+    assert prompt.truncated == [] and not prompt.over_budget
+    assert prompt.body_tokens == estimate_tokens(prompt.body)
+
+
+def test_budget_trims_bystanders_then_rolls_then_overview():
+    roomy = PromptBuilder(budget_tokens=1000, max_bystanders=50).build(_event(), "I attack", _scene(bystanders=50))
+    assert roomy.truncated == []
+
+    tight = PromptBuilder(budget_tokens=100, max_bystanders=50).build(_event(), "I attack", _scene(bystanders=50))
+    assert tight.truncated == ["bystanders"]
+    assert tight.body_tokens <= 100
+    assert "rolls:" in tight.body and "+" in tight.body.splitlines()[-1]
+
+    tiny = PromptBuilder(budget_tokens=60).build(_event(), "I attack", _scene(overview="A very long description " * 20))
+    assert tiny.truncated == ["bystanders", "rolls", "overview"]
+    assert tiny.body_tokens <= 60
+    assert "actor=Aria" in tiny.body and "Bram,Rogue,Elf,4" in tiny.body
+
+
+def test_narrator_sends_a_stable_prefix_and_reports_prompt_sizes():
+    sink = ListSink()
+    narrator = Narrator(instrumentation=Instrumentation(sink))
+    responses = FakeResponses()
+    narrator._client = type("Client", (), {"responses": responses})()
+
+    narrator.narrate_structured(_event(), "I attack", "ignored summary", _scene())
+    narrator.narrate_structured(_event("Bram", "Aria"), "I stab", "ignored summary", _scene(overview="Smoke."))
+
+    first, second = responses.inputs
+    assert first[0] == second[0] == {"role": "system", "content": NARRATION_PREFIX}
+    assert first[1]["role"] == "user" and "ignored summary" not in first[1]["content"]
+    sizes = [(r["labels"], r["value"]) for r in sink.records if r["name"] == "narrator_prompt_tokens"]
+    assert sizes[0] == ({"part": "prefix"}, estimate_tokens(NARRATION_PREFIX))
+    assert sizes[1] == ({"part": "turn"}, estimate_tokens(first[1]["content"]))
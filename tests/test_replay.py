@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from character import AbilityScores, Character
+from equipment import Weapon
+from persistence import capture
+from replay import ReplayEngine, TurnInput
+from session import AdventureSession
+
+
+class DummyNarrator:
+    def narrate(self, event, action_text):
+        return "fallback"
+
+
+def _characters():
+    c1 = Character(
+        name="A",
+        race="Human",
+        char_class="Fighter",
+        level=1,
+        health=200,
+        ability_scores=AbilityScores(16, 12, 12, 10, 10, 10),
+        weapon=Weapon("Longsword", 3, 0, 1, 8),
+    )
+    c2 = Character(
+        name="B",
+        race="Elf",
+        char_class="Rogue",
+        level=1,
+        health=200,
+        ability_scores=AbilityScores(10, 14, 10, 10, 10, 10),
+        weapon=Weapon("Dagger", 1, 0, 1, 4),
+    )
+    return [c1, c2]
+
+
+def _record(seed, turns):
+    session = AdventureSession(_characters(), narrator=DummyNarrator(), rng=random.Random(seed))
+    inputs, events, snapshots = [], [], [capture(session)]
+    for index in range(turns):
+        actor, target = ("A", "B") if index % 2 == 0 else ("B", "A")
+        intent = "I heal" if index % 7 == 6 else "I attack"
+        inputs.append((actor, target, intent))
+        events.append(session.process_turn(actor, target, intent).event)
+        snapshots.append(capture(session))
+    return inputs, events, snapshots
+
+
+def test_replay_reproduces_every_turn_without_narrator():
+    inputs, events, snapshots = _record(seed=21, turns=60)
+    replay = ReplayEngine(_characters(), seed=21, inputs=inputs, checkpoint_every=10)
+
+    assert replay.fast_forward() == events
+    assert capture(replay.session) == snapshots[-1]
+    assert replay.checkpoints() == (0, 10, 20, 30, 40, 50, 60)
+
+
+def test_jump_to_uses_checkpoints_in_both_directions():
+    inputs, events, snapshots = _record(seed=5, turns=40)
+    replay = ReplayEngine(_characters(), seed=5, inputs=inputs, checkpoint_every=8)
+    replay.fast_forward()
+
+    assert capture(replay.jump_to(13)) == snapshots[13]
+    assert capture(replay.jump_to(37)) == snapshots[37]
+    assert replay.event_at(25) == events[24]
+    with pytest.raises(IndexError):
+        replay.jump_to(41)
+
+
+def test_from_snapshot_resumes_mid_session():
+    inputs, events, snapshots = _record(seed=8, turns=30)
+
+    replay = ReplayEngine.from_snapshot(snapshots[20], [TurnInput(*value) for value in inputs[20:]])
+
+    assert replay.fast_forward() == events[20:]
+    assert capture(replay.session) == snapshots[30]
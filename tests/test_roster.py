@@ -0,0 +1,14 @@
+from roster import WEAPONS, build_roster
+
+
+def test_rosters_do_not_share_equipment():
+    roster = build_roster(8)
+    catalogue_damage = WEAPONS[0].max_damage
+    revision = roster[4].weapon.revision
+
+    roster[0].weapon.max_damage += 5
+
+    assert roster[4].weapon.max_damage == catalogue_damage
+    assert roster[4].weapon.revision == revision
+    assert WEAPONS[0].max_damage == catalogue_damage
+    assert build_roster(8)[0].weapon.max_damage == catalogue_damage
@@ -0,0 +1,155 @@
+import random
+
+import pytest
+
+from character import AbilityScores, Character
+from equipment import Weapon
+from prompt_builder import PromptBuilder
+from scene import SceneActors, SceneTracker, actor_row
+from session import AdventureSession, TurnResult
+
+
+class DummyNarrator:
+    def narrate(self, event, action_text):
+        return "fallback"
+
+
+def _characters(count=4):
+    return [
+        Character(
+            name=name,
+            race="Human",
+            char_class="Fighter",
+            level=1,
+            health=30,
+            ability_scores=AbilityScores(14, 12, 12, 10, 10, 10),
+            weapon=Weapon("Longsword", 3, 0, 1, 8),
+        )
+        for name in ["Aria", "Arn", "Bram", "Cole"][:count]
+    ]
+
+
+def test_update_records_only_touched_fields():
+    characters = _characters()
+    tracker = SceneTracker(characters)
+
+    characters[1].health = 0
+    characters[2].health = 10
+    assert tracker.update("arn", "Cole") == {1: {"hp": 0, "defeated": True}}
+    assert tracker.actors()[2]["hp"] == 30
+    assert tracker.resync() == {2: {"hp": 10}}
+    assert tracker.resync() == {}
+    assert tracker.version == 2
+    assert tracker.diff(1) == {1: {"hp": 0, "defeated": True}}
+
+
+@pytest.mark.parametrize("max_versions", [None, 5])
+def test_old_versions_rebuild_from_keyframes_and_diffs(max_versions):
+    characters = _characters()
+    tracker = SceneTracker(characters, keyframe_every=4, max_versions=max_versions)
+    rng = random.Random(3)
+    expected = {0: [actor_row(c) for c in characters]}
+    for version in range(1, 20):
+        touched = rng.choice(characters)
+        touched.health = rng.randint(-2, 30)
+        tracker.update(touched.name)
+        expected[version] = [actor_row(c) for c in characters]
+
+    for version in range(tracker.oldest_version, 20):
+        assert tracker.actors(version) == expected[version]
+    if max_versions is not None:
+        assert tracker.oldest_version == 20 - 1 - max_versions
+        with pytest.raises(LookupError):
+            tracker.actors(tracker.oldest_version - 1)
+
+
+def test_session_history_materializes_each_turn_lazily():
+    session = AdventureSession(_characters(2), narrator=DummyNarrator(), rng=random.Random(7))
+    snapshots = []
+    for turn in range(6):
+        actor, target = ("Aria", "Arn") if turn % 2 == 0 else ("Arn", "Aria")
+        session.process_turn(actor, target, "I attack")
+        snapshots.append(session.scene_state())
+
+    for result, snapshot in zip(session.history, snapshots):
+        assert result.scene.turn == snapshot["turn"]
+        assert result.scene_state == snapshot
+
+
+def test_status_checks_do_not_expire_retained_turns():
+    characters = _characters(2)
+    session = AdventureSession(characters, narrator=DummyNarrator(), rng=random.Random(7), history_limit=2)
+    session.process_turn("Aria", "Arn", "I attack")
+    result = session.process_turn("Arn", "Aria", "I attack")
+    expected = result.scene.tracker.actors(result.scene.version)
+    for hp in (5, 6, 7):
+        characters[0].health = hp
+        session.scene_state()
+
+    assert result.scene_state["actors"] == expected
+    for _ in range(2):
+        session.process_turn("Aria", "Arn", "I attack")
+    assert session.scene.oldest_version == session.history[0].scene.version - 1
+    with pytest.raises(LookupError):
+        result.scene.diff
+
+
+def test_turn_result_still_accepts_a_scene_state_dict():
+    session = AdventureSession(_characters(2), narrator=DummyNarrator(), rng=random.Random(7))
+    turn = session.process_turn("Aria", "Arn", "I attack")
+    state = {"turn": 1, "scene_overview": "A quiet crypt.", "actors": []}
+
+    legacy = TurnResult(
+        event=turn.event,
+        mechanics_summary=turn.mechanics_summary,
+        state_delta=turn.state_delta,
+        scene_state=state,
+        narrative="fallback",
+        image_prompt="",
+        ai_state_notes=[],
+    )
+
+    assert legacy.scene_state is state and legacy.scene.overview == "A quiet crypt."
+
+
+def test_narration_scene_copies_only_the_rows_the_prompt_shows():
+    characters = _characters()
+    session = AdventureSession(characters, narrator=DummyNarrator(), rng=random.Random(7))
+    turn = session.process_turn("Bram", "Aria", "I attack")
+    characters[1].health = 0
+    session.scene_state()
+    builder = PromptBuilder(max_bystanders=1)
+
+    scene = session._narration_scene()
+    lazy = builder.turn_block(turn.event, "I attack", scene)
+
+    assert isinstance(scene["actors"], SceneActors) and scene["actors"]._rows is None
+    assert lazy == builder.turn_block(turn.event, "I attack", {**scene, "actors": list(scene["actors"])})
+    assert "others: Arn!:0 +1 more (1 defeated overall)" in lazy[0]
+
+
+def test_scene_view_keeps_its_version_after_later_turns():
+    characters = _characters(2)
+    tracker = SceneTracker(characters)
+    view = tracker.view()
+    before = [actor_row(c) for c in characters]
+
+    characters[0].health = 0
+    tracker.update("Aria")
+
+    assert view.get("aria") == before[0] and view.defeated() == 0
+    assert view == before and tracker.view().defeated() == 1
+
+
+def test_identical_turns_compare_equal():
+    results = [
+        AdventureSession(_characters(2), narrator=DummyNarrator(), rng=random.Random(7)).process_turn(
+            "Aria", "Arn", "I attack"
+        )
+        for _ in range(2)
+    ]
+
+    assert results[0] == results[1]
+    assert repr(results[0]) == repr(results[1]) and "scene_state=" in repr(results[0])
+    results[1].narrative = "different"
+    assert results[0] != results[1]
@@ -0,0 +1,186 @@
+import asyncio
+import json
+
+import pytest
+
+from image_jobs import ImageCache, ImageJobQueue
+from narrator import StubNarrator
+from server import BoundedNarrator, SessionBusy, SessionClosed, SessionHost, SessionServer, _encode_frame, _read_frame
+
+
+def test_host_resolves_player_and_ai_turns():
+    async def scenario():
+        host = SessionHost(narrator=StubNarrator(), workers=2)
+        await host.start()
+        hosted = host.create_session()
+        outcome = await host.submit(hosted.session_id, "attack daisy")
+        await host.stop()
+        return outcome
+
+    outcome = asyncio.run(scenario())
+
+    assert [turn["actor"] for turn in outcome["turns"]] == ["Sturm", "Daisy"]
+    assert outcome["turn"] == 2
+
+
+def test_full_session_queue_rejects_commands():
+    async def scenario():
+        host = SessionHost(narrator=StubNarrator(), workers=1, queue_size=1)
+        await host.start()
+        hosted = host.create_session()
+        first = asyncio.ensure_future(host.submit(hosted.session_id, "observe daisy"))
+        await asyncio.sleep(0)
+        with pytest.raises(SessionBusy):
+            await host.submit(hosted.session_id, "observe daisy")
+        await first
+        await host.stop()
+        return host.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["commands_rejected"] == 1
+    assert stats["commands_processed"] == 1
+
+
+async def _request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def test_http_front_end_creates_session_and_runs_command():
+    async def scenario():
+        server = SessionServer(SessionHost(narrator=StubNarrator()), port=0)
+        await server.start()
+        created = await _request(server.port, "POST", "/sessions")
+        session_id = created[1]["session_id"]
+        turn = await _request(server.port, "POST", f"/sessions/{session_id}/commands", {"command": "heal"})
+        missing = await _request(server.port, "GET", "/sessions/nope")
+        await server.stop()
+        return created, turn, missing
+
+    created, turn, missing = asyncio.run(scenario())
+
+    assert created[0] == 201
+    assert turn[0] == 200
+    assert turn[1]["turns"][0]["action"] == "heal"
+    assert missing[0] == 404
+
+
+def test_narrated_turns_publish_rendered_images(tmp_path):
+    async def scenario():
+        images = ImageJobQueue(ImageCache(str(tmp_path)), workers=1, size=8)
+        host = SessionHost(narrator=StubNarrator(), workers=1, images=images)
+        await host.start()
+        hosted = host.create_session()
+        inbox = asyncio.Queue()
+        hosted.subscribers.add(inbox)
+        await host.submit(hosted.session_id, "attack daisy")
+        messages = []
+        while not any(message["type"] == "image" for message in messages):
+            messages.append(await asyncio.wait_for(inbox.get(), 5))
+        await host.stop()
+        images.close()
+        return messages
+
+    messages = asyncio.run(scenario())
+
+    image = next(message for message in messages if message["type"] == "image")
+    assert image["path"].startswith(str(tmp_path)) and image["turn"] in (1, 2)
+
+
+def test_closing_or_stopping_fails_queued_commands_instead_of_hanging():
+    async def scenario():
+        host = SessionHost(narrator=StubNarrator(), workers=1)
+        await host.start()
+        closing, stopping = host.create_session(), host.create_session()
+        submitted = [
+            asyncio.ensure_future(host.submit(hosted.session_id, "observe daisy"))
+            for hosted in (closing, closing, closing, stopping, stopping, stopping)
+        ]
+        await asyncio.sleep(0)
+        host.close_session(closing.session_id)
+        await host.stop()
+        outcomes = await asyncio.wait_for(asyncio.gather(*submitted, return_exceptions=True), 1)
+        return outcomes, host.stats()
+
+    outcomes, stats = asyncio.run(scenario())
+
+    closed = [outcome for outcome in outcomes if isinstance(outcome, SessionClosed)]
+    assert all(isinstance(outcome, (dict, SessionClosed)) for outcome in outcomes)
+    assert len(closed) >= 4  # the single worker gets to at most one command per session
+    assert stats["commands_dropped"] == len(closed)
+
+
+def test_bounded_narrator_counts_failures_apart_from_completions():
+    class Failing:
+        async def narrate_structured_async(self, *args):
+            raise RuntimeError("backend down")
+
+    async def scenario():
+        narrator = BoundedNarrator(Failing())
+        with pytest.raises(RuntimeError):
+            await narrator.narrate_structured_async(None, "", "", None)
+        return narrator
+
+    narrator = asyncio.run(scenario())
+
+    assert (narrator.completed, narrator.failed, narrator.pending) == (0, 1, 0)
+
+
+def test_http_rejects_bad_commands_and_reports_worker_errors():
+    class BrokenHost(SessionHost):
+        async def _run_command(self, hosted, command):
+            if command == "explode":
+                raise RuntimeError("boom")
+            return await super()._run_command(hosted, command)
+
+    async def scenario():
+        server = SessionServer(BrokenHost(narrator=StubNarrator()), port=0)
+        await server.start()
+        session_id = server.host.create_session().session_id
+        path = f"/sessions/{session_id}/commands"
+        outcomes = [
+            await _request(server.port, "POST", path, {"command": 5}),
+            await _request(server.port, "POST", path, ["heal"]),
+            await _request(server.port, "POST", path, {"command": "explode"}),
+            await _request(server.port, "POST", path, {"command": "heal"}),
+        ]
+        await server.stop()
+        return outcomes
+
+    outcomes = asyncio.run(scenario())
+
+    assert [status for status, _ in outcomes] == [400, 400, 500, 200]
+    assert outcomes[0][1] == {"error": "command must be a string"}
+
+
+def test_websocket_on_a_closed_session_reports_error_and_closes():
+    async def scenario():
+        server = SessionServer(SessionHost(narrator=StubNarrator()), port=0)
+        await server.start()
+        hosted = server.host.create_session()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(
+            f"GET /sessions/{hosted.session_id}/ws HTTP/1.1\r\nUpgrade: websocket\r\n"
+            "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n\r\n".encode()
+        )
+        await reader.readuntil(b"\r\n\r\n")
+        server.host.close_session(hosted.session_id)
+        writer.write(_encode_frame(0x1, b"attack daisy"))
+        frames = [await asyncio.wait_for(_read_frame(reader), 2) for _ in range(2)]
+        writer.close()
+        await server.stop()
+        return frames
+
+    (error_opcode, error), (close_opcode, _) = asyncio.run(scenario())
+
+    assert error_opcode == 0x1 and json.loads(error) == {"type": "error", "error": "unknown session"}
+    assert close_opcode == 0x8
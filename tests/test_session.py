@@ -1,3 +1,4 @@
+import asyncio
 import random
 
 from character import AbilityScores, Character
@@ -82,3 +83,46 @@ def test_structured_narrator_updates_scene_and_state_notes():
     assert result.scene_state["scene_overview"] == "The chapel fills with drifting ash."
     assert result.ai_state_notes == ["A pillar collapses near the altar."]
     assert "Ash clouds and cracked stone floor." in result.image_prompt
+
+
+class SlowAsyncNarrator:
+    def __init__(self):
+        self.release = None
+
+    def narrate(self, event, action_text):
+        return "fallback"
+
+    async def narrate_structured_async(self, event, action_text, mechanics_summary, scene_state):
+        await self.release.wait()
+        return {
+            "narrative": f"Late:{event.actor}:{scene_state['turn']}",
+            "scene_overview_update": "Smoke curls around the altar.",
+            "state_notes": ["The torches gutter."],
+            "image_prompt_addendum": "Curling smoke.",
+        }
+
+
+def test_process_turn_async_returns_fallback_before_narration_arrives():
+    c1, c2 = _characters()
+    narrator = SlowAsyncNarrator()
+    session = AdventureSession([c1, c2], narrator=narrator, rng=random.Random(1))
+
+    async def scenario():
+        narrator.release = asyncio.Event()
+        first = await session.process_turn_async("A", "B", "I attack with my sword")
+        second = await session.process_turn_async("B", "A", "I stab back")
+        assert session.turn_number == 2
+        assert not first.narration.done()
+        assert "Late" not in first.narrative
+        narrator.release.set()
+        await session.wait_for_narration()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first.narrative == "Late:A:1"
+    assert second.narrative == "Late:B:2"
+    assert first.ai_state_notes == ["The torches gutter."]
+    assert "Curling smoke." in first.image_prompt
+    assert "Turn 1:" in first.image_prompt
+    assert session.scene_overview == "Smoke curls around the altar."
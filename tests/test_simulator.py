@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from character import AbilityScores, Character
+from equipment import Armor, Weapon
+from simulator import simulate_duels, simulate_duels_scalar
+
+
+def _characters():
+    c1 = Character(
+        name="A",
+        race="Human",
+        char_class="Fighter",
+        level=1,
+        health=20,
+        ability_scores=AbilityScores(16, 12, 14, 10, 10, 10),
+        weapon=Weapon("Longsword", 3, 0, 1, 8),
+        armor=Armor("Chain Shirt", 20, 0, 2),
+    )
+    c2 = Character(
+        name="B",
+        race="Elf",
+        char_class="Rogue",
+        level=1,
+        health=24,
+        ability_scores=AbilityScores(14, 16, 12, 10, 10, 10),
+        weapon=Weapon("Rapier", 2, 0, 2, 8),
+    )
+    return c1, c2
+
+
+def test_vectorized_duels_account_for_every_trial():
+    c1, c2 = _characters()
+
+    stats = simulate_duels(c1, c2, trials=500, seed=3)
+
+    assert stats.wins["A"] + stats.wins["B"] + stats.draws == 500
+    assert stats.turn_counts.sum() == 500 - stats.draws
+    assert stats.damage_histograms["B"][:2].sum() == 0
+    assert c1.health == 20 and c2.health == 24
+
+
+def test_vectorized_duels_match_scalar_engine():
+    c1, c2 = _characters()
+
+    fast = simulate_duels(c1, c2, trials=20000, seed=11)
+    slow = simulate_duels_scalar(c1, c2, trials=3000, seed=11)
+
+    assert fast.win_rate("A") == pytest.approx(slow.win_rate("A"), abs=0.04)
+    assert fast.mean_turns == pytest.approx(slow.mean_turns, rel=0.08)
+    fast_damage = fast.damage_histograms["A"] / fast.damage_histograms["A"].sum()
+    slow_damage = slow.damage_histograms["A"] / slow.damage_histograms["A"].sum()
+    size = max(len(fast_damage), len(slow_damage))
+    fast_damage = np.pad(fast_damage, (0, size - len(fast_damage)))
+    slow_damage = np.pad(slow_damage, (0, size - len(slow_damage)))
+    assert np.abs(fast_damage - slow_damage).max() < 0.03
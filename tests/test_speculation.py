@@ -0,0 +1,135 @@
+import random
+import threading
+
+import pytest
+
+from character import AbilityScores, Character
+from equipment import Armor, Weapon
+from main import AI_ATTACK_INTENT, AI_HEAL_INTENT, ai_intent
+from probability import hit_probability
+from session import AdventureSession
+from speculation import SpeculativeNarrator, turn_outcomes
+
+
+class RecordingNarrator:
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def narrate(self, event, action_text):
+        return "fallback"
+
+    def narrate_structured(self, event, action_text, mechanics_summary, scene_state):
+        with self._lock:
+            self.calls.append((event.actor, threading.current_thread().name.startswith("speculate")))
+        return {"narrative": f"{event.actor} {event.action} {event.damage}", "scene_overview_update": "", "state_notes": []}
+
+
+def _characters(ai_health=20):
+    return [
+        Character(
+            name="Sturm",
+            race="Human",
+            char_class="Warrior",
+            level=1,
+            health=25,
+            ability_scores=AbilityScores(16, 12, 12, 10, 10, 10),
+            weapon=Weapon("Sword", 3, 0, 1, 8),
+            armor=Armor("Chain Shirt", 20, 0, 2),
+        ),
+        Character(
+            name="Daisy",
+            race="Elf",
+            char_class="Rogue",
+            level=1,
+            health=ai_health,
+            ability_scores=AbilityScores(12, 16, 14, 10, 10, 10),
+            weapon=Weapon("Bow", 6, 0, 1, 6),
+        ),
+    ]
+
+
+def test_turn_outcomes_cover_every_resolution():
+    session = AdventureSession(_characters(ai_health=5), narrator=RecordingNarrator())
+    hp = {"sturm": 25, "daisy": 5}
+
+    attack = turn_outcomes(session, "Sturm", "Daisy", "I attack", hp)
+    assert sum(p for p, _ in attack) == pytest.approx(1.0)
+    assert sum(p for p, event in attack if event.hit) == pytest.approx(hit_probability(*session.engine.turn_order))
+    assert {event.target_hp for _, event in attack} == {5} | {5 - damage for damage in range(4, 12)}
+
+    heal = dict((event.actor_hp, p) for p, event in turn_outcomes(session, "Daisy", "Daisy", "I heal", hp))
+    assert sum(heal.values()) == pytest.approx(1.0)
+    assert max(heal) == 5  # already at starting HP, so every heal is capped to nothing
+
+
+def test_prefetched_ai_narration_is_served_without_a_backend_call():
+    backend = RecordingNarrator()
+    speculator = SpeculativeNarrator(backend, max_candidates=100, min_probability=0.0, max_calls_per_minute=1000)
+    session = AdventureSession(_characters(), narrator=speculator, rng=random.Random(4))
+
+    queued = speculator.speculate(session, "Daisy", "Sturm", AI_HEAL_INTENT, AI_ATTACK_INTENT)
+    session.process_turn("Sturm", "Daisy", "I attack")
+    result = session.process_turn(*ai_intent(session, "Daisy", "Sturm"))
+    speculator.close()
+
+    assert queued > 4  # one prefetch per damage/HP bucket, not per exact roll
+    assert [actor for actor, speculative in backend.calls if not speculative] == ["Sturm"]
+    assert result.narrative == f"Daisy {result.event.action} {result.event.damage}"
+    assert (speculator.stats.hits, speculator.stats.misses) == (1, 0)
+    assert speculator.stats.wasted == queued - 1
+
+
+def test_cost_caps_and_misses_are_counted():
+    backend = RecordingNarrator()
+    speculator = SpeculativeNarrator(backend, max_candidates=3, max_calls_per_minute=4, clock=lambda: 0.0)
+    session = AdventureSession(_characters(), narrator=speculator, rng=random.Random(4))
+
+    assert speculator.speculate(session, "Daisy", "Sturm", AI_HEAL_INTENT, AI_ATTACK_INTENT) == 3
+    assert speculator.speculate(session, "Daisy", "Sturm", AI_HEAL_INTENT, AI_ATTACK_INTENT) == 1
+    assert speculator.stats.skipped_budget == 2 and speculator.stats.wasted == 3
+
+    session.process_turn("Sturm", "Sturm", "I heal")  # not the predicted player action
+    session.process_turn(*ai_intent(session, "Daisy", "Sturm"))
+    speculator.close()
+    assert (speculator.stats.hits, speculator.stats.misses) == (0, 1)
+    assert speculator.stats.hit_rate == 0.0
+
+
+def test_player_narration_narrows_the_round_to_reachable_ai_turns():
+    backend = RecordingNarrator()
+    speculator = SpeculativeNarrator(backend, max_candidates=7, min_probability=0.0, max_calls_per_minute=1000)
+    session = AdventureSession(_characters(), narrator=speculator, rng=random.Random(7))
+
+    assert speculator.speculate(session, "Daisy", "Sturm", AI_HEAL_INTENT, AI_ATTACK_INTENT) == 7
+    session.process_turn("Sturm", "Daisy", "I attack")
+    session.process_turn(*ai_intent(session, "Daisy", "Sturm"))
+    speculator.close()
+
+    # seven guesses cannot cover every (Sturm, Daisy) outcome pair, but once Sturm's turn
+    # is known they cover a miss plus every bow damage roll
+    assert [actor for actor, speculative in backend.calls if not speculative] == ["Sturm"]
+    assert (speculator.stats.hits, speculator.stats.misses) == (1, 0)
+
+
+class OverviewNarrator(RecordingNarrator):
+    """Rewrites the scene overview on every narration, as LLM narrators usually do."""
+
+    def narrate_structured(self, event, action_text, mechanics_summary, scene_state):
+        result = super().narrate_structured(event, action_text, mechanics_summary, scene_state)
+        return {**result, "scene_overview_update": f"The dust settles after {event.actor} acts."}
+
+
+def test_overview_update_from_player_narration_still_matches_prefetch():
+    backend = OverviewNarrator()
+    speculator = SpeculativeNarrator(backend, max_candidates=7, min_probability=0.0, max_calls_per_minute=1000)
+    session = AdventureSession(_characters(), narrator=speculator, rng=random.Random(7))
+
+    speculator.speculate(session, "Daisy", "Sturm", AI_HEAL_INTENT, AI_ATTACK_INTENT)
+    session.process_turn("Sturm", "Daisy", "I attack")
+    assert session.scene_overview == "The dust settles after Sturm acts."
+    session.process_turn(*ai_intent(session, "Daisy", "Sturm"))
+    speculator.close()
+
+    assert [actor for actor, speculative in backend.calls if not speculative] == ["Sturm"]
+    assert (speculator.stats.hits, speculator.stats.misses) == (1, 0)
@@ -0,0 +1,100 @@
+import asyncio
+
+from game_engine import CombatEvent, DiceRoll
+from narrator import Narrator
+from template_narrator import EscalatingNarrator, TemplateNarrator, outcome_of
+
+
+class RecordingRemote:
+    def __init__(self, offline=False):
+        self.offline = offline
+        self.calls = []
+
+    def narrate_structured(self, event, action_text, mechanics_summary, scene_state):
+        self.calls.append(event)
+        if self.offline:
+            return Narrator._fallback_structured(event, action_text)
+        return {"narrative": "LLM narrative.", "scene_overview_update": "", "state_notes": [], "image_prompt_addendum": ""}
+
+
+def _scene(turn=3, overview="A ruined chapel.", weapon="Bow", race="Drow Elf"):
+    return {
+        "turn": turn,
+        "scene_overview": overview,
+        "actors": [
+            {"name": "Daisy", "hp": 20, "defeated": False, "weapon": weapon, "race": race},
+            {"name": "Sturm", "hp": 14, "defeated": False, "weapon": "Sword", "race": "Human"},
+        ],
+    }
+
+
+def _attack(damage=4, target_hp=14, attack_roll=14):
+    return CombatEvent(
+        actor="Daisy",
+        target="Sturm",
+        action="attack",
+        hit=damage > 0,
+        damage=damage,
+        actor_hp=20,
+        target_hp=target_hp,
+        rolls=[DiceRoll("1d20", [attack_roll], 2)],
+    )
+
+
+def test_templates_vary_by_turn_but_are_deterministic():
+    narrator = TemplateNarrator(seed=7)
+    event = _attack()
+
+    narratives = {narrator.narrate_structured(event, "I shoot", "", _scene(turn))["narrative"] for turn in range(20)}
+    again = narrator.narrate_structured(event, "I shoot", "", _scene(4))
+
+    assert len(narratives) > 3
+    assert again == TemplateNarrator(seed=7).narrate_structured(event, "I shoot", "", _scene(4))
+    assert all("4" in text and "14 HP" in text for text in narratives)
+    assert "Drow" not in again["narrative"] and "moss-light" in again["image_prompt_addendum"]
+    assert again["state_notes"] and set(again) == set(Narrator._fallback_structured(event, "I shoot"))
+    assert [outcome_of(_attack(d, hp)) for d, hp in ((0, 14), (1, 14), (4, 14), (9, 5), (4, 0))] == [
+        "miss", "graze", "solid", "heavy", "kill"
+    ]
+
+
+def test_only_notable_beats_reach_the_llm():
+    remote = RecordingRemote()
+    narrator = EscalatingNarrator(TemplateNarrator(), remote)
+
+    assert narrator.narrate_structured(_attack(), "I shoot", "", _scene(turn=1))["narrative"] == "LLM narrative."
+    assert narrator.narrate_structured(_attack(), "I shoot", "", _scene())["narrative"] != "LLM narrative."
+    assert narrator.escalation_reason(_attack(target_hp=0), _scene()) == "kill"
+    assert narrator.escalation_reason(_attack(attack_roll=20), _scene()) == "crit"
+    assert narrator.escalation_reason(_attack(), _scene(overview="A flooded crypt.")) == "scene"
+    assert narrator.escalation_reason(_attack(), _scene(overview="A flooded crypt.")) == "scene"
+    narrator.record_scene(_scene(overview="A flooded crypt."))
+    assert narrator.escalation_reason(_attack(), _scene(overview="A flooded crypt.")) is None
+    assert len(remote.calls) == 1
+
+    streamed = list(narrator.stream_structured(_attack(target_hp=0), "I shoot", "", _scene()))
+    assert streamed[-1].directives["narrative"] == "LLM narrative." and len(remote.calls) == 2
+
+
+def test_remote_fallback_is_replaced_by_a_template():
+    narrator = EscalatingNarrator(TemplateNarrator(), RecordingRemote(offline=True))
+    event = _attack(target_hp=0)
+
+    result = asyncio.run(narrator.narrate_structured_async(event, "I shoot", "", _scene()))
+
+    assert result != Narrator._fallback_structured(event, "I shoot")
+    assert "Sturm" in result["narrative"] and result["state_notes"] == ["Sturm is defeated."]
+
+
+def test_interleaved_sessions_with_the_same_roster_keep_their_own_scene():
+    remote = RecordingRemote()
+    narrator = EscalatingNarrator(TemplateNarrator(), remote)
+    chapel = {**_scene(turn=2, overview="A ruined chapel."), "session": "a"}
+    crypt = {**_scene(turn=2, overview="A flooded crypt."), "session": "b"}
+
+    for turn in range(3, 9):
+        narrator.narrate_structured(_attack(), "I shoot", "", {**chapel, "turn": turn})
+        narrator.narrate_structured(_attack(), "I shoot", "", {**crypt, "turn": turn})
+
+    assert remote.calls == []
+    assert narrator.escalation_reason(_attack(), {**crypt, "scene_overview": "The crypt floods."}) == "scene"
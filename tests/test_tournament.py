@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from character import AbilityScores, Character
+from equipment import Armor, Weapon
+from tournament import TournamentConfig, read_results, run_tournament, standings
+
+
+def _characters():
+    return [
+        Character("Knight", "Human", "Fighter", 1, 24, AbilityScores(16, 12, 14, 10, 10, 10),
+                  Weapon("Longsword", 3, 0, 1, 8), Armor("Chain Shirt", 20, 0, 2)),
+        Character("Duelist", "Elf", "Rogue", 1, 22, AbilityScores(14, 16, 12, 10, 10, 10),
+                  Weapon("Rapier", 2, 0, 2, 8)),
+        Character("Peasant", "Human", "Commoner", 1, 12, AbilityScores(8, 8, 8, 10, 10, 10),
+                  Weapon("Club", 2, 0, 1, 4)),
+    ]
+
+
+CONFIG = TournamentConfig(seed=7, shards_per_pair=2, trials_per_shard=60)
+
+
+def _by_key(results):
+    return {result.key: result for result in results}
+
+
+def test_results_do_not_depend_on_worker_count(tmp_path):
+    serial = run_tournament(_characters(), str(tmp_path / "serial.jsonl"), CONFIG, workers=1)
+    pooled = run_tournament(_characters(), str(tmp_path / "pooled.jsonl"), CONFIG, workers=2)
+
+    assert len(serial) == 3 * 2 * 2
+    assert _by_key(serial) == _by_key(pooled)
+    header, streamed = read_results(str(tmp_path / "pooled.jsonl"))
+    assert header["roster"] == ["Knight", "Duelist", "Peasant"]
+    assert _by_key(streamed) == _by_key(pooled)
+
+
+def test_interrupted_tournament_resumes_without_replaying_shards(tmp_path):
+    full = run_tournament(_characters(), str(tmp_path / "full.jsonl"), CONFIG, workers=1)
+    path = tmp_path / "partial.jsonl"
+    lines = (tmp_path / "full.jsonl").read_text().splitlines(keepends=True)
+    path.write_text("".join(lines[:5]) + lines[5][:10])
+
+    resumed = run_tournament(_characters(), str(path), CONFIG, workers=1)
+
+    assert _by_key(resumed) == _by_key(full)
+    assert len(read_results(str(path))[1]) == len(full)
+    with pytest.raises(ValueError):
+        run_tournament(_characters(), str(path), TournamentConfig(seed=8), workers=1)
+    buffed = _characters()
+    buffed[2].weapon.max_damage = 12
+    with pytest.raises(ValueError):
+        run_tournament(buffed, str(path), CONFIG, workers=1)
+
+
+def test_standings_rank_stronger_builds_higher(tmp_path):
+    results = run_tournament(_characters(), str(tmp_path / "t.jsonl"), CONFIG, workers=1)
+
+    table = standings(results)
+
+    assert table[-1].name == "Peasant"
+    assert table[0].elo > table[1].elo > table[2].elo
+    assert all(row.games == 2 * 2 * 2 * 60 for row in table)
+    assert sum(row.wins for row in table) == sum(row.losses for row in table)
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from character import Character
+from roster import build_roster
+from simulator import DEFAULT_HEAL_THRESHOLD, DEFAULT_MAX_TURNS, DuelStats, simulate_duels, simulate_duels_scalar
+
+
+logger = logging.getLogger(__name__)
+
+ENGINES = {"vectorized": simulate_duels, "scalar": simulate_duels_scalar}
+ELO_BASE = 1500.0
+
+ShardKey = Tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class TournamentConfig:
+    seed: int = 0
+    shards_per_pair: int = 4
+    trials_per_shard: int = 250
+    heal_threshold: Optional[int] = DEFAULT_HEAL_THRESHOLD
+    max_turns: int = DEFAULT_MAX_TURNS
+    engine: str = "vectorized"
+
+    def to_dict(self) -> dict:
+        return {
+            "seed": self.seed,
+            "shards_per_pair": self.shards_per_pair,
+            "trials_per_shard": self.trials_per_shard,
+            "heal_threshold": self.heal_threshold,
+            "max_turns": self.max_turns,
+            "engine": self.engine,
+        }
+
+
+@dataclass
+class ShardResult:
+    first: str
+    second: str
+    shard: int
+    trials: int
+    first_wins: int
+    second_wins: int
+    draws: int
+    total_turns: int
+
+    @property
+    def key(self) -> ShardKey:
+        return self.first, self.second, self.shard
+
+
+@dataclass
+class Standing:
+    name: str
+    games: int
+    wins: int
+    losses: int
+    draws: int
+    elo: float
+
+    @property
+    def win_rate(self) -> float:
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.0
+
+
+def shard_seed(seed: int, first: str, second: str, shard: int) -> int:
+    """Seed of one shard; depends only on the tournament seed and the shard's identity."""
+    sequence = np.random.SeedSequence(
+        seed, spawn_key=(zlib.crc32(first.encode("utf-8")), zlib.crc32(second.encode("utf-8")), shard)
+    )
+    return int(sequence.generate_state(1)[0])
+
+
+_WORKER_ROSTER: Dict[str, Character] = {}
+
+
+def _init_worker(characters: List[Character]) -> None:
+    global _WORKER_ROSTER
+    _WORKER_ROSTER = {c.name: c for c in characters}
+
+
+def _play_shard(config: TournamentConfig, key: ShardKey) -> ShardResult:
+    first, second, shard = key
+    stats: DuelStats = ENGINES[config.engine](
+        _WORKER_ROSTER[first],
+        _WORKER_ROSTER[second],
+        config.trials_per_shard,
+        seed=shard_seed(config.seed, first, second, shard),
+        heal_threshold=config.heal_threshold,
+        max_turns=config.max_turns,
+    )
+    return ShardResult(
+        first=first,
+        second=second,
+        shard=shard,
+        trials=stats.trials,
+        first_wins=stats.wins[first],
+        second_wins=stats.wins[second],
+        draws=stats.draws,
+        total_turns=int((np.arange(len(stats.turn_counts)) * stats.turn_counts).sum()),
+    )
+
+
+def schedule(characters: Iterable[Character], shards_per_pair: int) -> List[ShardKey]:
+    """Every ordered pairing (both sides get to act first), split into shards."""
+    names = [c.name for c in characters]
+    return [
+        (first, second, shard)
+        for first in names
+        for second in names
+        if first != second
+        for shard in range(shards_per_pair)
+    ]
+
+
+def roster_fingerprint(characters: Iterable[Character]) -> str:
+    """Digest of every field a duel depends on, so a resumed file can't mix rosters."""
+    stats = [
+        [
+            c.name,
+            c.health,
+            asdict(c.ability_scores),
+            asdict(c.weapon) if c.weapon is not None else None,
+            asdict(c.armor) if c.armor is not None else None,
+        ]
+        for c in characters
+    ]
+    return hashlib.sha256(json.dumps(stats, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def read_results(path: str) -> Tuple[Optional[dict], List[ShardResult]]:
+    """Header and shard records of a results file; a torn final line is ignored."""
+    header = None
+    results: List[ShardResult] = []
+    if not os.path.exists(path):
+        return header, results
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Ignoring unreadable line %d of %s", number, path)
+                continue
+            if record.get("type") == "header":
+                header = record
+            elif record.get("type") == "shard":
+                del record["type"]
+                results.append(ShardResult(**record))
+    return header, results
+
+
+def run_tournament(
+    characters: List[Character],
+    path: str,
+    config: Optional[TournamentConfig] = None,
+    workers: Optional[int] = None,
+) -> List[ShardResult]:
+    """Play (or finish) a round-robin tournament, appending each shard to ``path`` as it completes.
+
+    Shards already present in ``path`` are skipped, so an interrupted run picks up where
+    it stopped; the file's header must match ``config`` and the roster's names and
+    ``roster_fingerprint``. Every shard has its own seed, so results do not depend on
+    ``workers`` or on how often the run was resumed. ``workers`` defaults to the CPU count; ``workers=1`` plays in-process.
+    """
+    config = config or TournamentConfig()
+    if config.engine not in ENGINES:
+        raise ValueError(f"unknown engine {config.engine!r}; expected one of {sorted(ENGINES)}")
+    names = [c.name for c in characters]
+    if len(set(names)) != len(names):
+        raise ValueError("tournament characters need unique names")
+
+    header = {
+        "type": "header",
+        "config": config.to_dict(),
+        "roster": names,
+        "fingerprint": roster_fingerprint(characters),
+    }
+    existing_header, done = read_results(path)
+    if existing_header is not None and any(existing_header.get(field) != header[field] for field in header):
+        raise ValueError(f"{path} belongs to a different tournament; use a new file")
+    finished: Set[ShardKey] = {result.key for result in done}
+    pending = [key for key in schedule(characters, config.shards_per_pair) if key not in finished]
+    if done:
+        logger.info("Resuming tournament: %d shards done, %d to go", len(finished), len(pending))
+
+    results = list(done)
+    _truncate_torn_tail(path)
+    with open(path, "a", encoding="utf-8") as out:
+        if existing_header is None:
+            out.write(json.dumps(header) + "\n")
+            out.flush()
+        for result in _play(characters, config, pending, workers or os.cpu_count() or 1):
+            record = {"type": "shard", **result.__dict__}
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            results.append(result)
+    return results
+
+
+def _truncate_torn_tail(path: str) -> None:
+    """Drop a final line cut off mid-write so appended records start on a fresh line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as handle:
+        data = handle.read()
+        if data and not data.endswith(b"\n"):
+            handle.truncate(data.rfind(b"\n") + 1)
+
+
+def _play(
+    characters: List[Character], config: TournamentConfig, keys: List[ShardKey], workers: int
+) -> Iterator[ShardResult]:
+    if workers <= 1:
+        _init_worker(characters)
+        for key in keys:
+            yield _play_shard(config, key)
+        return
+
+    queue = iter(keys)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(characters,)) as pool:
+        in_flight: Set[Future] = set()
+        for key in queue:
+            in_flight.add(pool.submit(_play_shard, config, key))
+            if len(in_flight) >= workers * 4:
+                break
+        while in_flight:
+            completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in completed:
+                yield future.result()
+                next_key = next(queue, None)
+                if next_key is not None:
+                    in_flight.add(pool.submit(_play_shard, config, next_key))
+
+
+def standings(results: Iterable[ShardResult], iterations: int = 200) -> List[Standing]:
+    """Win/loss/draw totals and Elo ratings, strongest first.
+
+    Ratings are a Bradley-Terry fit of all games (draws count half) mapped onto the Elo
+    scale around 1500. Unlike sequential Elo updates, the fit does not depend on the
+    order shards finished in.
+    """
+    totals: Dict[str, List[int]] = {}
+    scores: Dict[Tuple[str, str], float] = {}
+    games: Dict[Tuple[str, str], int] = {}
+    for result in results:
+        for name, won, lost in (
+            (result.first, result.first_wins, result.second_wins),
+            (result.second, result.second_wins, result.first_wins),
+        ):
+            row = totals.setdefault(name, [0, 0, 0, 0])
+            row[0] += result.trials
+            row[1] += won
+            row[2] += lost
+            row[3] += result.draws
+        pair = (result.first, result.second)
+        scores[pair] = scores.get(pair, 0.0) + result.first_wins + 0.5 * result.draws
+        scores[pair[::-1]] = scores.get(pair[::-1], 0.0) + result.second_wins + 0.5 * result.draws
+        games[pair] = games.get(pair, 0) + result.trials
+        games[pair[::-1]] = games.get(pair[::-1], 0) + result.trials
+
+    names = sorted(totals)
+    index = {name: i for i, name in enumerate(names)}
+    played = np.zeros((len(names), len(names)))
+    won = np.zeros(len(names))
+    for (a, b), count in games.items():
+        played[index[a], index[b]] += count
+    for (a, _), score in scores.items():
+        won[index[a]] += score
+
+    # minorization-maximization for Bradley-Terry strengths; half a win and half a loss
+    # against a reference build keep undefeated or winless builds finite
+    strength = np.ones(len(names))
+    prior = 0.5
+    for _ in range(iterations):
+        pair_sums = strength[:, None] + strength[None, :]
+        denominator = (played / pair_sums).sum(axis=1) + 2 * prior / (strength + 1.0)
+        strength = (won + prior) / denominator
+    strength /= math.exp(np.log(strength).mean())
+
+    ratings = ELO_BASE + 400.0 * np.log10(strength)
+    table = [
+        Standing(name, *totals[name], elo=float(ratings[index[name]]))
+        for name in names
+    ]
+    return sorted(table, key=lambda standing: (-standing.elo, standing.name))
+
+
+def format_standings(table: List[Standing]) -> str:
+    lines = [f"{'rank':>4}  {'name':<24} {'elo':>7} {'win%':>6} {'games':>8}"]
+    for rank, standing in enumerate(table, 1):
+        lines.append(
+            f"{rank:>4}  {standing.name:<24} {standing.elo:>7.1f} {standing.win_rate * 100:>5.1f}% {standing.games:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Round-robin duel tournament over a generated roster.")
+    parser.add_argument("path", help="JSONL results file (resumed if it exists)")
+    parser.add_argument("--roster-size", type=int, default=16)
+    parser.add_argument("--roster-seed", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=4, help="shards per ordered pairing")
+    parser.add_argument("--trials", type=int, default=250, help="duels per shard")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="vectorized")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = TournamentConfig(seed=args.seed, shards_per_pair=args.shards, trials_per_shard=args.trials, engine=args.engine)
+    results = run_tournament(build_roster(args.roster_size, seed=args.roster_seed), args.path, config, args.workers)
+    print(format_standings(standings(results)))
+
+
+if __name__ == "__main__":
+    main()